@@ -0,0 +1,71 @@
+import atexit
+import logging
+import re
+import threading
+import time
+from django.conf import settings
+from django.db import connection
+from .models import SearchQuery
+
+logger = logging.getLogger(__name__)
+
+# Parámetros de la búsqueda que se guardan como filtros
+PARAMETROS_FILTRO = ['categoria', 'precio_min', 'precio_max', 'stock_min', 'ordenar_por', 'orden', 'modo']
+
+_buffer = []
+_lock = threading.Lock()
+_ultimo_envio = time.monotonic()
+
+def normalizar_query(query):
+    """Minúsculas y espacios colapsados, para agrupar búsquedas equivalentes"""
+    return re.sub(r'\s+', ' ', (query or '').strip().lower())[:255]
+
+def registrar_busqueda(query, params, resultados, total):
+    """
+    Agrega una búsqueda al buffer en memoria del proceso. `resultados` es la primera página
+    (se guardan sus primeros ids) y `total` la cantidad de libros que coinciden.
+    La escritura en la base de datos ocurre en lote, fuera del ciclo de la petición.
+    """
+    global _ultimo_envio
+    registro = SearchQuery(
+        query=normalizar_query(query),
+        filtros={clave: params[clave] for clave in PARAMETROS_FILTRO if params.get(clave)},
+        cantidad_resultados=total,
+        ids_resultados=[libro['id'] for libro in resultados[:settings.BUSQUEDA_ANALITICA_TOP_IDS]],
+    )
+    with _lock:
+        _buffer.append(registro)
+        lleno = len(_buffer) >= settings.BUSQUEDA_ANALITICA_LOTE
+        vencido = time.monotonic() - _ultimo_envio >= settings.BUSQUEDA_ANALITICA_INTERVALO
+        if not (lleno or vencido):
+            return
+        _ultimo_envio = time.monotonic()
+
+    if settings.BUSQUEDA_ANALITICA_EN_SEGUNDO_PLANO:
+        threading.Thread(target=_enviar_en_hilo, daemon=True).start()
+    else:
+        enviar_registros()
+
+def enviar_registros():
+    """Escribe con un solo bulk_create todas las búsquedas acumuladas. Retorna cuántas se guardaron."""
+    with _lock:
+        registros = _buffer[:]
+        del _buffer[:]
+    if not registros:
+        return 0
+    try:
+        SearchQuery.objects.bulk_create(registros, batch_size=500)
+    except Exception as e:
+        # La analítica nunca debe afectar la búsqueda; se descartan los registros del lote
+        logger.error(f"Error al guardar {len(registros)} búsquedas: {e}")
+        return 0
+    return len(registros)
+
+def _enviar_en_hilo():
+    try:
+        enviar_registros()
+    finally:
+        # Cada hilo abre su propia conexión; se cierra para no dejarla huérfana
+        connection.close()
+
+atexit.register(enviar_registros)
@@ -4,3 +4,6 @@ class BusquedaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.busqueda'
     verbose_name = 'Sistema de Búsqueda'
+
+    def ready(self):
+        import apps.busqueda.signals
@@ -0,0 +1,167 @@
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from apps.libros.models import Libro, Categoria
+from .cache import version_indice
+
+TIPO_TITULO = 'titulo'
+TIPO_AUTOR = 'autor'
+TIPO_CATEGORIA = 'categoria'
+
+def normalizar(texto):
+    """Minúsculas y sin tildes, con las palabras separadas por un espacio"""
+    texto = unicodedata.normalize('NFKD', texto or '').lower()
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return ' '.join(re.findall(r'\w+', texto))
+
+class IndiceAutocompletado:
+    """
+    Índice en memoria para sugerencias por prefijo.
+
+    Es un arreglo ordenado de claves (texto normalizado desde el inicio de cada palabra, tipo, texto)
+    que se consulta con bisect, así "sole" encuentra "Cien años de soledad".
+    Cada texto se guarda una sola vez aunque lo compartan varios libros (p. ej. un autor).
+    """
+
+    def __init__(self):
+        self._claves = []
+        self._referencias = {}
+        self._libros = {}
+        self._categorias = {}
+        self._lock = threading.Lock()
+        self.version = None
+
+    def construir(self):
+        """Carga todos los títulos, autores y categorías (dos consultas)"""
+        version = version_indice()
+        libros = {libro_id: (titulo, autor) for libro_id, titulo, autor in
+                  Libro.objects.values_list('id', 'titulo', 'autor')}
+        categorias = dict(Categoria.objects.values_list('id', 'nombre'))
+
+        referencias = {}
+        for titulo, autor in libros.values():
+            for entrada in ((TIPO_TITULO, titulo), (TIPO_AUTOR, autor)):
+                referencias[entrada] = referencias.get(entrada, 0) + 1
+        for nombre in categorias.values():
+            referencias[(TIPO_CATEGORIA, nombre)] = 1
+        claves = sorted(
+            clave for tipo, texto in referencias for clave in self._generar_claves(tipo, texto)
+        )
+
+        with self._lock:
+            self._claves, self._referencias = claves, referencias
+            self._libros, self._categorias = libros, categorias
+            self.version = version
+
+    def _generar_claves(self, tipo, texto):
+        palabras = normalizar(texto).split(' ')
+        return [(' '.join(palabras[i:]), tipo, texto) for i in range(len(palabras)) if palabras[i]]
+
+    def _agregar(self, tipo, texto):
+        entrada = (tipo, texto)
+        self._referencias[entrada] = self._referencias.get(entrada, 0) + 1
+        if self._referencias[entrada] == 1:
+            for clave in self._generar_claves(tipo, texto):
+                insort(self._claves, clave)
+
+    def _quitar(self, tipo, texto):
+        entrada = (tipo, texto)
+        if entrada not in self._referencias:
+            return
+        self._referencias[entrada] -= 1
+        if self._referencias[entrada] == 0:
+            del self._referencias[entrada]
+            for clave in self._generar_claves(tipo, texto):
+                i = bisect_left(self._claves, clave)
+                if i < len(self._claves) and self._claves[i] == clave:
+                    del self._claves[i]
+
+    def actualizar_libro(self, libro_id, titulo, autor):
+        with self._lock:
+            self._quitar_libro(libro_id)
+            self._libros[libro_id] = (titulo, autor)
+            self._agregar(TIPO_TITULO, titulo)
+            self._agregar(TIPO_AUTOR, autor)
+
+    def eliminar_libro(self, libro_id):
+        with self._lock:
+            self._quitar_libro(libro_id)
+
+    def _quitar_libro(self, libro_id):
+        anterior = self._libros.pop(libro_id, None)
+        if anterior:
+            self._quitar(TIPO_TITULO, anterior[0])
+            self._quitar(TIPO_AUTOR, anterior[1])
+
+    def actualizar_categoria(self, categoria_id, nombre):
+        with self._lock:
+            self._quitar_categoria(categoria_id)
+            self._categorias[categoria_id] = nombre
+            self._agregar(TIPO_CATEGORIA, nombre)
+
+    def eliminar_categoria(self, categoria_id):
+        with self._lock:
+            self._quitar_categoria(categoria_id)
+
+    def _quitar_categoria(self, categoria_id):
+        nombre = self._categorias.pop(categoria_id, None)
+        if nombre is not None:
+            self._quitar(TIPO_CATEGORIA, nombre)
+
+    def buscar(self, prefijo, limite):
+        """
+        Sugerencias cuyo texto contiene una palabra que empieza con `prefijo`.
+        Primero las que empiezan con el prefijo y luego las más cortas.
+        """
+        prefijo = normalizar(prefijo)
+        if not prefijo:
+            return []
+        encontrados = {}
+        with self._lock:
+            i = bisect_left(self._claves, (prefijo,))
+            # Se revisan más claves que el límite para poder ordenar por relevancia
+            while i < len(self._claves) and len(encontrados) < limite * 5:
+                clave, tipo, texto = self._claves[i]
+                if not clave.startswith(prefijo):
+                    break
+                inicio = clave == normalizar(texto)
+                encontrados[(tipo, texto)] = encontrados.get((tipo, texto), False) or inicio
+                i += 1
+        ordenados = sorted(encontrados.items(), key=lambda item: (not item[1], len(item[0][1]), item[0][1]))
+        return [{'tipo': tipo, 'texto': texto} for (tipo, texto), _ in ordenados[:limite]]
+
+_indice = IndiceAutocompletado()
+_lock_construccion = threading.Lock()
+
+def obtener_indice():
+    """
+    Retorna el índice del proceso, construyéndolo la primera vez.
+    Se reconstruye si los títulos, autores o categorías cambiaron en otro proceso (las señales solo
+    llegan al proceso que hizo el cambio); en ese caso la versión compartida no coincide con la del índice.
+    """
+    if _indice.version != version_indice():
+        with _lock_construccion:
+            if _indice.version != version_indice():
+                _indice.construir()
+    return _indice
+
+def actualizar_indice(instancia, pk, eliminada, version, previa):
+    """
+    Aplica el cambio de un libro o categoría (con clave `pk`) al índice sin volver a la base de datos
+    y lo deja en `version`.
+    Solo si el índice estaba al día con la versión `previa`; si no, se reconstruye en la próxima consulta.
+    """
+    with _lock_construccion:
+        if _indice.version is None or _indice.version != previa:
+            return
+        if isinstance(instancia, Libro):
+            if eliminada:
+                _indice.eliminar_libro(pk)
+            else:
+                _indice.actualizar_libro(pk, instancia.titulo, instancia.autor)
+        elif eliminada:
+            _indice.eliminar_categoria(pk)
+        else:
+            _indice.actualizar_categoria(pk, instancia.nombre)
+        _indice.version = version
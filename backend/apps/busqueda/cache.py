@@ -0,0 +1,97 @@
+import hashlib
+import json
+import time
+from django.conf import settings
+from django.core.cache import cache
+from .analytics import normalizar_query
+
+CLAVE_VERSION = 'busqueda:version_catalogo'
+CLAVE_VERSION_INDICE = 'busqueda:version_indice'
+CLAVE_ACIERTOS = 'busqueda:cache:aciertos'
+CLAVE_FALLOS = 'busqueda:cache:fallos'
+
+def _version(clave):
+    version = cache.get(clave)
+    if version is None:
+        # Se inicia con la hora para no reutilizar versiones viejas si la clave fue desalojada
+        cache.add(clave, time.time_ns(), timeout=None)
+        version = cache.get(clave)
+    return version
+
+def _incrementar(clave):
+    try:
+        return cache.incr(clave)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(clave, version, timeout=None)
+        return version
+
+def version_catalogo():
+    """
+    Versión actual del catálogo. Cambia cada vez que se modifica un libro o una categoría,
+    por lo que las entradas guardadas con una versión anterior dejan de leerse.
+    """
+    return _version(CLAVE_VERSION)
+
+def incrementar_version_catalogo():
+    """Invalida los resultados en caché y retorna la nueva versión"""
+    return _incrementar(CLAVE_VERSION)
+
+def version_indice():
+    """
+    Versión del índice de autocompletado. Solo cambia con los títulos, autores y nombres de categoría,
+    así los cambios de stock, precio o popularidad no obligan a reconstruirlo.
+    """
+    return _version(CLAVE_VERSION_INDICE)
+
+def incrementar_version_indice():
+    """Marca el índice de autocompletado de cada proceso como desactualizado y retorna la nueva versión"""
+    return _incrementar(CLAVE_VERSION_INDICE)
+
+def clave_busqueda(params, page_size):
+    """Clave de caché a partir de los parámetros normalizados de la búsqueda"""
+    normalizados = {
+        clave: sorted(valor for valor in valores if valor)
+        for clave, valores in params.lists()
+        if clave != 'page_size' and any(valores)
+    }
+    if 'q' in normalizados:
+        normalizados['q'] = [normalizar_query(q) for q in normalizados['q']]
+    normalizados['page_size'] = page_size
+    # La configuración de la búsqueda difusa también cambia los resultados
+    normalizados['_difusa'] = [
+        settings.BUSQUEDA_DIFUSA_UMBRAL, settings.BUSQUEDA_DIFUSA_MIN_RESULTADOS, settings.BUSQUEDA_DIFUSA_LIMITE
+    ]
+    resumen = hashlib.md5(json.dumps(normalizados, sort_keys=True).encode()).hexdigest()
+    return f'busqueda:{version_catalogo()}:{resumen}'
+
+def _contar(clave):
+    try:
+        cache.incr(clave)
+    except ValueError:
+        cache.add(clave, 0, timeout=None)
+        cache.incr(clave)
+
+def obtener_resultado(clave):
+    """Retorna el resultado guardado o None, y actualiza los contadores de aciertos y fallos"""
+    resultado = cache.get(clave)
+    _contar(CLAVE_ACIERTOS if resultado is not None else CLAVE_FALLOS)
+    return resultado
+
+def guardar_resultado(clave, resultado):
+    cache.set(clave, resultado, timeout=settings.BUSQUEDA_CACHE_TIMEOUT)
+
+def estadisticas():
+    aciertos = cache.get(CLAVE_ACIERTOS, 0)
+    fallos = cache.get(CLAVE_FALLOS, 0)
+    total = aciertos + fallos
+    return {
+        'aciertos': aciertos,
+        'fallos': fallos,
+        'tasa_aciertos': round(aciertos / total, 4) if total else None,
+        'version_catalogo': version_catalogo(),
+        'version_indice': version_indice(),
+    }
+
+def reiniciar_estadisticas():
+    cache.delete_many([CLAVE_ACIERTOS, CLAVE_FALLOS])
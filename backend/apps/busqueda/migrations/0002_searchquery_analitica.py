@@ -0,0 +1,39 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:21
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('busqueda', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='searchquery',
+            name='results',
+        ),
+        migrations.AddField(
+            model_name='searchquery',
+            name='cantidad_resultados',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='searchquery',
+            name='filtros',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='searchquery',
+            name='ids_resultados',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), blank=True, default=list, size=None),
+        ),
+        migrations.AlterField(
+            model_name='searchquery',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -1,11 +1,18 @@
 from django.db import models
+from django.contrib.postgres.fields import ArrayField
+from django.utils import timezone
 
 class SearchQuery(models.Model):
+    """
+    Registro liviano de una búsqueda para analítica: no guarda los resultados completos,
+    solo la consulta normalizada, los filtros, la cantidad de resultados y los primeros ids.
+    """
     query = models.CharField(max_length=255)
-    results = models.JSONField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    filtros = models.JSONField(default=dict, blank=True)
+    cantidad_resultados = models.PositiveIntegerField(default=0)
+    ids_resultados = ArrayField(models.BigIntegerField(), blank=True, default=list)
+    # Fecha de la búsqueda (no de la escritura en lote, que ocurre después)
+    created_at = models.DateTimeField(default=timezone.now)
 
     def __str__(self):
         return self.query
-
-# Create your models here.
@@ -0,0 +1,68 @@
+import base64
+import binascii
+import datetime
+import json
+from decimal import Decimal
+from django.db.models import Q
+
+class CursorInvalido(Exception):
+    pass
+
+def _serializar_valor(valor):
+    # Sin pérdida de precisión: el cursor debe reproducir exactamente el valor de la fila
+    if isinstance(valor, (datetime.datetime, datetime.date)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return str(valor)
+    raise TypeError(f"Tipo no soportado en el cursor: {type(valor)}")
+
+def codificar_cursor(valor, ultimo_id):
+    """Codifica la posición (valor del campo de orden, id) del último elemento de una página"""
+    datos = json.dumps({'v': valor, 'id': ultimo_id}, default=_serializar_valor)
+    return base64.urlsafe_b64encode(datos.encode()).decode()
+
+def decodificar_cursor(cursor):
+    try:
+        datos = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datos['v'], int(datos['id'])
+    except (binascii.Error, ValueError, TypeError, KeyError, UnicodeDecodeError):
+        raise CursorInvalido(cursor)
+
+def paginar_keyset(queryset, campo, descendente, page_size, cursor=None, convertir=None):
+    """
+    Pagina por keyset usando (campo, id) como clave de orden.
+
+    En lugar de OFFSET, cada página continúa desde la posición codificada en el cursor,
+    por lo que las páginas profundas cuestan lo mismo que la primera.
+    `convertir` transforma el valor guardado en el cursor al tipo del campo.
+    Retorna la lista de la página y el cursor de la siguiente (o None).
+    """
+    if descendente:
+        queryset = queryset.order_by(f'-{campo}', '-id')
+    else:
+        queryset = queryset.order_by(campo, 'id')
+
+    if cursor:
+        valor, ultimo_id = decodificar_cursor(cursor)
+        if convertir is not None:
+            try:
+                valor = convertir(valor)
+            except Exception:
+                raise CursorInvalido(cursor)
+        if descendente:
+            # La condición redundante sobre el campo permite recorrer el índice por rango
+            queryset = queryset.filter(**{f'{campo}__lte': valor}).filter(
+                Q(**{f'{campo}__lt': valor}) | Q(id__lt=ultimo_id)
+            )
+        else:
+            queryset = queryset.filter(**{f'{campo}__gte': valor}).filter(
+                Q(**{f'{campo}__gt': valor}) | Q(id__gt=ultimo_id)
+            )
+
+    pagina = list(queryset[:page_size + 1])
+    siguiente = None
+    if len(pagina) > page_size:
+        pagina = pagina[:page_size]
+        ultimo = pagina[-1]
+        siguiente = codificar_cursor(getattr(ultimo, campo), ultimo.id)
+    return pagina, siguiente
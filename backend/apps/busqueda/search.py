@@ -0,0 +1,186 @@
+import re
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery as TextoQuery, SearchRank, TrigramWordSimilarity
+from django.db import connection, transaction
+from django.db.models import Case, F, FloatField, IntegerField, Q, Value, When
+from django.db.models.functions import Cast, Greatest
+from apps.libros.models import Libro
+
+# Configuración de PostgreSQL usada por el trigger de libros_libro.search_vector
+CONFIG_TEXTO = 'spanish'
+
+MODO_TEXTO = 'texto'
+MODO_CONTIENE = 'contiene'
+
+# Campos permitidos en `ordenar_por`; 'relevancia' solo existe en la búsqueda de texto completo
+CAMPOS_ORDEN = ['titulo', 'autor', 'editorial', 'precio', 'stock', 'año_publicacion', 'fecha_creacion', 'popularidad']
+ORDEN_RELEVANCIA = 'relevancia'
+# Órdenes que por defecto van de mayor a menor
+ORDENES_DESCENDENTES = [ORDEN_RELEVANCIA, 'popularidad']
+
+def convertidor_orden(campo):
+    """Retorna la función que convierte el valor de un cursor al tipo del campo de orden"""
+    if campo == ORDEN_RELEVANCIA:
+        return float
+    return Libro._meta.get_field(campo).to_python
+
+def normalizar_isbn(query):
+    """
+    Si el texto tiene forma de ISBN-10 o ISBN-13 (dígitos con guiones o espacios opcionales),
+    retorna las formas en que puede estar guardado: sin separadores y su equivalente de 10/13 dígitos.
+    Retorna None si no parece un ISBN.
+    """
+    if not re.fullmatch(r'[\d\s-]+[xX]?', query.strip()):
+        return None
+    isbn = re.sub(r'[\s-]', '', query).upper()
+    if re.fullmatch(r'\d{9}[\dX]', isbn):
+        base = '978' + isbn[:9]
+        control = (10 - sum(int(d) * (1 if i % 2 == 0 else 3) for i, d in enumerate(base)) % 10) % 10
+        return [isbn, base + str(control)]
+    if re.fullmatch(r'\d{13}', isbn):
+        candidatos = [isbn]
+        if isbn.startswith('978'):
+            control = (11 - sum(int(d) * (10 - i) for i, d in enumerate(isbn[3:12])) % 11) % 11
+            candidatos.append(isbn[3:12] + ('X' if control == 10 else str(control)))
+        return candidatos
+    return None
+
+def construir_consulta_texto(query):
+    """
+    Convierte el texto del usuario en un tsquery de PostgreSQL.
+    El último término se busca por prefijo para soportar búsqueda mientras se escribe.
+    Retorna None si el texto no contiene términos utilizables.
+    """
+    terminos = re.findall(r'\w+', query.lower())
+    if not terminos:
+        return None
+    terminos[-1] = f'{terminos[-1]}:*'
+    return TextoQuery(' & '.join(terminos), search_type='raw', config=CONFIG_TEXTO)
+
+def buscar_texto_completo(libros, query):
+    """
+    Filtra los libros usando el índice GIN de search_vector y anota la relevancia (ts_rank).
+    """
+    consulta = construir_consulta_texto(query)
+    if consulta is None:
+        return buscar_contiene(libros, query).annotate(relevancia=Value(0.0, output_field=FloatField()))
+    return libros.filter(
+        Q(search_vector=consulta) | Q(isbn=query.strip())
+    ).annotate(
+        # ts_rank devuelve real; como double precision el valor viaja sin redondeo en los cursores
+        relevancia=Cast(SearchRank(F('search_vector'), consulta), FloatField())
+    )
+
+def buscar_difuso(libros, query, limite, umbral=None):
+    """
+    Búsqueda tolerante a errores de escritura sobre título y autor usando pg_trgm.
+    Retorna como máximo `limite` libros ordenados por similitud descendente.
+    """
+    if umbral is None:
+        umbral = settings.BUSQUEDA_DIFUSA_UMBRAL
+    similitud = Greatest(
+        TrigramWordSimilarity(query, 'titulo'),
+        TrigramWordSimilarity(query, 'autor'),
+    )
+    libros = libros.filter(
+        Q(titulo__trigram_word_similar=query) | Q(autor__trigram_word_similar=query)
+    ).annotate(similitud=similitud).order_by('-similitud', 'id')
+
+    with transaction.atomic():
+        # El operador %> usa este umbral, así el filtro se resuelve con los índices GIN de trigramas
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT set_config('pg_trgm.word_similarity_threshold', %s, true)", [str(umbral)]
+            )
+        return list(libros[:limite])
+
+def buscar_contiene(libros, query):
+    """Búsqueda por subcadena (ILIKE) sobre los campos de texto del libro"""
+    return libros.filter(
+        Q(titulo__icontains=query) |
+        Q(autor__icontains=query) |
+        Q(isbn__icontains=query) |
+        Q(descripcion__icontains=query) |
+        Q(editorial__icontains=query)
+    )
+
+def filtrar_libros(libros, params):
+    """Aplica los filtros de categoría, precio y stock de la búsqueda"""
+    categoria = params.get('categoria', None)
+    if categoria:
+        libros = libros.filter(categoria__nombre__icontains=categoria)
+
+    precio_min = params.get('precio_min', None)
+    if precio_min:
+        libros = libros.filter(precio__gte=float(precio_min))
+
+    precio_max = params.get('precio_max', None)
+    if precio_max:
+        libros = libros.filter(precio__lte=float(precio_max))
+
+    stock_min = params.get('stock_min', None)
+    if stock_min:
+        libros = libros.filter(stock__gte=int(stock_min))
+
+    return libros
+
+def calcular_facetas(libros, limites_precio):
+    """
+    Cuenta los libros por categoría, editorial, década de publicación y rango de precio.
+    Todas las facetas se calculan en una sola consulta con GROUPING SETS sobre los libros filtrados.
+    `limites_precio` son los límites (ordenados) entre los rangos de precio.
+    """
+    rango_precio = Case(
+        *[When(precio__lt=limite, then=Value(i)) for i, limite in enumerate(limites_precio)],
+        default=Value(len(limites_precio)),
+        output_field=IntegerField()
+    )
+    filas = libros.order_by().annotate(
+        faceta_categoria=F('categoria__nombre'),
+        faceta_decada=F('año_publicacion') / 10 * 10,
+        faceta_precio=rango_precio,
+    ).values('faceta_categoria', 'editorial', 'faceta_decada', 'faceta_precio')
+    sql, params = filas.query.sql_with_params()
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT GROUPING(faceta_categoria, editorial, faceta_decada, faceta_precio),
+                   faceta_categoria, editorial, faceta_decada, faceta_precio, COUNT(*)
+            FROM ({sql}) AS libros
+            GROUP BY GROUPING SETS ((faceta_categoria), (editorial), (faceta_decada), (faceta_precio), ())
+        """, params)
+        filas = cursor.fetchall()
+
+    # GROUPING() marca con un bit cada columna que no forma parte del grupo de la fila
+    grupos = {0b0111: 'categoria', 0b1011: 'editorial', 0b1101: 'decada', 0b1110: 'precio'}
+    facetas = {'categoria': {}, 'editorial': {}, 'decada': {}, 'precio': {}}
+    total = 0
+    for grupo, categoria, editorial, decada, precio, cantidad in filas:
+        if grupo == 0b1111:
+            total = cantidad
+            continue
+        nombre = grupos[grupo]
+        valor = {'categoria': categoria, 'editorial': editorial, 'decada': decada, 'precio': precio}[nombre]
+        if valor not in (None, ''):
+            facetas[nombre][valor] = cantidad
+
+    def ordenar(conteos):
+        return [
+            {'valor': valor, 'cantidad': cantidad}
+            for valor, cantidad in sorted(conteos.items(), key=lambda item: (-item[1], item[0]))
+        ][:settings.BUSQUEDA_FACETAS_LIMITE]
+
+    limites = [None] + list(limites_precio) + [None]
+    return {
+        'total': total,
+        'categoria': ordenar(facetas['categoria']),
+        'editorial': ordenar(facetas['editorial']),
+        'decada': [
+            {'valor': decada, 'cantidad': cantidad} for decada, cantidad in sorted(facetas['decada'].items())
+        ],
+        # Se incluyen también los rangos sin libros para que el filtro muestre todos
+        'precio': [
+            {'desde': limites[i], 'hasta': limites[i + 1], 'cantidad': facetas['precio'].get(i, 0)}
+            for i in range(len(limites) - 1)
+        ],
+    }
@@ -4,5 +4,12 @@ from .models import SearchQuery
 class SearchQuerySerializer(serializers.ModelSerializer):
     class Meta:
         model = SearchQuery
-        fields = ['id', 'query', 'results', 'created_at']
+        fields = ['id', 'query', 'filtros', 'cantidad_resultados', 'ids_resultados', 'created_at']
         read_only_fields = ['created_at']
+
+class SearchResponseSerializer(serializers.Serializer):
+    """Forma de la respuesta de /api/search/ (documentación de la API)"""
+    query = serializers.CharField(allow_null=True)
+    results = serializers.ListField(child=serializers.DictField())
+    page_size = serializers.IntegerField()
+    next = serializers.URLField(allow_null=True)
@@ -0,0 +1,60 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from apps.libros.models import Libro, Categoria
+from apps.libros.signals import catalogo_importado
+from .autocomplete import actualizar_indice
+from .cache import incrementar_version_catalogo, incrementar_version_indice
+
+# Campos de cada modelo que aparecen en el índice de autocompletado
+CAMPOS_INDICE = {Libro: {'titulo', 'autor'}, Categoria: {'nombre'}}
+
+def modifica_indice(instancia, creada, update_fields):
+    """
+    Si el guardado cambia algún texto del índice de autocompletado. Los de stock, precio,
+    inventario o portada no lo tocan, con o sin update_fields.
+    """
+    campos = CAMPOS_INDICE[type(instancia)]
+    if update_fields is not None and not campos & set(update_fields):
+        return False
+    return creada or bool(instancia.campos_modificados(campos))
+
+def aplicar_cambio_catalogo(instancia, pk, eliminada, previa):
+    """
+    Después del commit: invalida otra vez la caché y, si el cambio toca el índice de autocompletado
+    (`previa` no es None), se lo aplica. El índice solo se actualiza si estaba en `previa` y nada más
+    lo cambió desde entonces; si no, se reconstruye en la próxima consulta.
+    """
+    incrementar_version_catalogo()
+    if previa is None:
+        return
+    version = incrementar_version_indice()
+    actualizar_indice(instancia, pk, eliminada, version, previa if version == previa + 2 else None)
+
+@receiver(post_save, sender=Libro)
+@receiver(post_delete, sender=Libro)
+@receiver(post_save, sender=Categoria)
+@receiver(post_delete, sender=Categoria)
+def invalidar_cache_busqueda(sender, instance, signal, created=False, update_fields=None, **kwargs):
+    """
+    Cualquier cambio en el catálogo (stock, precio, datos del libro o categorías)
+    invalida los resultados de búsqueda en caché; solo los de títulos, autores y nombres
+    de categoría actualizan el índice de autocompletado
+    """
+    eliminada = signal is post_delete
+    # Después de delete() la instancia ya no tiene pk
+    pk = instance.pk
+    # Enseguida solo se cambian las versiones: el índice no debe recibir datos que la transacción puede revertir
+    incrementar_version_catalogo()
+    previa = None
+    if eliminada or modifica_indice(instance, created, update_fields):
+        previa = incrementar_version_indice() - 1
+    # Se repite al confirmar: una búsqueda concurrente pudo guardar en caché
+    # los datos anteriores al commit con la versión nueva
+    transaction.on_commit(lambda: aplicar_cambio_catalogo(instance, pk, eliminada, previa))
+
+@receiver(catalogo_importado)
+def invalidar_cache_importacion(sender, **kwargs):
+    """Una importación masiva invalida la caché una sola vez; el índice se reconstruye en la próxima consulta"""
+    incrementar_version_catalogo()
+    incrementar_version_indice()
@@ -1,3 +1,404 @@
-from django.test import TestCase
+from decimal import Decimal
+from django.db import DatabaseError, transaction
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from apps.libros.models import Libro, Categoria
+from apps.recomendaciones.models import ActividadLibro
+from .analytics import enviar_registros
+from .cache import incrementar_version_catalogo, incrementar_version_indice, reiniciar_estadisticas, version_indice
+from .models import SearchQuery
 
-# Create your tests here.
+@override_settings(
+    BUSQUEDA_DIFUSA_MIN_RESULTADOS=0, BUSQUEDA_ANALITICA_EN_SEGUNDO_PLANO=False,
+    RECOMENDACIONES_CONTENIDO_EN_SEGUNDO_PLANO=False
+)
+class SearchViewTests(APITestCase):
+    def setUp(self):
+        enviar_registros()
+        self.ficcion = Categoria.objects.create(nombre='Ficción')
+        self.historia = Categoria.objects.create(nombre='Historia')
+
+        self.cien_anos = Libro.objects.create(
+            titulo='Cien años de soledad',
+            autor='Gabriel García Márquez',
+            isbn='9780307474728',
+            categoria=self.ficcion,
+            editorial='Vintage Español',
+            precio='25.99',
+            stock=15,
+            año_publicacion=1967,
+            descripcion='Una saga familiar que narra la historia de los Buendía en Macondo'
+        )
+        self.principito = Libro.objects.create(
+            titulo='El principito',
+            autor='Antoine de Saint-Exupéry',
+            isbn='9780156012195',
+            categoria=self.ficcion,
+            editorial='Salamandra',
+            precio='12.50',
+            stock=0,
+            año_publicacion=1943,
+            descripcion='Un piloto conoce a un pequeño príncipe venido de otro planeta'
+        )
+        self.sapiens = Libro.objects.create(
+            titulo='Sapiens',
+            autor='Yuval Noah Harari',
+            isbn='9788499926223',
+            categoria=self.historia,
+            editorial='Debate',
+            precio='30.00',
+            stock=4,
+            año_publicacion=2011,
+            descripcion='De animales a dioses: breve historia de la humanidad'
+        )
+        self.url = reverse('search')
+
+    def tearDown(self):
+        # Vaciar el buffer dentro de la transacción del test
+        enviar_registros()
+
+    def ids(self, response):
+        return [libro['id'] for libro in response.data['results']]
+
+    def test_texto_completo_prioriza_titulo(self):
+        """El título pesa más que la descripción en el ranking"""
+        response = self.client.get(self.url, {'q': 'historia'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(self.ids(response)), {self.cien_anos.id, self.sapiens.id})
+
+        Libro.objects.filter(pk=self.principito.pk).update(titulo='Historia del principito')
+        # update() no envía señales: hay que invalidar la caché explícitamente
+        incrementar_version_catalogo()
+        response = self.client.get(self.url, {'q': 'historia'})
+        self.assertEqual(self.ids(response)[0], self.principito.id)
+
+    def test_texto_completo_por_prefijo_y_derivacion(self):
+        """El último término se busca por prefijo y los demás con stemming en español"""
+        response = self.client.get(self.url, {'q': 'saga famil'})
+        self.assertEqual(self.ids(response), [self.cien_anos.id])
+
+    def test_vector_se_actualiza_al_guardar(self):
+        self.sapiens.titulo = 'Homo Deus'
+        self.sapiens.save()
+        self.assertEqual(self.ids(self.client.get(self.url, {'q': 'deus'})), [self.sapiens.id])
+        self.assertEqual(self.ids(self.client.get(self.url, {'q': 'sapiens'})), [])
+
+    def test_filtros_y_orden_sobre_texto_completo(self):
+        response = self.client.get(self.url, {
+            'q': 'historia', 'categoria': 'hist', 'precio_min': '20', 'stock_min': '1'
+        })
+        self.assertEqual(self.ids(response), [self.sapiens.id])
+
+        response = self.client.get(self.url, {'q': 'historia', 'ordenar_por': 'precio', 'orden': 'asc'})
+        self.assertEqual(self.ids(response), [self.cien_anos.id, self.sapiens.id])
+
+    def test_modo_contiene(self):
+        response = self.client.get(self.url, {'q': 'ncipi', 'modo': 'contiene'})
+        self.assertEqual(self.ids(response), [self.principito.id])
+
+    def test_sin_texto_ordena_por_titulo(self):
+        response = self.client.get(self.url)
+        self.assertEqual(self.ids(response), [self.cien_anos.id, self.principito.id, self.sapiens.id])
+
+    @override_settings(BUSQUEDA_DIFUSA_MIN_RESULTADOS=3)
+    def test_busqueda_difusa_con_errores_de_escritura(self):
+        """Un autor mal escrito se encuentra por similitud de trigramas"""
+        response = self.client.get(self.url, {'q': 'Harrari'})
+        self.assertEqual(self.ids(response), [self.sapiens.id])
+
+    @override_settings(BUSQUEDA_DIFUSA_MIN_RESULTADOS=3)
+    def test_busqueda_difusa_respeta_filtros(self):
+        response = self.client.get(self.url, {'q': 'Harrari', 'categoria': 'Ficción'})
+        self.assertEqual(self.ids(response), [])
+
+    def test_busqueda_difusa_solo_con_pocos_resultados(self):
+        """Las coincidencias aproximadas solo completan búsquedas con pocos resultados exactos"""
+        homo_deus = Libro.objects.create(
+            titulo='Homo Deus', autor='Yuval Noah Harari', isbn='9788499926940',
+            categoria=self.historia, precio='28.00', año_publicacion=2015
+        )
+        with self.settings(BUSQUEDA_DIFUSA_MIN_RESULTADOS=1):
+            response = self.client.get(self.url, {'q': 'deus'})
+            self.assertEqual(self.ids(response), [homo_deus.id])
+        with self.settings(BUSQUEDA_DIFUSA_MIN_RESULTADOS=3):
+            response = self.client.get(self.url, {'q': 'deus'})
+            self.assertEqual(self.ids(response)[0], homo_deus.id)
+            self.assertIn(self.cien_anos.id, self.ids(response))
+
+    @override_settings(BUSQUEDA_DIFUSA_MIN_RESULTADOS=3)
+    def test_busqueda_difusa_respeta_el_orden_pedido(self):
+        """Las coincidencias aproximadas se mezclan con las exactas según ordenar_por/orden"""
+        homo_deus = Libro.objects.create(
+            titulo='Homo Deus', autor='Yuval Noah Harari', isbn='9788499926940',
+            categoria=self.historia, precio='28.00', año_publicacion=2015
+        )
+        # Ambos libros de Harari solo se encuentran por similitud; sin orden pedido irían por id
+        for orden, esperado in [('asc', [homo_deus.id, self.sapiens.id]), ('desc', [self.sapiens.id, homo_deus.id])]:
+            response = self.client.get(self.url, {'q': 'Harrari', 'ordenar_por': 'precio', 'orden': orden})
+            self.assertEqual(self.ids(response), esperado)
+
+        response = self.client.get(self.url, {'q': 'deus', 'ordenar_por': 'precio', 'orden': 'desc'})
+        precios = [Decimal(libro['precio']) for libro in response.data['results']]
+        self.assertIn(homo_deus.id, self.ids(response))
+        self.assertGreater(len(precios), 1)
+        self.assertEqual(precios, sorted(precios, reverse=True))
+
+    @override_settings(BUSQUEDA_DIFUSA_MIN_RESULTADOS=3, BUSQUEDA_DIFUSA_UMBRAL=0.9)
+    def test_umbral_de_similitud_configurable(self):
+        response = self.client.get(self.url, {'q': 'Harrari'})
+        self.assertEqual(self.ids(response), [])
+
+    def recorrer_paginas(self, params):
+        """Sigue los cursores 'next' y retorna los ids de todas las páginas"""
+        ids, paginas = [], 0
+        response = self.client.get(self.url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids += self.ids(response)
+            paginas += 1
+            if not response.data['next']:
+                return ids, paginas
+            response = self.client.get(response.data['next'])
+
+    def test_paginacion_por_cursor(self):
+        for i in range(7):
+            Libro.objects.create(
+                titulo=f'Tomo {i}', autor='Autor', isbn=f'97800000000{i:02d}',
+                categoria=self.historia, precio='10.00', año_publicacion=2000
+            )
+        esperado = list(Libro.objects.order_by('precio', 'id').values_list('id', flat=True))
+        ids, paginas = self.recorrer_paginas({'ordenar_por': 'precio', 'page_size': 3})
+        self.assertEqual(ids, esperado)
+        self.assertEqual(paginas, 4)
+
+        esperado = list(Libro.objects.order_by('-fecha_creacion', '-id').values_list('id', flat=True))
+        ids, _ = self.recorrer_paginas({'ordenar_por': 'fecha_creacion', 'orden': 'desc', 'page_size': 2})
+        self.assertEqual(ids, esperado)
+
+    def test_paginacion_por_relevancia(self):
+        ids, paginas = self.recorrer_paginas({'q': 'historia', 'page_size': 1})
+        self.assertEqual(sorted(ids), sorted([self.cien_anos.id, self.sapiens.id]))
+        self.assertEqual(paginas, 2)
+
+    def test_orden_por_popularidad(self):
+        Libro.objects.filter(pk=self.sapiens.pk).update(popularidad=7)
+        Libro.objects.filter(pk=self.principito.pk).update(popularidad=2.5)
+        incrementar_version_catalogo()
+        # Por defecto de mayor a menor, paginando por (popularidad, id)
+        response = self.client.get(self.url, {'ordenar_por': 'popularidad', 'page_size': 2})
+        self.assertEqual(self.ids(response), [self.sapiens.id, self.principito.id])
+        response = self.client.get(response.data['next'])
+        self.assertEqual(self.ids(response), [self.cien_anos.id])
+
+    def test_page_size_limitado(self):
+        with self.settings(BUSQUEDA_MAX_PAGE_SIZE=2):
+            response = self.client.get(self.url, {'page_size': 500})
+        self.assertEqual(response.data['page_size'], 2)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_parametros_invalidos(self):
+        response = self.client.get(self.url, {'cursor': 'no-es-un-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {'ordenar_por': 'descripcion'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(BUSQUEDA_ANALITICA_LOTE=100, BUSQUEDA_ANALITICA_INTERVALO=3600)
+    def test_analitica_en_lote(self):
+        """Las búsquedas se acumulan en memoria y se guardan juntas, sin los resultados completos"""
+        enviar_registros()
+        response = self.client.get(self.url, {'q': '  HISTORIA ', 'stock_min': '1', 'page_size': 1})
+        self.assertEqual(response.data['query'], '  HISTORIA ')
+        self.assertEqual(len(response.data['results']), 1)
+        self.client.get(self.url, {'q': 'sapiens'})
+        # La página siguiente no cuenta como una nueva búsqueda
+        self.client.get(response.data['next'])
+        self.assertEqual(SearchQuery.objects.count(), 0)
+
+        self.assertEqual(enviar_registros(), 2)
+        registro = SearchQuery.objects.get(query='historia')
+        self.assertEqual(registro.filtros, {'stock_min': '1'})
+        # Cuenta todas las coincidencias, no solo las de la primera página
+        self.assertEqual(registro.cantidad_resultados, 2)
+        self.assertEqual(registro.ids_resultados, self.ids(response))
+        self.assertEqual(SearchQuery.objects.get(query='sapiens').ids_resultados, [self.sapiens.id])
+
+    @override_settings(BUSQUEDA_ANALITICA_LOTE=2, BUSQUEDA_ANALITICA_INTERVALO=3600)
+    def test_analitica_se_envia_al_llenar_el_lote(self):
+        enviar_registros()
+        self.client.get(self.url, {'q': 'sapiens'})
+        self.assertEqual(SearchQuery.objects.count(), 0)
+        self.client.get(self.url, {'q': 'principito'})
+        self.assertEqual(SearchQuery.objects.count(), 2)
+
+    @override_settings(BUSQUEDA_ANALITICA_INTERVALO=3600)
+    def test_cache_de_resultados(self):
+        reiniciar_estadisticas()
+        params = {'q': 'historia', 'ordenar_por': 'precio'}
+        self.client.get(self.url, {'q': ' Historia ', 'ordenar_por': 'precio'})
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, params)
+        self.assertEqual(self.ids(response), [self.cien_anos.id, self.sapiens.id])
+
+        # Un cambio de precio invalida los resultados guardados
+        self.sapiens.precio = '5.00'
+        self.sapiens.save()
+        response = self.client.get(self.url, params)
+        self.assertEqual(self.ids(response), [self.sapiens.id, self.cien_anos.id])
+
+        # También un cambio de categoría
+        self.historia.nombre = 'Ensayo'
+        self.historia.save()
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.data['results'][0]['categoria'], 'Ensayo')
+
+        admin = get_user_model().objects.create_superuser(
+            username='admin', email='admin@example.com', password='clave-segura', numero_identificacion='1'
+        )
+        self.client.force_authenticate(admin)
+        stats = self.client.get(reverse('search-cache')).data
+        self.assertEqual(stats['aciertos'], 1)
+        self.assertEqual(stats['fallos'], 3)
+
+    def test_facetas(self):
+        Libro.objects.create(
+            titulo='Historia de dos ciudades', autor='Charles Dickens', isbn='9788491050711',
+            categoria=self.ficcion, editorial='Debate', precio='55.00', año_publicacion=1859
+        )
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {'q': 'historia', 'facetas': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total'], 3)
+        self.assertEqual(response.data['categoria'], [
+            {'valor': 'Ficción', 'cantidad': 2}, {'valor': 'Historia', 'cantidad': 1}
+        ])
+        self.assertEqual(response.data['editorial'][0], {'valor': 'Debate', 'cantidad': 2})
+        self.assertEqual(response.data['decada'], [
+            {'valor': 1850, 'cantidad': 1}, {'valor': 1960, 'cantidad': 1}, {'valor': 2010, 'cantidad': 1}
+        ])
+        self.assertEqual([rango['cantidad'] for rango in response.data['precio']], [0, 0, 2, 1, 0])
+        self.assertEqual(response.data['precio'][0], {'desde': None, 'hasta': 10.0, 'cantidad': 0})
+
+        # Los filtros se aplican antes de contar y los rangos de precio se pueden cambiar
+        response = self.client.get(self.url, {'facetas': '1', 'stock_min': '1', 'rangos_precio': '26,20'})
+        self.assertEqual(response.data['total'], 2)
+        self.assertEqual(response.data['precio'], [
+            {'desde': None, 'hasta': 20.0, 'cantidad': 0},
+            {'desde': 20.0, 'hasta': 26.0, 'cantidad': 1},
+            {'desde': 26.0, 'hasta': None, 'cantidad': 1},
+        ])
+        response = self.client.get(self.url, {'facetas': '1', 'rangos_precio': 'barato'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_autocompletar(self):
+        url = reverse('autocompletar')
+        self.client.get(url, {'q': 'a'})
+
+        # Una vez construido el índice no se consulta la base de datos
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {'q': 'Sole'})
+        self.assertEqual(response.data['sugerencias'], [{'tipo': 'titulo', 'texto': 'Cien años de soledad'}])
+        # Sin tildes, y primero lo que empieza con el texto
+        response = self.client.get(url, {'q': 'hist'})
+        self.assertEqual(response.data['sugerencias'], [{'tipo': 'categoria', 'texto': 'Historia'}])
+        response = self.client.get(url, {'q': 'garcia marq'})
+        self.assertEqual(response.data['sugerencias'], [{'tipo': 'autor', 'texto': 'Gabriel García Márquez'}])
+
+        # Los cambios llegan por señales, sin reconstruir el índice
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url, {'q': 'sa'}).data['sugerencias'][0]['texto'], 'Sapiens')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sapiens.titulo = 'Homo Deus'
+            self.sapiens.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.principito.delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url, {'q': 'sap'}).data['sugerencias'], [])
+            self.assertEqual(self.client.get(url, {'q': 'prin'}).data['sugerencias'], [])
+            self.assertEqual(self.client.get(url, {'q': 'deu'}).data['sugerencias'],
+                             [{'tipo': 'titulo', 'texto': 'Homo Deus'}])
+
+        # Un cambio que se revierte nunca llega al índice
+        try:
+            with transaction.atomic():
+                self.sapiens.titulo = 'Borrador'
+                self.sapiens.save()
+                raise DatabaseError
+        except DatabaseError:
+            pass
+        self.assertEqual(self.client.get(url, {'q': 'borr'}).data['sugerencias'], [])
+
+        # Si otro proceso cambió títulos, autores o categorías, el índice se reconstruye
+        incrementar_version_indice()
+        with self.assertNumQueries(2):
+            self.client.get(url, {'q': 'deu'})
+
+    def test_autocompletar_ignora_cambios_fuera_del_indice(self):
+        """Stock, precio o popularidad invalidan la caché de búsqueda pero no el índice de autocompletado"""
+        url = reverse('autocompletar')
+        self.client.get(url, {'q': 'a'})
+        version = version_indice()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sapiens.stock = 3
+            self.sapiens.save(update_fields=['stock', 'fecha_actualizacion'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cien_anos.precio = '19.99'
+            self.cien_anos.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.historia.descripcion = 'Libros de historia'
+            self.historia.save()
+        incrementar_version_catalogo()
+        self.assertEqual(version_indice(), version)
+        with self.assertNumQueries(0):
+            self.client.get(url, {'q': 'sa'})
+
+        # Renombrar una categoría sí llega al índice, sin reconstruirlo
+        with self.captureOnCommitCallbacks(execute=True):
+            self.historia.nombre = 'Ensayo'
+            self.historia.save()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url, {'q': 'ensa'}).data['sugerencias'],
+                             [{'tipo': 'categoria', 'texto': 'Ensayo'}])
+            self.assertEqual(self.client.get(url, {'q': 'hist'}).data['sugerencias'], [])
+
+    @override_settings(BUSQUEDA_ANALITICA_INTERVALO=3600)
+    def test_isbn_con_consulta_puntual(self):
+        """Un ISBN con guiones o en su forma de 10 dígitos se resuelve con una sola consulta"""
+        for isbn in ['978-0-307-47472-8', '0307474720', ' 978 0307474728 ']:
+            with self.assertNumQueries(1):
+                response = self.client.get(self.url, {'q': isbn})
+            self.assertEqual(self.ids(response), [self.cien_anos.id])
+            self.assertIsNone(response.data['next'])
+
+        # Si no hay coincidencia exacta se usa la búsqueda general
+        response = self.client.get(self.url, {'q': '9780307474', 'modo': 'contiene'})
+        self.assertEqual(self.ids(response), [self.cien_anos.id])
+        response = self.client.get(self.url, {'q': '978-0-307-47472-8', 'categoria': 'Historia'})
+        self.assertEqual(self.ids(response), [])
+
+    @override_settings(BUSQUEDA_ANALITICA_INTERVALO=3600)
+    def test_consultas_constantes(self):
+        """La categoría de cada resultado se obtiene en la misma consulta"""
+        for i in range(10):
+            Libro.objects.create(
+                titulo=f'Tomo {i}', autor='Autor', isbn=f'97800000000{i:02d}',
+                categoria=Categoria.objects.create(nombre=f'Colección {i}'), precio='10.00', año_publicacion=2000
+            )
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {'q': 'tomo'})
+        self.assertEqual(len(response.data['results']), 10)
+
+    def test_clic_en_resultado(self):
+        url = reverse('search-clic')
+        with self.assertNumQueries(1):
+            response = self.client.post(url, {'libro_id': self.cien_anos.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.client.post(url, {'libro_id': self.cien_anos.id}, format='json')
+        self.assertEqual(list(ActividadLibro.objects.values_list('libro_id', 'puntaje')), [(self.cien_anos.id, 1.0)])
+
+        self.assertEqual(self.client.post(url, {'libro_id': 'x'}, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.post(url, {'libro_id': 999999}, format='json').status_code, status.HTTP_404_NOT_FOUND)
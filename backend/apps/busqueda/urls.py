@@ -1,6 +1,9 @@
 from django.urls import path
-from .views import SearchView
+from .views import SearchView, SearchCacheStatsView, AutocompletarView, ClicBusquedaView
 
 urlpatterns = [
     path('search/', SearchView.as_view(), name='search'),
+    path('search/autocompletar/', AutocompletarView.as_view(), name='autocompletar'),
+    path('search/clic/', ClicBusquedaView.as_view(), name='search-clic'),
+    path('search/cache/', SearchCacheStatsView.as_view(), name='search-cache'),
 ]
@@ -1,20 +1,48 @@
+from django.conf import settings
 from django.shortcuts import render
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import AllowAny
-from django.db.models import Q
-from .models import SearchQuery
-from .serializers import SearchQuerySerializer
+from rest_framework.permissions import AllowAny, IsAdminUser
+from .analytics import registrar_busqueda
+from .autocomplete import obtener_indice
+from .cache import clave_busqueda, estadisticas, guardar_resultado, obtener_resultado
+from .serializers import SearchResponseSerializer
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 from apps.libros.models import Libro
+from apps.recomendaciones.tendencias import CLIC, sumar_actividad
+from rest_framework.utils.urls import replace_query_param
+from .pagination import CursorInvalido, paginar_keyset
+from .search import (
+    CAMPOS_ORDEN, MODO_CONTIENE, MODO_TEXTO, ORDEN_RELEVANCIA, ORDENES_DESCENDENTES, buscar_contiene, buscar_difuso,
+    buscar_texto_completo, calcular_facetas, convertidor_orden, filtrar_libros, normalizar_isbn
+)
+
+def serializar_resultado(libro):
+    """Representación de un libro en los resultados de búsqueda"""
+    return {
+        'id': libro.id,
+        'titulo': libro.titulo,
+        'autor': libro.autor,
+        'isbn': libro.isbn,
+        'precio': str(libro.precio),
+        'categoria': libro.categoria.nombre if libro.categoria else None,
+        'stock': libro.stock,
+        'editorial': libro.editorial,
+        'año_publicacion': libro.año_publicacion,
+        'descripcion': libro.descripcion,
+        'imagen_url': libro.portada_url
+    }
 
 class SearchView(APIView):
     permission_classes = [AllowAny]  # Permitir búsqueda sin autenticación
     
     @extend_schema(
-        description="Realiza una búsqueda de libros con filtros opcionales",
+        description="Realiza una búsqueda de libros con filtros opcionales. Si la búsqueda de texto completo "
+                    "devuelve pocos resultados, se completa con coincidencias aproximadas por título y autor, mezcladas en "
+                    "el orden pedido (por relevancia van después de las exactas, de mayor a menor similitud). "
+                    "Con facetas=true retorna en cambio los conteos por categoría, editorial, década y rango de precio.",
         parameters=[
             OpenApiParameter(
                 name='q',
@@ -22,6 +50,12 @@ class SearchView(APIView):
                 description="Término de búsqueda (título, autor o ISBN). Opcional si se usan otros filtros.",
                 required=False
             ),
+            OpenApiParameter(
+                name='modo',
+                type=OpenApiTypes.STR,
+                description="Modo de búsqueda: 'texto' (texto completo con ranking, por defecto) o 'contiene' (coincidencia parcial)",
+                required=False
+            ),
             OpenApiParameter(
                 name='categoria',
                 type=OpenApiTypes.STR,
@@ -49,7 +83,9 @@ class SearchView(APIView):
             OpenApiParameter(
                 name='ordenar_por',
                 type=OpenApiTypes.STR,
-                description="Campo por el cual ordenar los resultados",
+                description="Campo por el cual ordenar los resultados: titulo, autor, editorial, precio, stock, "
+                            "año_publicacion, fecha_creacion, popularidad (ventas y reservas recientes) o relevancia. "
+                            "Con 'q' en modo texto, por defecto 'relevancia'",
                 required=False
             ),
             OpenApiParameter(
@@ -57,83 +93,205 @@ class SearchView(APIView):
                 type=OpenApiTypes.STR,
                 description="Dirección del ordenamiento (asc o desc)",
                 required=False
+            ),
+            OpenApiParameter(
+                name='page_size',
+                type=OpenApiTypes.INT,
+                description="Cantidad de resultados por página (máximo configurable, 100 por defecto)",
+                required=False
+            ),
+            OpenApiParameter(
+                name='facetas',
+                type=OpenApiTypes.BOOL,
+                description="Retornar los conteos por faceta de la búsqueda en lugar de los resultados",
+                required=False
+            ),
+            OpenApiParameter(
+                name='rangos_precio',
+                type=OpenApiTypes.STR,
+                description="Límites de los rangos de precio de las facetas separados por coma (ej: 10,20,50)",
+                required=False
+            ),
+            OpenApiParameter(
+                name='cursor',
+                type=OpenApiTypes.STR,
+                description="Cursor opaco devuelto en 'next' para obtener la página siguiente",
+                required=False
             )
         ],
-        responses={200: SearchQuerySerializer}
+        responses={200: SearchResponseSerializer}
     )
     def get(self, request, format=None):
-        # Iniciar la consulta base
-        libros = Libro.objects.all()
+        # Iniciar la consulta base con los filtros adicionales
+        base = filtrar_libros(Libro.objects.select_related('categoria'), request.query_params)
+        libros = base
 
         # Aplicar búsqueda por texto si se proporciona
         query = request.query_params.get('q', None)
+        modo = request.query_params.get('modo', MODO_TEXTO)
         if query:
-            libros = libros.filter(
-                Q(titulo__icontains=query) |
-                Q(autor__icontains=query) |
-                Q(isbn__icontains=query) |
-                Q(descripcion__icontains=query) |
-                Q(editorial__icontains=query)
+            if modo == MODO_CONTIENE:
+                libros = buscar_contiene(libros, query)
+            else:
+                libros = buscar_texto_completo(libros, query)
+            
+        if request.query_params.get('facetas') in ('true', '1'):
+            return self.facetas(request, libros, query)
+
+        # Ordenamiento: por relevancia cuando hay búsqueda de texto completo
+        texto_completo = bool(query) and modo != MODO_CONTIENE
+        ordenar_por = request.query_params.get('ordenar_por', ORDEN_RELEVANCIA if texto_completo else 'titulo')
+        if ordenar_por == ORDEN_RELEVANCIA and not texto_completo:
+            ordenar_por = 'titulo'
+        if ordenar_por not in CAMPOS_ORDEN + [ORDEN_RELEVANCIA]:
+            return Response(
+                {"error": f"No se puede ordenar por '{ordenar_por}'. Opciones: {', '.join(CAMPOS_ORDEN + [ORDEN_RELEVANCIA])}"},
+                status=status.HTTP_400_BAD_REQUEST
             )
+        orden = request.query_params.get('orden', 'desc' if ordenar_por in ORDENES_DESCENDENTES else 'asc')
 
-        # Aplicar filtros adicionales
-        categoria = request.query_params.get('categoria', None)
-        if categoria:
-            libros = libros.filter(categoria__nombre__icontains=categoria)
+        try:
+            page_size = int(request.query_params.get('page_size', settings.BUSQUEDA_PAGE_SIZE))
+        except ValueError:
+            return Response({"error": "page_size debe ser un número entero"}, status=status.HTTP_400_BAD_REQUEST)
+        page_size = max(1, min(page_size, settings.BUSQUEDA_MAX_PAGE_SIZE))
 
-        precio_min = request.query_params.get('precio_min', None)
-        if precio_min:
-            libros = libros.filter(precio__gte=float(precio_min))
+        cursor = request.query_params.get('cursor', None)
 
-        precio_max = request.query_params.get('precio_max', None)
-        if precio_max:
-            libros = libros.filter(precio__lte=float(precio_max))
+        # Un ISBN (p. ej. de un lector de código de barras) se resuelve con el índice único de isbn
+        candidatos = normalizar_isbn(query) if query and not cursor else None
+        if candidatos:
+            libro = base.filter(isbn__in=candidatos).first()
+            if libro:
+                results = [serializar_resultado(libro)]
+                registrar_busqueda(query, request.query_params, results, 1)
+                return Response(
+                    {'query': query, 'results': results, 'page_size': page_size, 'next': None},
+                    status=status.HTTP_200_OK
+                )
 
-        stock_min = request.query_params.get('stock_min', None)
-        if stock_min:
-            libros = libros.filter(stock__gte=int(stock_min))
-            
-        # Ordenamiento
-        ordenar_por = request.query_params.get('ordenar_por', 'titulo')
-        orden = request.query_params.get('orden', 'asc')
-        
-        if orden == 'desc':
-            ordenar_por = f'-{ordenar_por}'
-        
-        libros = libros.order_by(ordenar_por)
-
-        # No requerir criterios de búsqueda - mostrar todos si no hay filtros
-        # Remover esta validación para permitir ver todos los libros
+        # Resultados en caché: la clave incluye la versión del catálogo
+        clave = clave_busqueda(request.query_params, page_size)
+        resultado = obtener_resultado(clave)
+        if resultado is None:
+            resultado = self.buscar(libros, base, query, texto_completo, ordenar_por, orden, page_size, cursor)
+            if isinstance(resultado, Response):
+                return resultado
+            guardar_resultado(clave, resultado)
+        results, siguiente = resultado['results'], resultado['siguiente']
+
+        # Registrar la búsqueda para analítica (solo la primera página; se guarda en lote)
+        if not cursor:
+            registrar_busqueda(query, request.query_params, results, resultado['total'])
+
+        return Response({
+            'query': query,
+            'results': results,
+            'page_size': page_size,
+            'next': replace_query_param(request.build_absolute_uri(), 'cursor', siguiente) if siguiente else None,
+        }, status=status.HTTP_200_OK)
+
+    def buscar(self, libros, base, query, texto_completo, ordenar_por, orden, page_size, cursor):
         """
-        if not any([query, categoria, precio_min, precio_max, stock_min]):
-            return Response(
-                {"error": "Debe proporcionar al menos un criterio de búsqueda (q, categoria, precio_min, precio_max o stock_min)"}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        Ejecuta la búsqueda y retorna la página de resultados, el cursor de la siguiente y, en la primera
+        página, el total de coincidencias para la analítica (se guarda en caché junto con la página)
         """
+        coincidencias = libros
+        # Paginación por keyset sobre (ordenar_por, id)
+        try:
+            libros, siguiente = paginar_keyset(
+                libros, ordenar_por, orden == 'desc', page_size,
+                cursor=cursor, convertir=convertidor_orden(ordenar_por)
+            )
+        except CursorInvalido:
+            return Response({"error": "Cursor inválido"}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Si el texto completo casi no encuentra nada, completar con coincidencias aproximadas
+        # (solo en la primera página; con tan pocos resultados no hay página siguiente)
+        restantes = min(settings.BUSQUEDA_DIFUSA_LIMITE, page_size - len(libros))
+        if texto_completo and not cursor and len(libros) < settings.BUSQUEDA_DIFUSA_MIN_RESULTADOS and restantes > 0:
+            encontrados = [libro.id for libro in libros]
+            difusos = buscar_difuso(base.exclude(id__in=encontrados), query, restantes)
+            if difusos and ordenar_por != ORDEN_RELEVANCIA:
+                # Mezclar ambos grupos en el orden pedido; la base ordena igual que paginar_keyset
+                # (misma collation para los textos), sobre como mucho page_size ids
+                campo = f'-{ordenar_por}' if orden == 'desc' else ordenar_por
+                libros = list(base.filter(
+                    id__in=encontrados + [libro.id for libro in difusos]
+                ).order_by(campo, '-id' if orden == 'desc' else 'id'))
+            else:
+                # Por relevancia las coincidencias aproximadas no tienen rango de texto completo:
+                # van después de las exactas, de mayor a menor similitud
+                libros += difusos
+
+        results = [serializar_resultado(libro) for libro in libros]
+        total = None
+        if not cursor:
+            # Si todo entra en la primera página no hace falta contar
+            total = coincidencias.count() if siguiente else len(results)
+        return {'results': results, 'siguiente': siguiente, 'total': total}
+
+    def facetas(self, request, libros, query):
+        """Conteos por faceta de los libros que cumplen la búsqueda y los filtros"""
+        rangos = request.query_params.get('rangos_precio', None)
+        if rangos:
+            try:
+                limites = sorted({float(limite) for limite in rangos.split(',')})
+            except ValueError:
+                return Response(
+                    {"error": "rangos_precio debe ser una lista de números separados por coma"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        else:
+            limites = sorted(settings.BUSQUEDA_FACETAS_PRECIOS)
+
+        clave = clave_busqueda(request.query_params, None)
+        facetas = obtener_resultado(clave)
+        if facetas is None:
+            facetas = calcular_facetas(libros, limites)
+            guardar_resultado(clave, facetas)
+        return Response({'query': query, **facetas}, status=status.HTTP_200_OK)
 
-        # Preparar resultados
-        results = []
-        for libro in libros:
-            results.append({
-                'id': libro.id,
-                'titulo': libro.titulo,
-                'autor': libro.autor,
-                'isbn': libro.isbn,
-                'precio': str(libro.precio),
-                'categoria': libro.categoria.nombre if libro.categoria else None,
-                'stock': libro.stock,
-                'editorial': libro.editorial,
-                'año_publicacion': libro.año_publicacion,
-                'descripcion': libro.descripcion,
-                'imagen_url': libro.portada.url if libro.portada else None
-            })
-
-        # Guardar la consulta y resultados (opcional, podrías hacer esto condicional)
-        search_query = SearchQuery.objects.create(
-            query=query or "Consulta sin texto de búsqueda",
-            results=results
-        )
-        
-        serializer = SearchQuerySerializer(search_query)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+class AutocompletarView(APIView):
+    permission_classes = [AllowAny]
+
+    @extend_schema(
+        description="Sugerencias mientras se escribe: títulos, autores y categorías con una palabra que empieza "
+                    "con el texto. Se responde desde un índice en memoria, sin consultar la base de datos.",
+        parameters=[
+            OpenApiParameter(name='q', type=OpenApiTypes.STR, description="Texto escrito hasta el momento", required=True),
+            OpenApiParameter(name='limite', type=OpenApiTypes.INT, description="Cantidad máxima de sugerencias", required=False),
+        ]
+    )
+    def get(self, request, format=None):
+        query = request.query_params.get('q', '')
+        try:
+            limite = int(request.query_params.get('limite', settings.BUSQUEDA_AUTOCOMPLETAR_LIMITE))
+        except ValueError:
+            return Response({"error": "limite debe ser un número entero"}, status=status.HTTP_400_BAD_REQUEST)
+        limite = max(1, min(limite, settings.BUSQUEDA_AUTOCOMPLETAR_MAX_LIMITE))
+        return Response({'query': query, 'sugerencias': obtener_indice().buscar(query, limite)})
+
+class ClicBusquedaView(APIView):
+    permission_classes = [AllowAny]
+
+    @extend_schema(
+        description="Registra que el usuario abrió un libro desde los resultados de búsqueda "
+                    "(cuenta para las tendencias). Cuerpo: {\"libro_id\": 1}.",
+        request={'application/json': {'type': 'object', 'properties': {'libro_id': {'type': 'integer'}}}},
+        responses={204: None}
+    )
+    def post(self, request, format=None):
+        libro_id = request.data.get('libro_id') if isinstance(request.data, dict) else None
+        if isinstance(libro_id, bool) or not isinstance(libro_id, int):
+            return Response({"error": "libro_id debe ser un número entero"}, status=status.HTTP_400_BAD_REQUEST)
+        if not sumar_actividad(libro_id, CLIC):
+            return Response({"error": "Libro no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class SearchCacheStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(description="Aciertos y fallos de la caché de búsqueda, para dimensionarla")
+    def get(self, request, format=None):
+        return Response(estadisticas())
@@ -4,3 +4,6 @@ class ComprasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.compras'
     verbose_name = 'Gestión de Compras'
+
+    def ready(self):
+        import apps.compras.signals
@@ -0,0 +1,19 @@
+from config.consultas import registrar_consulta
+from .models import CarritoLibro, Pedidos, Reserva
+
+TAMANO_PAGINA = 50
+
+@registrar_consulta('compras.pedidos_usuario')
+def consulta_pedidos_usuario():
+    usuario_id = Pedidos.objects.order_by().values_list('usuario_id', flat=True).first()
+    return Pedidos.objects.filter(usuario_id=usuario_id).order_by('-id')[:TAMANO_PAGINA]
+
+@registrar_consulta('compras.reservas_usuario')
+def consulta_reservas_usuario():
+    usuario_id = Reserva.objects.order_by().values_list('usuario_id', flat=True).first()
+    return Reserva.objects.filter(usuario_id=usuario_id).select_related('libro').order_by('-id')[:TAMANO_PAGINA]
+
+@registrar_consulta('compras.libros_carrito')
+def consulta_libros_carrito():
+    carrito_id = CarritoLibro.objects.order_by().values_list('carrito_id', flat=True).first()
+    return CarritoLibro.objects.filter(carrito_id=carrito_id).select_related('libro')
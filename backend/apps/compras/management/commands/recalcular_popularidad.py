@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from apps.compras.popularidad import recalcular_popularidad
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula la popularidad de los libros con las ventas y reservas de la ventana configurada "
+        "(POPULARIDAD_VENTANA_DIAS). Pensado para ejecutarse periódicamente (p. ej. cada hora con cron)."
+    )
+
+    def handle(self, *args, **options):
+        actualizados = recalcular_popularidad()
+        self.stdout.write(self.style.SUCCESS(
+            f"Popularidad recalculada (ventana de {settings.POPULARIDAD_VENTANA_DIAS} días): "
+            f"{actualizados} libros cambiaron."
+        ))
@@ -58,7 +58,7 @@ class Carrito(models.Model):
     
     def obtener_libros(self):
         """Devuelve una lista de los libros en el carrito"""
-        return CarritoLibro.objects.filter(carrito=self).all()
+        return CarritoLibro.objects.filter(carrito=self).select_related('libro')
     
     def pagar(self):
         """Método para implementar la funcionalidad de pago"""
@@ -80,7 +80,7 @@ class Carrito(models.Model):
             for carrito_libro in CarritoLibro.objects.filter(carrito=self):
                 if carrito_libro.libro.stock >= carrito_libro.cantidad:
                     carrito_libro.libro.stock -= carrito_libro.cantidad
-                    carrito_libro.libro.save()
+                    carrito_libro.libro.save(update_fields=['stock', 'fecha_actualizacion'])
                 else:
                     return {
                         "estado": "error",
@@ -166,7 +166,7 @@ class Reserva(models.Model):
             fecha_expiracion=timezone.now() + timedelta(days=1)  # Expira en 1 día
         )
         libro.stock -= cantidad
-        libro.save()
+        libro.save(update_fields=['stock', 'fecha_actualizacion'])
         return {
             "estado": "exito",
             "mensaje": f"Reserva creada para {cantidad} copias de {libro.titulo}.",
@@ -180,7 +180,7 @@ class Reserva(models.Model):
         if self.estado == 'Reservado':
             self.estado = 'Cancelado'
             self.libro.stock += self.cantidad
-            self.libro.save()
+            self.libro.save(update_fields=['stock', 'fecha_actualizacion'])
             self.save()
             return {
                 "estado": "exito",
@@ -199,7 +199,7 @@ class Reserva(models.Model):
         if timezone.now() > self.fecha_expiracion:
             self.estado = 'Expirado'
             self.libro.stock += self.cantidad
-            self.libro.save()
+            self.libro.save(update_fields=['stock', 'fecha_actualizacion'])
             self.save()
             return {
                 "estado": "exito",
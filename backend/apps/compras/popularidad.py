@@ -0,0 +1,70 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from apps.busqueda.cache import incrementar_version_catalogo
+from apps.libros.models import Libro
+from .models import PedidoLibro, Pedidos, Reserva
+
+def invalidar_orden_popularidad():
+    """
+    Los UPDATE de popularidad no envían señales: se invalidan las búsquedas en caché y el ETag del catálogo
+    para que el orden por popularidad no quede desactualizado. El índice de autocompletado tiene su propia
+    versión y no se toca.
+    """
+    incrementar_version_catalogo()
+
+def sumar_popularidad(libro_id, puntos):
+    """
+    Suma puntos a la popularidad de un libro cuando se confirma la transacción.
+    Es un UPDATE con F(), atómico aunque varios procesos vendan el mismo libro a la vez.
+    Las ventas y reservas que salen de la ventana se descuentan en el recálculo periódico.
+    """
+    def sumar():
+        if Libro.objects.filter(pk=libro_id).update(popularidad=F('popularidad') + puntos):
+            invalidar_orden_popularidad()
+    transaction.on_commit(sumar)
+
+def recalcular_popularidad(ahora=None):
+    """
+    Recalcula la popularidad de todos los libros con las ventas (pedidos no cancelados) y reservas
+    de los últimos POPULARIDAD_VENTANA_DIAS días, en un solo UPDATE.
+    Solo escribe los libros cuyo valor cambia; si alguno cambió invalida la caché del catálogo una vez.
+    Retorna cuántos fueron.
+    """
+    desde = (ahora or timezone.now()) - timedelta(days=settings.POPULARIDAD_VENTANA_DIAS)
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            WITH ventas AS (
+                SELECT pl.libro_id, SUM(pl.cantidad) AS unidades
+                FROM {PedidoLibro._meta.db_table} pl
+                JOIN {Pedidos._meta.db_table} p ON p.id = pl.pedido_id
+                WHERE p.fecha >= %(desde)s AND p.estado <> 'Cancelado'
+                GROUP BY pl.libro_id
+            ), reservas AS (
+                SELECT libro_id, SUM(cantidad) AS unidades
+                FROM {Reserva._meta.db_table}
+                WHERE fecha_reserva >= %(desde)s
+                GROUP BY libro_id
+            ), puntajes AS (
+                SELECT libro.id,
+                       COALESCE(ventas.unidades, 0) * %(peso_venta)s
+                       + COALESCE(reservas.unidades, 0) * %(peso_reserva)s AS popularidad
+                FROM {Libro._meta.db_table} libro
+                LEFT JOIN ventas ON ventas.libro_id = libro.id
+                LEFT JOIN reservas ON reservas.libro_id = libro.id
+            )
+            UPDATE {Libro._meta.db_table} AS libro
+            SET popularidad = puntajes.popularidad
+            FROM puntajes
+            WHERE libro.id = puntajes.id AND libro.popularidad IS DISTINCT FROM puntajes.popularidad
+        """, {
+            'desde': desde,
+            'peso_venta': settings.POPULARIDAD_PESO_VENTA,
+            'peso_reserva': settings.POPULARIDAD_PESO_RESERVA,
+        })
+        actualizados = cursor.rowcount
+    if actualizados:
+        invalidar_orden_popularidad()
+    return actualizados
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import Carrito, HistorialDeCompras, Pedidos, CarritoLibro, PedidoLibro, Reserva
 from apps.libros.models import Libro
+from apps.libros.serializers import CamposDinamicosMixin
 
 class CarritoSerializer(serializers.ModelSerializer):
     class Meta:
@@ -20,10 +21,10 @@ class PedidosSerializer(serializers.ModelSerializer):
         read_only_fields = ('fecha',)  # Debe ser una tupla con coma al final si solo hay un elemento
         
     
-class LibroSerializer(serializers.ModelSerializer):
+class LibroSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     class Meta:
         model = Libro
-        fields = '__all__'
+        exclude = ['search_vector']
 
 class PedidoLibroSerializer(serializers.ModelSerializer):
     libro = LibroSerializer(read_only=True)  # Muestra el objeto libro completo
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from .models import PedidoLibro, Reserva
+from .popularidad import sumar_popularidad
+
+@receiver(post_save, sender=PedidoLibro)
+def popularidad_por_venta(sender, instance, created, **kwargs):
+    """Cada libro de un pedido nuevo suma a su popularidad"""
+    if created:
+        sumar_popularidad(instance.libro_id, instance.cantidad * settings.POPULARIDAD_PESO_VENTA)
+
+@receiver(post_save, sender=Reserva)
+def popularidad_por_reserva(sender, instance, created, **kwargs):
+    """Cada reserva nueva suma a la popularidad del libro"""
+    if created:
+        sumar_popularidad(instance.libro_id, instance.cantidad * settings.POPULARIDAD_PESO_RESERVA)
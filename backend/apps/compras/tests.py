@@ -1,3 +1,143 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+from apps.busqueda.cache import version_catalogo
+from apps.libros.models import Libro, Categoria
+from apps.finanzas.models import Saldo
+from .models import Carrito, HistorialDeCompras, PedidoLibro, Pedidos, Reserva
+from .popularidad import recalcular_popularidad, sumar_popularidad
 
-# Create your tests here.
+User = get_user_model()
+
+class ConsultasComprasTests(APITestCase):
+    """La cantidad de consultas SQL por endpoint no depende de la cantidad de libros o pedidos"""
+
+    def setUp(self):
+        self.usuario = User.objects.create_user(
+            username='lector', email='lector@test.com', password='testpass123', numero_identificacion='200'
+        )
+        self.client.force_authenticate(self.usuario)
+        self.categoria = Categoria.objects.create(nombre='General')
+        self.carrito = Carrito.objects.get(usuario=self.usuario)
+        self.total = 0
+
+    def agregar(self, cantidad):
+        """Crea libros y, con cada uno, un pedido, una reserva, una línea del carrito y un historial"""
+        for i in range(self.total, self.total + cantidad):
+            libro = Libro.objects.create(
+                titulo=f'Libro {i}', autor='Autor', isbn=f'9780000000{i:03d}',
+                categoria=self.categoria, precio='10.00', stock=5, año_publicacion=2000
+            )
+            pedido = Pedidos.objects.create(usuario=self.usuario)
+            PedidoLibro.objects.create(pedido=pedido, libro=libro, cantidad=1)
+            HistorialDeCompras.objects.create(usuario=self.usuario, pedido=pedido)
+            Reserva.objects.create(usuario=self.usuario, libro=libro, cantidad=1)
+            self.carrito.agregar_libro(libro, 1)
+        self.total += cantidad
+
+    def assertConsultasConstantes(self, url, consultas):
+        self.agregar(2)
+        with self.assertNumQueries(consultas):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.agregar(8)
+        with self.assertNumQueries(consultas):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data), 10)
+        return response
+
+    def test_libros_del_carrito(self):
+        response = self.assertConsultasConstantes(reverse('carrito-obtener-libros'), 2)
+        self.assertIn('Libro 0', [item['libro']['titulo'] for item in response.data])
+
+    def test_campos_del_libro_anidado(self):
+        self.agregar(1)
+        response = self.client.get(reverse('pedidos-list'), {'fields': 'pedidolibro_set.libro.titulo,pedidolibro_set.libro.precio'})
+        self.assertEqual(response.data[0]['pedidolibro_set'][0]['libro'], {'titulo': 'Libro 0', 'precio': '10.00'})
+        response = self.client.get(reverse('carrito-obtener-libros'), {'omit': 'libro.descripcion'})
+        self.assertNotIn('descripcion', response.data[0]['libro'])
+        self.assertIn('cantidad', response.data[0])
+
+    def test_pedidos(self):
+        self.assertConsultasConstantes(reverse('pedidos-list'), 3)
+
+    def test_historial_de_pedidos(self):
+        response = self.assertConsultasConstantes(reverse('pedidos-historial-pedidos'), 3)
+        self.assertEqual(len(response.data[0]['pedidolibro_set']), 1)
+
+    def test_reservas(self):
+        self.assertConsultasConstantes(reverse('reserva-list'), 1)
+
+    def test_historial_de_compras(self):
+        response = self.assertConsultasConstantes(reverse('historial-compras-list'), 3)
+        self.assertEqual(len(response.data[0]['pedido']['pedidolibro_set']), 1)
+
+@override_settings(POPULARIDAD_PESO_VENTA=1.0, POPULARIDAD_PESO_RESERVA=0.5, POPULARIDAD_VENTANA_DIAS=30)
+class PopularidadTests(APITestCase):
+    def setUp(self):
+        self.usuario = User.objects.create_user(
+            username='comprador', email='comprador@test.com', password='testpass123', numero_identificacion='300'
+        )
+        Saldo.objects.get(usuario=self.usuario).recargar_saldo(1000)
+        categoria = Categoria.objects.create(nombre='General')
+        self.libros = [
+            Libro.objects.create(
+                titulo=f'Libro {i}', autor='Autor', isbn=f'9780000001{i:03d}',
+                categoria=categoria, precio='10.00', stock=10, año_publicacion=2000
+            )
+            for i in range(3)
+        ]
+
+    def popularidad(self, libro):
+        libro.refresh_from_db()
+        return libro.popularidad
+
+    def test_suma_al_pagar_y_reservar(self):
+        carrito = Carrito.objects.get(usuario=self.usuario)
+        carrito.agregar_libro(self.libros[1], 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(carrito.pagar()['estado'], 'exito')
+        self.assertEqual(self.popularidad(self.libros[1]), 2.0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Reserva().reservar_libro(self.libros[2], self.usuario, 1)
+        self.assertEqual(self.popularidad(self.libros[2]), 0.5)
+
+        # Ordenar por popularidad lee solo la columna indexada
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('libro-list'), {'ordering': '-popularidad'})
+        self.assertEqual([libro['titulo'] for libro in response.data], ['Libro 1', 'Libro 2', 'Libro 0'])
+
+    def test_recalcular_ventana(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            reciente = Pedidos.objects.create(usuario=self.usuario)
+            PedidoLibro.objects.create(pedido=reciente, libro=self.libros[0], cantidad=3)
+            antiguo = Pedidos.objects.create(usuario=self.usuario)
+            PedidoLibro.objects.create(pedido=antiguo, libro=self.libros[1], cantidad=5)
+            cancelado = Pedidos.objects.create(usuario=self.usuario, estado='Cancelado')
+            PedidoLibro.objects.create(pedido=cancelado, libro=self.libros[2], cantidad=4)
+        Pedidos.objects.filter(pk=antiguo.pk).update(fecha=timezone.now() - timedelta(days=31))
+        self.assertEqual(self.popularidad(self.libros[1]), 5.0)
+
+        version = version_catalogo()
+        salida = StringIO()
+        call_command('recalcular_popularidad', stdout=salida)
+        self.assertIn('2 libros cambiaron', salida.getvalue())
+        self.assertEqual([self.popularidad(libro) for libro in self.libros], [3.0, 0.0, 0.0])
+        # El orden por popularidad cambió: las búsquedas en caché y el ETag del catálogo se invalidan
+        self.assertEqual(version_catalogo(), version + 1)
+        self.assertEqual(recalcular_popularidad(), 0)
+        self.assertEqual(version_catalogo(), version + 1)
+
+    def test_sumar_invalida_la_cache(self):
+        version = version_catalogo()
+        with self.captureOnCommitCallbacks(execute=True):
+            sumar_popularidad(self.libros[0].id, 1.0)
+        self.assertEqual(self.popularidad(self.libros[0]), 1.0)
+        self.assertEqual(version_catalogo(), version + 1)
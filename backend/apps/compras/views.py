@@ -1,5 +1,7 @@
+from django.conf import settings
 from django.shortcuts import get_object_or_404, render
 from apps.libros.models import Libro
+from apps.libros.serializers import tarjetas, valores_tarjeta
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -89,9 +91,40 @@ class CarritoViewSet(viewsets.ModelViewSet):
     def obtener_libros(self, request):
         carrito = Carrito.objects.get(usuario=request.user)
         libros = carrito.obtener_libros()
-        serializer = CarritoLibroSerializer(libros, many=True)
+        serializer = CarritoLibroSerializer(libros, many=True, context={'request': request})
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @extend_schema(
+        description="Libros que suelen comprarse junto con los del carrito y que todavía no están en él, de mayor "
+                    "a menor confianza. Las reglas se minan periódicamente con manage.py minar_reglas.",
+        parameters=[
+            OpenApiParameter(
+                name='limite',
+                type=int,
+                description="Cantidad máxima de libros (por defecto y como máximo RECOMENDACIONES_REGLAS_SUGERENCIAS)",
+                required=False
+            ),
+        ],
+        responses={200: "Libros: []", 400: None}
+    )
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
+    def sugerencias(self, request):
+        from apps.recomendaciones.reglas import sugerencias_carrito
+        try:
+            limite = int(request.query_params.get('limite', settings.RECOMENDACIONES_REGLAS_SUGERENCIAS))
+        except ValueError:
+            return Response({"error": "El límite debe ser un número entero"}, status=status.HTTP_400_BAD_REQUEST)
+        if limite < 1:
+            return Response({"error": "El límite debe ser mayor que cero"}, status=status.HTTP_400_BAD_REQUEST)
+
+        libros = valores_tarjeta(sugerencias_carrito(request.user), 'confianza', 'lift')[
+            :min(limite, settings.RECOMENDACIONES_REGLAS_SUGERENCIAS)
+        ]
+        return Response([
+            {**tarjeta, 'confianza': round(fila['confianza'], 4), 'lift': round(fila['lift'], 4)}
+            for tarjeta, fila in zip(tarjetas(libros), libros)
+        ], status=status.HTTP_200_OK)
+
     @extend_schema(description="Pagar", responses={200: "Carrito pagado con exito", 400: None})
     @action(detail=False, methods=['post'])
     def pagar(self, request):
@@ -105,9 +138,10 @@ class PedidoViewSet(viewsets.ModelViewSet):
     ViewSet para gestionar pedidos.
     Este ViewSet permite a los usuarios ver su historial de pedidos y obtener detalles de cada pedido.
     """
-    queryset = Pedidos.objects.all()
+    queryset = Pedidos.objects.prefetch_related('pedidolibro_set__libro')
     serializer_class = PedidosSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    ordering = '-id'  # Clave primaria: la paginación por cursor recorre su índice
     
     @extend_schema(
         description="Obtiene el historial de pedidos del usuario",
@@ -121,9 +155,8 @@ class PedidoViewSet(viewsets.ModelViewSet):
         Este método devuelve una lista de todos los pedidos realizados por el usuario.
         """
         from .models import Pedidos
-        pedidos = Pedidos.objects.filter(usuario=request.user)
-        serializer = PedidosSerializer(pedidos, many=True)
-        PedidoLibroSerializer(pedidos, many=True)
+        pedidos = Pedidos.objects.filter(usuario=request.user).prefetch_related('pedidolibro_set__libro')
+        serializer = PedidosSerializer(pedidos, many=True, context={'request': request})
         return Response(serializer.data, status=status.HTTP_200_OK)
     
     @extend_schema(
@@ -179,7 +212,7 @@ class PedidoViewSet(viewsets.ModelViewSet):
             return Response({"error": "Pedido no encontrado"}, status=status.HTTP_404_NOT_FOUND)
     
 class ReservaViewSet(viewsets.ModelViewSet):
-    queryset = Reserva.objects.all()
+    queryset = Reserva.objects.select_related('libro')
     serializer_class = ReservaSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     
@@ -189,7 +222,7 @@ class ReservaViewSet(viewsets.ModelViewSet):
     )
     def get_queryset(self):
         # Solo mostrar reservas del usuario autenticado
-        return Reserva.objects.filter(usuario=self.request.user)
+        return Reserva.objects.filter(usuario=self.request.user).select_related('libro')
 
     @extend_schema(
         description="Crea una nueva reserva de libro",
@@ -266,7 +299,9 @@ class HistorialDeComprasViewSet(viewsets.ReadOnlyModelViewSet):
 
     def get_queryset(self):
         # Solo muestra el historial del usuario autenticado
-        return HistorialDeCompras.objects.filter(usuario=self.request.user).select_related('pedido').order_by('-fecha')
+        return HistorialDeCompras.objects.filter(usuario=self.request.user).select_related('pedido').prefetch_related(
+            'pedido__pedidolibro_set__libro'
+        ).order_by('-fecha')
     
     @extend_schema(
         description="Obtiene el historial de compras del usuario autenticado",
@@ -274,7 +309,7 @@ class HistorialDeComprasViewSet(viewsets.ReadOnlyModelViewSet):
     )
     def listar_historial(self, request):
         queryset = self.get_queryset()
-        return Response(HistorialDeComprasSerializer(queryset, many=True).data)
+        return Response(HistorialDeComprasSerializer(queryset, many=True, context={'request': request}).data)
     
     @extend_schema(
         description="Devolucion de una compra",
@@ -205,6 +205,7 @@ class HistorialSaldoViewSet(viewsets.ReadOnlyModelViewSet):
     """
     serializer_class = HistorialSaldoSerializer
     permission_classes = [IsAuthenticated]
+    ordering = '-id'  # Mismo orden que '-fecha', sobre el índice de la clave primaria
     
     def get_queryset(self):
         """
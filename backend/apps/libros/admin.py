@@ -33,11 +33,9 @@ class LibroAdmin(admin.ModelAdmin):
 
     def portada_preview(self, obj):
         """Muestra una vista previa de la portada en el admin"""
-        if obj.portada:
-            try:
-                return mark_safe(f'<img src="{obj.portada.url}" style="max-height: 100px; max-width: 70px;" />')
-            except:
-                return "Error al cargar imagen"
+        url = obj.portada_miniaturas.get('pequena') or obj.portada_url
+        if url:
+            return mark_safe(f'<img src="{url}" style="max-height: 100px; max-width: 70px;" />')
         return "Sin portada"
     
     portada_preview.short_description = "Vista previa"
@@ -4,3 +4,7 @@ class LibrosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.libros'
     verbose_name = 'Gestión de Libros'
+
+
+    def ready(self):
+        import apps.libros.signals
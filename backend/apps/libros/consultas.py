@@ -0,0 +1,50 @@
+from datetime import timedelta
+from django.utils import timezone
+from config.consultas import registrar_consulta
+from .models import Libro
+
+TAMANO_PAGINA = 50
+
+def ejemplo(campo):
+    """Un valor existente de `campo` para usar en los filtros"""
+    return Libro.objects.order_by().values_list(campo, flat=True).first()
+
+def listado():
+    return Libro.objects.select_related('categoria')
+
+@registrar_consulta('libros.listado')
+def consulta_listado():
+    return listado().order_by('-fecha_creacion', '-id')[:TAMANO_PAGINA]
+
+@registrar_consulta('libros.en_stock')
+def consulta_en_stock():
+    return listado().filter(stock__gt=0).order_by('-fecha_creacion', '-id')[:TAMANO_PAGINA]
+
+@registrar_consulta('libros.por_categoria')
+def consulta_por_categoria():
+    return listado().filter(categoria_id=ejemplo('categoria_id')).order_by('-fecha_creacion', '-id')[:TAMANO_PAGINA]
+
+@registrar_consulta('libros.por_editorial')
+def consulta_por_editorial():
+    return listado().filter(editorial=ejemplo('editorial')).order_by('-fecha_creacion', '-id')[:TAMANO_PAGINA]
+
+@registrar_consulta('libros.por_año')
+def consulta_por_año():
+    return listado().filter(año_publicacion=ejemplo('año_publicacion')).order_by('-fecha_creacion', '-id')[:TAMANO_PAGINA]
+
+@registrar_consulta('libros.orden_precio')
+def consulta_orden_precio():
+    return listado().order_by('precio', 'id')[:TAMANO_PAGINA]
+
+@registrar_consulta('libros.orden_popularidad')
+def consulta_orden_popularidad():
+    return listado().order_by('-popularidad', '-id')[:TAMANO_PAGINA]
+
+@registrar_consulta('libros.isbn')
+def consulta_isbn():
+    return listado().filter(isbn=ejemplo('isbn'))
+
+@registrar_consulta('libros.exportacion_incremental')
+def consulta_exportacion_incremental():
+    desde = timezone.now() - timedelta(days=1)
+    return Libro.objects.filter(fecha_actualizacion__gt=desde).order_by('fecha_actualizacion', 'id')
@@ -0,0 +1,48 @@
+import csv
+import json
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from .models import Libro
+
+COLUMNAS = [
+    'id', 'isbn', 'titulo', 'autor', 'editorial', 'categoria_id', 'categoria_nombre', 'precio', 'stock',
+    'año_publicacion', 'descripcion', 'portada_url', 'fecha_creacion', 'fecha_actualizacion'
+]
+
+class _Eco:
+    """Objeto con write() que retorna lo escrito, para que csv.writer genere las líneas sin buffer"""
+
+    def write(self, valor):
+        return valor
+
+def filas_catalogo(desde=None, desde_id=None):
+    """
+    Diccionarios con los libros y el nombre de su categoría, leídos con un cursor del servidor
+    de a LIBROS_EXPORTACION_LOTE filas: la memoria no depende del tamaño del catálogo.
+    Ordenados por (fecha_actualizacion, id): la última fila exportada da `since` y `since_id` de la próxima.
+    Con `desde_id` se exportan las filas posteriores a (desde, desde_id); sin él, las de fecha >= desde,
+    para no saltear libros con la misma fecha que la última fila vista.
+    """
+    libros = Libro.objects.all()
+    if desde is not None:
+        libros = libros.filter(fecha_actualizacion__gte=desde)
+        if desde_id is not None:
+            libros = libros.exclude(Q(fecha_actualizacion=desde) & Q(id__lte=desde_id))
+    return libros.order_by('fecha_actualizacion', 'id').values(
+        *[columna for columna in COLUMNAS if columna != 'categoria_nombre'],
+        categoria_nombre=F('categoria__nombre')
+    ).iterator(chunk_size=settings.LIBROS_EXPORTACION_LOTE)
+
+def generar_ndjson(filas):
+    for fila in filas:
+        yield json.dumps({columna: fila[columna] for columna in COLUMNAS}, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+def generar_csv(filas):
+    escritor = csv.writer(_Eco())
+    yield escritor.writerow(COLUMNAS)
+    for fila in filas:
+        yield escritor.writerow([
+            valor.isoformat() if hasattr(valor, 'isoformat') else valor
+            for valor in (fila[columna] for columna in COLUMNAS)
+        ])
@@ -0,0 +1,15 @@
+import django_filters
+from .models import Libro
+
+class LibroFilter(django_filters.FilterSet):
+    # stock > 0 coincide con la condición del índice parcial libro_en_stock_idx
+    disponible = django_filters.BooleanFilter(method='filtrar_disponible', label="Solo libros con stock")
+    precio_min = django_filters.NumberFilter(field_name='precio', lookup_expr='gte', label="Precio mínimo")
+    precio_max = django_filters.NumberFilter(field_name='precio', lookup_expr='lte', label="Precio máximo")
+
+    class Meta:
+        model = Libro
+        fields = ['categoria', 'editorial', 'año_publicacion', 'disponible', 'precio_min', 'precio_max']
+
+    def filtrar_disponible(self, queryset, name, value):
+        return queryset.filter(stock__gt=0) if value else queryset.filter(stock=0)
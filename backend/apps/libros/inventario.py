@@ -0,0 +1,89 @@
+from decimal import Decimal, InvalidOperation
+from django.db import connection, transaction
+from .models import Libro
+from .signals import catalogo_importado
+
+ACTUALIZADO = 'actualizado'
+NO_ENCONTRADO = 'no_encontrado'
+INVALIDO = 'invalido'
+
+# Filas por sentencia UPDATE
+TAMANO_LOTE = 1000
+
+PRECIO_MAXIMO = Decimal('99999999.99')  # max_digits=10, decimal_places=2
+STOCK_MAXIMO = 2147483647  # integer de PostgreSQL
+
+def validar_fila(fila):
+    """Retorna ((isbn, stock, precio), None) o (None, mensaje); stock o precio es None si no se envió"""
+    if not isinstance(fila, dict):
+        return None, "Cada fila debe ser un objeto"
+    isbn = fila.get('isbn')
+    if not isinstance(isbn, str) or not isbn.strip():
+        return None, "El ISBN es obligatorio"
+    if fila.get('stock') is None and fila.get('precio') is None:
+        return None, "Debe indicar stock o precio"
+
+    stock = fila.get('stock')
+    if stock is not None:
+        if isinstance(stock, bool) or not isinstance(stock, int) or not 0 <= stock <= STOCK_MAXIMO:
+            return None, "El stock debe ser un entero mayor o igual a 0"
+
+    precio = fila.get('precio')
+    if precio is not None:
+        try:
+            precio = Decimal(str(precio))
+        except InvalidOperation:
+            return None, "El precio no es un número válido"
+        if not precio.is_finite() or precio <= 0 or precio > PRECIO_MAXIMO or precio != precio.quantize(Decimal('0.01')):
+            return None, "El precio debe ser mayor a 0 y tener como máximo dos decimales"
+    return (isbn.strip(), stock, precio), None
+
+def actualizar_inventario(filas):
+    """
+    Actualiza stock y precio de muchos libros por ISBN.
+
+    Las filas se validan en una pasada y los ISBN se resuelven con una consulta. Las filas válidas
+    se aplican con un UPDATE ... FROM unnest(...) por cada TAMANO_LOTE filas, en una sola transacción
+    y sin guardar libro por libro (no hay señales por fila). La caché del catálogo se invalida una vez.
+    Retorna un resultado por fila, en el mismo orden.
+    """
+    resultados = [None] * len(filas)
+    validas = {}
+    for i, fila in enumerate(filas):
+        datos, error = validar_fila(fila)
+        if error:
+            isbn = fila.get('isbn') if isinstance(fila, dict) else None
+            resultados[i] = {'isbn': isbn, 'estado': INVALIDO, 'error': error}
+        else:
+            validas.setdefault(datos[0], []).append((i, datos))
+
+    # Si un ISBN se repite no se sabe cuál fila debe quedar: se rechazan todas
+    for isbn in [isbn for isbn, ocurrencias in validas.items() if len(ocurrencias) > 1]:
+        for i, _ in validas.pop(isbn):
+            resultados[i] = {'isbn': isbn, 'estado': INVALIDO, 'error': "ISBN repetido en el lote"}
+
+    ids = dict(Libro.objects.filter(isbn__in=validas).order_by().values_list('isbn', 'id'))
+    cambios = []
+    for isbn, [(i, (_, stock, precio))] in validas.items():
+        if isbn not in ids:
+            resultados[i] = {'isbn': isbn, 'estado': NO_ENCONTRADO, 'error': "No existe un libro con ese ISBN"}
+            continue
+        resultados[i] = {'isbn': isbn, 'estado': ACTUALIZADO, 'error': None}
+        cambios.append((ids[isbn], stock, precio))
+
+    if cambios:
+        with transaction.atomic(), connection.cursor() as cursor:
+            for inicio in range(0, len(cambios), TAMANO_LOTE):
+                lote = cambios[inicio:inicio + TAMANO_LOTE]
+                cursor.execute(f"""
+                    UPDATE {Libro._meta.db_table} AS libro
+                    SET stock = COALESCE(cambio.stock, libro.stock),
+                        precio = COALESCE(cambio.precio, libro.precio),
+                        fecha_actualizacion = NOW()
+                    FROM unnest(%s::bigint[], %s::integer[], %s::numeric[]) AS cambio(id, stock, precio)
+                    WHERE libro.id = cambio.id
+                """, [[c[0] for c in lote], [c[1] for c in lote], [c[2] for c in lote]])
+            transaction.on_commit(
+                lambda: catalogo_importado.send(sender=Libro, creados=[], actualizados=len(cambios))
+            )
+    return resultados
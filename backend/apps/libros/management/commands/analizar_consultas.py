@@ -0,0 +1,89 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from config.consultas import consultas_registradas
+
+def nodos_plan(plan):
+    """Recorre el plan de ejecución y sus subplanes"""
+    yield plan
+    for subplan in plan.get('Plans', []):
+        yield from nodos_plan(subplan)
+
+class Command(BaseCommand):
+    help = (
+        "Ejecuta EXPLAIN (ANALYZE, BUFFERS) de las consultas frecuentes registradas en el consultas.py "
+        "de cada app y marca los recorridos secuenciales (Seq Scan) sobre tablas grandes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('consultas', nargs='*', help="Nombres de las consultas a analizar (por defecto todas)")
+        parser.add_argument('--umbral-filas', type=int, default=10000,
+                            help="Filas a partir de las cuales un Seq Scan se marca como problema")
+        parser.add_argument('--sin-analyze', action='store_true',
+                            help="Solo EXPLAIN, sin ejecutar las consultas")
+        parser.add_argument('--estricto', action='store_true',
+                            help="Termina con error si alguna consulta tiene un Seq Scan marcado")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("El análisis de planes requiere PostgreSQL")
+        registradas = consultas_registradas()
+        nombres = options['consultas'] or list(registradas)
+        desconocidas = [nombre for nombre in nombres if nombre not in registradas]
+        if desconocidas:
+            raise CommandError(
+                f"Consultas no registradas: {', '.join(desconocidas)}. Disponibles: {', '.join(registradas)}"
+            )
+
+        opciones = 'FORMAT JSON' if options['sin_analyze'] else 'ANALYZE, BUFFERS, FORMAT JSON'
+        marcadas = []
+        # Las consultas se ejecutan dentro de una transacción que siempre se revierte
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                for nombre in nombres:
+                    sql, params = registradas[nombre]().query.sql_with_params()
+                    cursor.execute(f'EXPLAIN ({opciones}) {sql}', params)
+                    resultado = cursor.fetchone()[0]
+                    resultado = json.loads(resultado) if isinstance(resultado, str) else resultado
+                    if self.informar(cursor, nombre, resultado[0], options['umbral_filas']):
+                        marcadas.append(nombre)
+            transaction.set_rollback(True)
+
+        if marcadas:
+            mensaje = f"{len(marcadas)} consultas con Seq Scan sobre tablas grandes: {', '.join(marcadas)}"
+            if options['estricto']:
+                raise CommandError(mensaje)
+            self.stdout.write(self.style.WARNING(mensaje))
+        else:
+            self.stdout.write(self.style.SUCCESS("Ninguna consulta recorre secuencialmente una tabla grande."))
+
+    def informar(self, cursor, nombre, resultado, umbral):
+        """Muestra el resumen del plan de una consulta; retorna True si tiene Seq Scan marcados"""
+        plan = resultado['Plan']
+        nodos = list(nodos_plan(plan))
+        indices = sorted({nodo['Index Name'] for nodo in nodos if 'Index Name' in nodo})
+        recorridos = sorted({nodo['Relation Name'] for nodo in nodos if nodo['Node Type'] == 'Seq Scan'})
+        filas = self.filas_tablas(cursor, recorridos)
+        grandes = [tabla for tabla in recorridos if filas.get(tabla, 0) >= umbral]
+
+        detalle = f"costo {plan['Total Cost']}"
+        if 'Execution Time' in resultado:
+            detalle += (f", {resultado['Execution Time']:.2f} ms, buffers hit={plan.get('Shared Hit Blocks', 0)} "
+                        f"read={plan.get('Shared Read Blocks', 0)}")
+        self.stdout.write(f"{nombre}: {detalle}")
+        self.stdout.write(f"  índices: {', '.join(indices) or 'ninguno'}")
+        for tabla in recorridos:
+            linea = f"  Seq Scan en {tabla} (~{filas.get(tabla, 0)} filas)"
+            self.stdout.write(self.style.ERROR(linea) if tabla in grandes else linea)
+        return bool(grandes)
+
+    def filas_tablas(self, cursor, tablas):
+        """Filas estimadas de cada tabla, según las estadísticas de PostgreSQL (sin contarlas)"""
+        if not tablas:
+            return {}
+        cursor.execute("""
+            SELECT c.relname, GREATEST(c.reltuples::bigint, COALESCE(s.n_live_tup, 0))
+            FROM pg_class c LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+            WHERE c.relname = ANY(%s) AND c.relkind = 'r'
+        """, [tablas])
+        return dict(cursor.fetchall())
@@ -0,0 +1,145 @@
+import csv
+import json
+import os
+from decimal import Decimal, InvalidOperation
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from apps.libros.models import Libro, Categoria
+from apps.libros.signals import catalogo_importado
+
+CAMPOS_OBLIGATORIOS = ('isbn', 'titulo', 'autor', 'categoria', 'precio', 'año_publicacion')
+# Columnas que se sobrescriben cuando el ISBN ya existe (la portada y la fecha de creación se conservan)
+CAMPOS_ACTUALIZABLES = [
+    'titulo', 'autor', 'categoria', 'editorial', 'precio', 'stock',
+    'año_publicacion', 'descripcion', 'fecha_actualizacion'
+]
+
+def leer_filas(ruta, formato):
+    """Genera (número de línea, diccionario) leyendo el archivo de a una fila"""
+    with open(ruta, 'r', encoding='utf-8-sig', newline='') as archivo:
+        if formato == 'csv':
+            lector = csv.DictReader(archivo)
+            for fila in lector:
+                yield lector.line_num, fila
+        else:
+            for numero, linea in enumerate(archivo, start=1):
+                if linea.strip():
+                    try:
+                        yield numero, json.loads(linea)
+                    except json.JSONDecodeError as e:
+                        yield numero, e
+
+def convertir_fila(fila):
+    """Valida una fila y retorna (datos, None) o (None, mensaje de error)"""
+    if isinstance(fila, Exception):
+        return None, f"JSON inválido: {fila}"
+    datos = {clave: (str(valor).strip() if valor is not None else '') for clave, valor in fila.items() if clave}
+    faltantes = [campo for campo in CAMPOS_OBLIGATORIOS if not datos.get(campo)]
+    if faltantes:
+        return None, f"faltan campos: {', '.join(faltantes)}"
+    if len(datos['isbn']) > 13:
+        return None, f"ISBN demasiado largo: {datos['isbn']}"
+    try:
+        precio = Decimal(datos['precio'])
+        stock = int(datos.get('stock') or 0)
+        año = int(datos['año_publicacion'])
+    except (InvalidOperation, ValueError):
+        return None, "precio, stock o año_publicacion no son números"
+    if precio <= 0 or stock < 0 or not 1000 <= año <= 2025:
+        return None, "precio, stock o año_publicacion fuera de rango"
+    return {
+        'isbn': datos['isbn'],
+        'titulo': datos['titulo'][:200],
+        'autor': datos['autor'][:200],
+        'categoria': datos['categoria'][:100],
+        'editorial': datos.get('editorial', '')[:100],
+        'precio': precio,
+        'stock': stock,
+        'año_publicacion': año,
+        'descripcion': datos.get('descripcion', ''),
+    }, None
+
+class Command(BaseCommand):
+    help = (
+        "Importa libros desde un archivo CSV o JSONL (una fila u objeto por libro). "
+        "Inserta o actualiza por ISBN en lotes, sin señales por libro; al final envía un único "
+        "evento catalogo_importado. Las portadas se vinculan después con 'manage.py portadas sincronizar'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help="Ruta del archivo .csv o .jsonl")
+        parser.add_argument('--formato', choices=['csv', 'jsonl'],
+                            help="Formato del archivo; por defecto se deduce de la extensión")
+        parser.add_argument('--lote', type=int, default=2000, help="Libros por INSERT")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Valida el archivo sin escribir en la base de datos")
+
+    def handle(self, *args, **options):
+        ruta = options['archivo']
+        if not os.path.exists(ruta):
+            raise CommandError(f"No existe el archivo '{ruta}'")
+        formato = options['formato'] or os.path.splitext(ruta)[1].lstrip('.').lower()
+        if formato not in ('csv', 'jsonl'):
+            raise CommandError("No se reconoce el formato; use --formato csv o --formato jsonl")
+        if options['lote'] < 1:
+            raise CommandError("--lote debe ser mayor que cero")
+
+        self.dry_run = options['dry_run']
+        self.categorias = dict(Categoria.objects.values_list('nombre', 'id'))
+        self.creados = []
+        self.actualizados = 0
+        errores = 0
+
+        lote = {}
+        for numero, fila in leer_filas(ruta, formato):
+            datos, error = convertir_fila(fila)
+            if error:
+                errores += 1
+                self.stderr.write(f"Línea {numero}: {error}")
+                continue
+            # Si un ISBN se repite dentro del lote, vale la última fila
+            lote[datos['isbn']] = datos
+            if len(lote) >= options['lote']:
+                self.guardar_lote(lote)
+                lote = {}
+        if lote:
+            self.guardar_lote(lote)
+
+        if self.dry_run:
+            self.stdout.write(
+                f"Dry run: se crearían {len(self.creados)} libros y se actualizarían {self.actualizados} "
+                f"({errores} filas con errores); no se modificó la base de datos."
+            )
+            return
+        catalogo_importado.send(sender=Libro, creados=self.creados, actualizados=self.actualizados)
+        self.stdout.write(self.style.SUCCESS(
+            f"Libros creados: {len(self.creados)} | actualizados: {self.actualizados} | filas con errores: {errores}"
+        ))
+
+    def guardar_lote(self, lote):
+        """Inserta o actualiza un lote en una transacción: una consulta para los ISBN existentes y un INSERT"""
+        existentes = set(Libro.objects.filter(isbn__in=lote).order_by().values_list('isbn', flat=True))
+        nuevos = [isbn for isbn in lote if isbn not in existentes]
+        self.actualizados += len(existentes)
+        if self.dry_run:
+            self.creados.extend(nuevos)
+            return
+
+        with transaction.atomic():
+            self.crear_categorias({datos['categoria'] for datos in lote.values()})
+            libros = []
+            for datos in lote.values():
+                libro = Libro(**{clave: valor for clave, valor in datos.items() if clave != 'categoria'})
+                libro.categoria_id = self.categorias[datos['categoria']]
+                libros.append(libro)
+            Libro.objects.bulk_create(
+                libros, update_conflicts=True, unique_fields=['isbn'], update_fields=CAMPOS_ACTUALIZABLES
+            )
+            if nuevos:
+                self.creados.extend(Libro.objects.filter(isbn__in=nuevos).order_by().values_list('id', flat=True))
+
+    def crear_categorias(self, nombres):
+        faltantes = [nombre for nombre in nombres if nombre not in self.categorias]
+        if faltantes:
+            Categoria.objects.bulk_create([Categoria(nombre=nombre) for nombre in faltantes], ignore_conflicts=True)
+            self.categorias.update(Categoria.objects.filter(nombre__in=faltantes).values_list('nombre', 'id'))
@@ -0,0 +1,153 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from cloudinary import CloudinaryResource
+from django.core.management.base import BaseCommand, CommandError
+from apps.busqueda.cache import incrementar_version_catalogo
+from apps.libros.media import obtener_almacenamiento
+from apps.libros.models import Libro
+
+ENCONTRADA = 'encontrada'
+VINCULADA = 'vinculada'
+FALTANTE = 'faltante'
+ERROR = 'error'
+
+def nombres_candidatos(libro):
+    """Nombres con los que puede estar subida la portada de un libro, en orden de preferencia"""
+    candidatos = [libro.normalize_title_for_filename()]
+    # Convención de los scripts anteriores: sin ':' y con '_' en lugar de espacios
+    anterior = (libro.titulo or '').replace(':', '').replace(' ', '_')
+    if anterior not in candidatos:
+        candidatos.append(anterior)
+    return candidatos
+
+class Command(BaseCommand):
+    help = (
+        "Verifica o sincroniza las portadas de los libros con el almacenamiento de imágenes. "
+        "Lista los recursos remotos por prefijo (paginado), compara en memoria con la base de datos "
+        "y guarda los cambios con bulk_update."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('modo', choices=['verificar', 'sincronizar'],
+                            help="'verificar' solo informa; 'sincronizar' vincula a cada libro la imagen encontrada")
+        parser.add_argument('--prefijo', default='',
+                            help="Prefijo de los public_id a listar (p. ej. una carpeta)")
+        parser.add_argument('--tamano-pagina', type=int, default=500,
+                            help="Recursos por llamada al listar (máximo 500 en Cloudinary)")
+        parser.add_argument('--hilos', type=int, default=8,
+                            help="Consultas simultáneas para las imágenes que no cubre el listado")
+        parser.add_argument('--lote', type=int, default=500,
+                            help="Filas por UPDATE al guardar")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Muestra lo que se haría sin modificar la base de datos")
+        parser.add_argument('--fixture',
+                            help="Verifica las portadas referenciadas en un fixture en lugar de la base de datos")
+
+    def handle(self, *args, **options):
+        if options['hilos'] < 1 or options['tamano_pagina'] < 1 or options['lote'] < 1:
+            raise CommandError("--hilos, --tamano-pagina y --lote deben ser mayores que cero")
+        self.almacenamiento = obtener_almacenamiento()
+        self.options = options
+
+        if options['fixture']:
+            if options['modo'] != 'verificar':
+                raise CommandError("Con --fixture solo se admite el modo 'verificar'")
+            self.verificar_fixture(options['fixture'])
+            return
+
+        libros = list(Libro.objects.only('id', 'titulo', 'portada').order_by('id'))
+        remotos = self.buscar_remotos({nombre for libro in libros for nombre in nombres_candidatos(libro)})
+
+        resultados = {ENCONTRADA: [], VINCULADA: [], FALTANTE: [], ERROR: []}
+        cambios = []
+        for libro in libros:
+            candidatos = nombres_candidatos(libro)
+            nombre = next((n for n in candidatos if isinstance(remotos[n], dict)), None)
+            if nombre is None:
+                fallida = any(isinstance(remotos[n], Exception) for n in candidatos)
+                resultados[ERROR if fallida else FALTANTE].append((libro, candidatos[0]))
+                continue
+            actual = libro._meta.get_field('portada').to_python(libro.portada) if libro.portada else None
+            if getattr(actual, 'public_id', None) == nombre:
+                resultados[ENCONTRADA].append((libro, nombre))
+                continue
+            resultados[VINCULADA].append((libro, nombre))
+            recurso = remotos[nombre]
+            libro.portada = CloudinaryResource(
+                nombre, format=recurso.get('format'), version=recurso.get('version'),
+                type='upload', resource_type='image'
+            )
+            libro.actualizar_urls_portada()
+            cambios.append(libro)
+
+        self.informar(resultados)
+        if options['modo'] == 'sincronizar' and cambios:
+            if options['dry_run']:
+                self.stdout.write(f"Dry run: se vincularían {len(cambios)} portadas; no se modificó la base de datos.")
+                return
+            Libro.objects.bulk_update(
+                cambios, ['portada', 'portada_url', 'portada_miniaturas'], batch_size=options['lote']
+            )
+            # bulk_update no envía señales: se invalida la caché del catálogo una sola vez
+            incrementar_version_catalogo()
+            self.stdout.write(self.style.SUCCESS(f"Se vincularon {len(cambios)} portadas."))
+
+    def buscar_remotos(self, nombres):
+        """
+        Retorna {public_id: datos del recurso | None | excepción} para los nombres pedidos.
+        Los que empiezan con el prefijo se resuelven con el listado paginado; el resto,
+        uno por uno con un número acotado de hilos.
+        """
+        prefijo = self.options['prefijo']
+        remotos = {nombre: None for nombre in nombres}
+        for recurso in self.almacenamiento.listar(prefijo, tamano_pagina=self.options['tamano_pagina']):
+            if recurso['public_id'] in remotos:
+                remotos[recurso['public_id']] = recurso
+
+        pendientes = sorted(nombre for nombre in nombres if not nombre.startswith(prefijo))
+        if pendientes:
+            with ThreadPoolExecutor(max_workers=self.options['hilos']) as ejecutor:
+                for nombre, recurso in zip(pendientes, ejecutor.map(self.obtener, pendientes)):
+                    remotos[nombre] = recurso
+        return remotos
+
+    def obtener(self, public_id):
+        try:
+            return self.almacenamiento.obtener(public_id)
+        except Exception as e:
+            return e
+
+    def informar(self, resultados):
+        for libro, nombre in resultados[VINCULADA]:
+            self.stdout.write(f"~ '{libro.titulo}': se vincula la imagen '{nombre}'")
+        for libro, nombre in resultados[FALTANTE]:
+            self.stdout.write(self.style.WARNING(f"✗ '{libro.titulo}': no se encontró la imagen '{nombre}'"))
+        for libro, nombre in resultados[ERROR]:
+            self.stdout.write(self.style.ERROR(f"! '{libro.titulo}': error al consultar la imagen '{nombre}'"))
+        self.stdout.write(
+            f"Libros: {sum(len(v) for v in resultados.values())} | al día: {len(resultados[ENCONTRADA])} | "
+            f"por vincular: {len(resultados[VINCULADA])} | faltantes: {len(resultados[FALTANTE])} | "
+            f"errores: {len(resultados[ERROR])}"
+        )
+
+    def verificar_fixture(self, ruta):
+        if not os.path.exists(ruta):
+            raise CommandError(f"No existe el fixture '{ruta}'")
+        with open(ruta, 'r', encoding='utf-8') as archivo:
+            fixtures = json.load(archivo)
+        libros = [f['fields'] for f in fixtures if f['model'] == 'libros.libro']
+        nombres = {os.path.splitext(libro['portada'])[0] for libro in libros if libro.get('portada')}
+        remotos = self.buscar_remotos(nombres)
+
+        faltantes = 0
+        for libro in libros:
+            if not libro.get('portada'):
+                faltantes += 1
+                self.stdout.write(self.style.WARNING(f"✗ '{libro['titulo']}': no tiene portada definida"))
+                continue
+            nombre = os.path.splitext(libro['portada'])[0]
+            if not isinstance(remotos[nombre], dict):
+                faltantes += 1
+                self.stdout.write(self.style.WARNING(f"✗ '{libro['titulo']}': no se encontró la imagen '{nombre}'"))
+        self.stdout.write(f"Libros en el fixture: {len(libros)} | con imagen: {len(libros) - faltantes} | faltantes: {faltantes}")
@@ -0,0 +1,182 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+class AlmacenamientoCloudinary:
+    """Operaciones sobre las portadas guardadas en Cloudinary"""
+
+    def __init__(self):
+        import cloudinary
+        cloudinary.config(
+            cloud_name=settings.CLOUDINARY_STORAGE['CLOUD_NAME'],
+            api_key=settings.CLOUDINARY_STORAGE['API_KEY'],
+            api_secret=settings.CLOUDINARY_STORAGE['API_SECRET']
+        )
+
+    def listar(self, prefijo='', tamano_pagina=500):
+        """
+        Recorre los recursos subidos cuyo public_id empieza con `prefijo`, una página por llamada a la API.
+        Genera diccionarios con public_id, version y format.
+        """
+        import cloudinary.api
+        siguiente = None
+        while True:
+            opciones = {'type': 'upload', 'prefix': prefijo, 'max_results': tamano_pagina}
+            if siguiente:
+                opciones['next_cursor'] = siguiente
+            pagina = cloudinary.api.resources(**opciones)
+            for recurso in pagina.get('resources', []):
+                yield {key: recurso.get(key) for key in ('public_id', 'version', 'format')}
+            siguiente = pagina.get('next_cursor')
+            if not siguiente:
+                return
+
+    def obtener(self, public_id):
+        """Datos de un recurso o None si no existe"""
+        import cloudinary.api
+        from cloudinary.exceptions import NotFound
+        try:
+            recurso = cloudinary.api.resource(public_id)
+        except NotFound:
+            return None
+        return {key: recurso.get(key) for key in ('public_id', 'version', 'format')}
+
+    def renombrar(self, public_id, nuevo_public_id):
+        import cloudinary.uploader as uploader
+        uploader.rename(public_id, nuevo_public_id)
+
+    def url(self, recurso, **transformacion):
+        # Se construye localmente, sin llamadas a la API
+        return recurso.build_url(**transformacion)
+
+class AlmacenamientoLocal:
+    """
+    Almacenamiento en memoria que reemplaza a Cloudinary en tests y desarrollo.
+    Registra las operaciones y puede simular fallos con `fallos_pendientes`.
+    """
+
+    def __init__(self):
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.recursos = {}
+        self.operaciones = []
+        self.fallos_pendientes = 0
+
+    def agregar(self, public_id, version=1, format='jpg'):
+        self.recursos[public_id] = {'public_id': public_id, 'version': version, 'format': format}
+
+    def listar(self, prefijo='', tamano_pagina=500):
+        encontrados = sorted(pid for pid in self.recursos if pid.startswith(prefijo))
+        for inicio in range(0, len(encontrados), tamano_pagina):
+            self.operaciones.append(('listar', prefijo))
+            for public_id in encontrados[inicio:inicio + tamano_pagina]:
+                yield self.recursos[public_id]
+
+    def obtener(self, public_id):
+        self.operaciones.append(('obtener', public_id))
+        return self.recursos.get(public_id)
+
+    def renombrar(self, public_id, nuevo_public_id):
+        if self.fallos_pendientes:
+            self.fallos_pendientes -= 1
+            raise ConnectionError("Fallo simulado del almacenamiento")
+        recurso = self.recursos.pop(public_id, {'version': 1, 'format': 'jpg'})
+        self.recursos[nuevo_public_id] = {**recurso, 'public_id': nuevo_public_id}
+        self.operaciones.append(('renombrar', public_id, nuevo_public_id))
+
+    def url(self, recurso, **transformacion):
+        opciones = ','.join(f'{clave}_{valor}' for clave, valor in sorted(transformacion.items()))
+        return f"/media/portadas/{opciones + '/' if opciones else ''}{recurso.public_id}"
+
+_almacenamientos = {}
+_ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='libros-media')
+
+def obtener_almacenamiento():
+    """Instancia (una por proceso) del almacenamiento configurado en LIBROS_ALMACENAMIENTO_PORTADAS"""
+    ruta = settings.LIBROS_ALMACENAMIENTO_PORTADAS
+    if ruta not in _almacenamientos:
+        _almacenamientos[ruta] = import_string(ruta)()
+    return _almacenamientos[ruta]
+
+def calcular_urls_portada(portada):
+    """
+    URLs de entrega de una portada: la original y una por cada miniatura de LIBROS_PORTADA_MINIATURAS.
+    Retorna (None, {}) si no hay portada.
+    """
+    if not getattr(portada, 'public_id', None):
+        return None, {}
+    almacenamiento = obtener_almacenamiento()
+    miniaturas = {
+        nombre: almacenamiento.url(portada, **transformacion)
+        for nombre, transformacion in settings.LIBROS_PORTADA_MINIATURAS.items()
+    }
+    return almacenamiento.url(portada), miniaturas
+
+def necesita_renombrar(libro):
+    """Indica si el public_id de la portada no coincide con el título normalizado (no usa la red)"""
+    if not libro.portada or not libro.titulo:
+        return False
+    portada = libro._meta.get_field('portada').to_python(libro.portada)
+    public_id = getattr(portada, 'public_id', None)
+    return bool(public_id) and public_id != libro.normalize_title_for_filename()
+
+def programar_mantenimiento_portada(libro_id):
+    """
+    Programa el renombrado de la portada para después del commit, fuera del hilo de la petición.
+    Si la transacción se revierte, no se hace nada.
+    """
+    transaction.on_commit(lambda: _enviar(libro_id))
+
+def _enviar(libro_id):
+    if settings.LIBROS_MEDIA_EN_SEGUNDO_PLANO:
+        _ejecutor.submit(_mantener_en_hilo, libro_id)
+    else:
+        mantener_portada(libro_id)
+
+def _mantener_en_hilo(libro_id):
+    try:
+        mantener_portada(libro_id)
+    except Exception as e:
+        logger.error(f"Error en el mantenimiento de la portada del libro {libro_id}: {e}")
+    finally:
+        # El hilo abre su propia conexión; se cierra para no dejarla huérfana
+        connection.close()
+
+def mantener_portada(libro_id):
+    """
+    Renombra la portada del libro según su título y actualiza su public_id.
+    Reintenta el renombrado con espera exponencial. Retorna True si la portada quedó al día.
+    """
+    from .models import Libro
+
+    libro = Libro.objects.filter(pk=libro_id).first()
+    if libro is None or not necesita_renombrar(libro):
+        return True
+    actual = libro.portada.public_id
+    nuevo = libro.normalize_title_for_filename()
+
+    almacenamiento = obtener_almacenamiento()
+    for intento in range(settings.LIBROS_MEDIA_REINTENTOS + 1):
+        try:
+            almacenamiento.renombrar(actual, nuevo)
+            break
+        except Exception as e:
+            if intento == settings.LIBROS_MEDIA_REINTENTOS:
+                logger.error(f"Error al renombrar la portada '{actual}' del libro {libro_id}: {e}")
+                return False
+            time.sleep(settings.LIBROS_MEDIA_ESPERA * 2 ** intento)
+
+    with transaction.atomic():
+        libro = Libro.objects.select_for_update().filter(pk=libro_id).first()
+        # Si mientras tanto cambió la portada, el nuevo valor manda y tendrá su propio mantenimiento
+        if libro is None or not libro.portada or libro.portada.public_id != actual:
+            return False
+        libro.portada.public_id = nuevo
+        libro.save(update_fields=['portada'])
+    return True
@@ -0,0 +1,62 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:15
+
+import cloudinary.models
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    """
+    Alinea las opciones y los campos de Categoria y Libro con los modelos (diferencias que ya existían
+    antes de los cambios de búsqueda). No elimina columnas.
+    """
+
+    # Nombre anterior de esta misma migración, para las bases donde ya se aplicó
+    replaces = [('libros', '0002_alter_categoria_options_remove_categoria_descripcion_and_more')]
+
+    dependencies = [
+        ('libros', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='categoria',
+            options={},
+        ),
+        migrations.AlterField(
+            model_name='categoria',
+            name='nombre',
+            field=models.CharField(max_length=100, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='libro',
+            name='autor',
+            field=models.CharField(max_length=200),
+        ),
+        migrations.AlterField(
+            model_name='libro',
+            name='año_publicacion',
+            field=models.IntegerField(validators=[django.core.validators.MinValueValidator(1000), django.core.validators.MaxValueValidator(2025)]),
+        ),
+        migrations.AlterField(
+            model_name='libro',
+            name='categoria',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='libros.categoria'),
+        ),
+        migrations.AlterField(
+            model_name='libro',
+            name='editorial',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='libro',
+            name='portada',
+            field=cloudinary.models.CloudinaryField(blank=True, max_length=255, null=True, verbose_name='image'),
+        ),
+        migrations.AlterField(
+            model_name='libro',
+            name='stock',
+            field=models.IntegerField(default=0, validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+    ]
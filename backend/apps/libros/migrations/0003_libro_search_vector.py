@@ -0,0 +1,56 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:16
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# Pesos: título (A) > autor (B) > editorial (C) > descripción (D)
+SEARCH_VECTOR_EXPRESSION = """
+    setweight(to_tsvector('spanish', coalesce({row}titulo, '')), 'A') ||
+    setweight(to_tsvector('spanish', coalesce({row}autor, '')), 'B') ||
+    setweight(to_tsvector('spanish', coalesce({row}editorial, '')), 'C') ||
+    setweight(to_tsvector('spanish', coalesce({row}descripcion, '')), 'D')
+"""
+
+CREATE_TRIGGER = f"""
+CREATE OR REPLACE FUNCTION libros_libro_search_vector_trigger() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := {SEARCH_VECTOR_EXPRESSION.format(row='NEW.')};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER libros_libro_search_vector_update
+    BEFORE INSERT OR UPDATE OF titulo, autor, editorial, descripcion
+    ON libros_libro
+    FOR EACH ROW EXECUTE FUNCTION libros_libro_search_vector_trigger();
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER IF EXISTS libros_libro_search_vector_update ON libros_libro;
+DROP FUNCTION IF EXISTS libros_libro_search_vector_trigger();
+"""
+
+BACKFILL = f"UPDATE libros_libro SET search_vector = {SEARCH_VECTOR_EXPRESSION.format(row='')};"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('libros', '0002_sincronizar_campos_con_modelos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='libro',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='libro',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='libro_search_vector_gin'),
+        ),
+        migrations.RunSQL(CREATE_TRIGGER, reverse_sql=DROP_TRIGGER),
+        migrations.RunSQL(BACKFILL, reverse_sql=migrations.RunSQL.noop),
+    ]
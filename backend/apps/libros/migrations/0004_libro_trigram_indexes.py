@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:18
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('libros', '0003_libro_search_vector'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='libro',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['titulo'], name='libro_titulo_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='libro',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['autor'], name='libro_autor_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('libros', '0004_libro_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='libro',
+            index=models.Index(fields=['-fecha_creacion'], name='libro_fecha_creacion_idx'),
+        ),
+    ]
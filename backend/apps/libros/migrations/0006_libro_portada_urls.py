@@ -0,0 +1,53 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Miniaturas vigentes al crear la migración (copia de LIBROS_PORTADA_MINIATURAS de ese momento)
+MINIATURAS = {
+    'pequena': {'width': 150, 'height': 225, 'crop': 'fill', 'quality': 'auto', 'fetch_format': 'auto'},
+    'mediana': {'width': 300, 'height': 450, 'crop': 'fill', 'quality': 'auto', 'fetch_format': 'auto'},
+}
+
+
+def calcular_urls_existentes(apps, schema_editor):
+    """Calcula las URLs de las portadas ya guardadas; se construyen localmente, sin llamadas a Cloudinary"""
+    Libro = apps.get_model('libros', 'Libro')
+    libros = list(Libro.objects.exclude(portada__isnull=True).exclude(portada='').only('id', 'portada'))
+    if not libros:
+        return
+    import cloudinary
+    cloudinary.config(
+        cloud_name=settings.CLOUDINARY_STORAGE['CLOUD_NAME'],
+        api_key=settings.CLOUDINARY_STORAGE['API_KEY'],
+        api_secret=settings.CLOUDINARY_STORAGE['API_SECRET']
+    )
+    for libro in libros:
+        portada = libro.portada
+        if not getattr(portada, 'public_id', None):
+            continue
+        libro.portada_url = portada.build_url()
+        libro.portada_miniaturas = {
+            nombre: portada.build_url(**transformacion) for nombre, transformacion in MINIATURAS.items()
+        }
+    Libro.objects.bulk_update(libros, ['portada_url', 'portada_miniaturas'], batch_size=500)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('libros', '0005_libro_libro_fecha_creacion_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='libro',
+            name='portada_miniaturas',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='libro',
+            name='portada_url',
+            field=models.CharField(blank=True, editable=False, max_length=500, null=True),
+        ),
+        migrations.RunPython(calcular_urls_existentes, migrations.RunPython.noop),
+    ]
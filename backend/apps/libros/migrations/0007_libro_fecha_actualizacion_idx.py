@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('libros', '0006_libro_portada_urls'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='libro',
+            index=models.Index(fields=['fecha_actualizacion', 'id'], name='libro_fecha_actualizacion_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('libros', '0007_libro_fecha_actualizacion_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='libro',
+            index=models.Index(fields=['categoria', '-fecha_creacion'], name='libro_categoria_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='libro',
+            index=models.Index(fields=['editorial', '-fecha_creacion'], name='libro_editorial_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='libro',
+            index=models.Index(fields=['año_publicacion', '-fecha_creacion'], name='libro_anio_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='libro',
+            index=models.Index(fields=['precio', 'id'], name='libro_precio_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='libro',
+            index=models.Index(condition=models.Q(('stock__gt', 0)), fields=['-fecha_creacion'], name='libro_en_stock_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('libros', '0008_libro_indices_filtros'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='libro',
+            name='popularidad',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='libro',
+            index=models.Index(fields=['-popularidad', '-id'], name='libro_popularidad_idx'),
+        ),
+    ]
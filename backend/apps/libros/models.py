@@ -2,15 +2,64 @@ import os
 import re
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.core.files.uploadedfile import UploadedFile
 from cloudinary.models import CloudinaryField
+from .media import calcular_urls_portada
 
-class Categoria(models.Model):
+class CamposGuardadosMixin:
+    """Recuerda los valores leídos de la base para saber al guardar qué campos cambiaron"""
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        instancia._valores_guardados = dict(zip(field_names, values))
+        return instancia
+
+    def campos_modificados(self, campos):
+        """Los `campos` cuyo valor difiere del guardado en la base (todos si no se leyó de ella)"""
+        guardados = getattr(self, '_valores_guardados', None)
+        if guardados is None:
+            return set(campos)
+        modificados = set()
+        for campo in campos:
+            attname = self._meta.get_field(campo).attname
+            if attname not in guardados or guardados[attname] != getattr(self, attname):
+                modificados.add(campo)
+        return modificados
+
+    def recordar_valores_guardados(self, update_fields=None):
+        """Se llama después de guardar: los valores escritos pasan a ser los de la base"""
+        diferidos = self.get_deferred_fields()
+        valores = {
+            campo.attname: getattr(self, campo.attname)
+            for campo in self._meta.concrete_fields
+            if campo.attname not in diferidos and (update_fields is None or campo.name in update_fields)
+        }
+        if update_fields is not None and getattr(self, '_valores_guardados', None) is not None:
+            # Con update_fields el resto de los campos sigue como estaba en la base
+            self._valores_guardados.update(valores)
+        else:
+            self._valores_guardados = valores
+
+class Categoria(CamposGuardadosMixin, models.Model):
     nombre = models.CharField(max_length=100, unique=True)
+    descripcion = models.TextField(blank=True)
     
     def __str__(self):
         return self.nombre
 
-class Libro(models.Model):
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.recordar_valores_guardados(kwargs.get('update_fields'))
+
+class LibroManager(models.Manager):
+    def get_queryset(self):
+        # El vector de búsqueda solo se usa dentro de la base de datos; no se carga en memoria
+        return super().get_queryset().defer('search_vector')
+
+class Libro(CamposGuardadosMixin, models.Model):
     titulo = models.CharField(max_length=200)
     autor = models.CharField(max_length=200)
     isbn = models.CharField(max_length=13, unique=True)
@@ -24,8 +73,17 @@ class Libro(models.Model):
     descripcion = models.TextField(blank=True)
     portada = CloudinaryField('image', blank=True, null=True, 
                               transformation={'quality': 'auto', 'fetch_format': 'auto'})
+    # URLs de entrega de la portada (original y miniaturas por nombre), calculadas al guardar
+    portada_url = models.CharField(max_length=500, null=True, blank=True, editable=False)
+    portada_miniaturas = models.JSONField(default=dict, blank=True, editable=False)
     fecha_creacion = models.DateTimeField(auto_now_add=True)
     fecha_actualizacion = models.DateTimeField(auto_now=True)
+    # Ventas y reservas recientes ponderadas (ver apps.compras.popularidad); se ordena por esta columna
+    popularidad = models.FloatField(default=0, editable=False)
+    # Mantenido por el trigger libros_libro_search_vector_update (ver migración 0003)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = LibroManager()
 
     def normalize_title_for_filename(self):
         """Normaliza el título para usar como nombre de archivo"""
@@ -37,31 +95,53 @@ class Libro(models.Model):
         titulo_normalizado = re.sub(r'[-\s]+', '_', titulo_normalizado)
         return titulo_normalizado
 
+    def actualizar_urls_portada(self):
+        """Calcula las URLs de la portada; retorna False si el archivo todavía no se subió"""
+        if isinstance(self.portada, UploadedFile):
+            return False
+        portada = self._meta.get_field('portada').to_python(self.portada) if self.portada else None
+        self.portada_url, self.portada_miniaturas = calcular_urls_portada(portada)
+        return True
+
     def save(self, *args, **kwargs):
-        # Si tenemos una nueva portada y un título, renombrar el archivo
-        if self.portada and self.titulo and hasattr(self.portada, 'public_id'):
-            try:
-                import cloudinary.uploader as uploader
-                from cloudinary.utils import cloudinary_url
-                
-                # Obtener el nuevo nombre basado en el título
-                nuevo_nombre = self.normalize_title_for_filename()
-                
-                # Si el public_id actual no coincide con el título normalizado
-                if self.portada.public_id != nuevo_nombre:
-                    # Renombrar en Cloudinary
-                    uploader.rename(self.portada.public_id, nuevo_nombre)
-                    # Actualizar el campo con el nuevo public_id
-                    self.portada.public_id = nuevo_nombre
-            except Exception as e:
-                print(f"Error al renombrar imagen en Cloudinary: {e}")
-        
+        # Las URLs se calculan al escribir para no construirlas en cada serialización
+        calculadas = self.actualizar_urls_portada()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'portada' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'portada_url', 'portada_miniaturas'}
         super().save(*args, **kwargs)
+        self.recordar_valores_guardados(kwargs.get('update_fields'))
+        if not calculadas:
+            # La portada se subió durante este guardado y recién ahora tiene public_id
+            self.actualizar_urls_portada()
+            Libro.objects.filter(pk=self.pk).update(
+                portada_url=self.portada_url, portada_miniaturas=self.portada_miniaturas
+            )
 
     def __str__(self):
         return f"{self.titulo} - {self.autor}"
 
     class Meta:
         ordering = ['-fecha_creacion']
+        indexes = [
+            # Orden por defecto del listado paginado por cursor
+            models.Index(fields=['-fecha_creacion'], name='libro_fecha_creacion_idx'),
+            # Exportación incremental ((fecha_actualizacion, id) > (since, since_id)), en ese mismo orden
+            models.Index(fields=['fecha_actualizacion', 'id'], name='libro_fecha_actualizacion_idx'),
+            # Filtros del listado (?categoria=, ?editorial=, ?año_publicacion=) con el orden por defecto
+            models.Index(fields=['categoria', '-fecha_creacion'], name='libro_categoria_fecha_idx'),
+            models.Index(fields=['editorial', '-fecha_creacion'], name='libro_editorial_fecha_idx'),
+            models.Index(fields=['año_publicacion', '-fecha_creacion'], name='libro_anio_fecha_idx'),
+            # Orden y rangos por precio (el id desempata en la paginación por cursor)
+            models.Index(fields=['precio', 'id'], name='libro_precio_idx'),
+            # Libros con stock (?disponible=true, stock_min de la búsqueda): solo indexa los que se venden
+            models.Index(fields=['-fecha_creacion'], name='libro_en_stock_idx', condition=models.Q(stock__gt=0)),
+            # Orden por popularidad (?ordering=-popularidad, ordenar_por=popularidad)
+            models.Index(fields=['-popularidad', '-id'], name='libro_popularidad_idx'),
+            GinIndex(fields=['search_vector'], name='libro_search_vector_gin'),
+            # Índices de trigramas para la búsqueda tolerante a errores de escritura
+            GinIndex(fields=['titulo'], name='libro_titulo_trgm', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['autor'], name='libro_autor_trgm', opclasses=['gin_trgm_ops']),
+        ]
         verbose_name = 'Libro'
         verbose_name_plural = 'Libros'
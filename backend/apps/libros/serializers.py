@@ -1,41 +1,84 @@
+from django.db.models import F
 from rest_framework import serializers
 from .models import Libro, Categoria
-from drf_spectacular.utils import extend_schema_field
-from rest_framework.fields import URLField
+
+# Representación compacta de un libro para listados (?vista=tarjeta): un subconjunto de la completa
+CAMPOS_TARJETA = ['id', 'titulo', 'autor', 'precio', 'stock', 'categoria_nombre', 'portada_url', 'portada_miniaturas']
+
+def campos_solicitados(valor, ruta=''):
+    """
+    Nombres de campo de un parámetro ?fields= u ?omit= (separados por comas) que corresponden
+    al serializer ubicado en `ruta` (p. ej. 'libro' para ?omit=libro.descripcion)
+    """
+    if not valor:
+        return set()
+    prefijo = f'{ruta}.' if ruta else ''
+    nombres = (nombre.strip() for nombre in valor.split(','))
+    return {
+        nombre[len(prefijo):] for nombre in nombres
+        if nombre.startswith(prefijo) and nombre[len(prefijo):] and '.' not in nombre[len(prefijo):]
+    }
+
+class CamposDinamicosMixin:
+    """
+    Permite elegir los campos de la respuesta en peticiones GET con ?fields= y ?omit=.
+    Si el serializer está anidado, los campos llevan como prefijo el nombre del campo que lo contiene
+    (p. ej. ?fields=libro.titulo,libro.precio en el carrito).
+    """
+
+    def get_fields(self):
+        campos = super().get_fields()
+        request = self.context.get('request')
+        if request is None or request.method != 'GET':
+            return campos
+        ruta = self.ruta_campos()
+        incluir = campos_solicitados(request.query_params.get('fields'), ruta)
+        omitir = campos_solicitados(request.query_params.get('omit'), ruta)
+        if incluir:
+            campos = {nombre: campo for nombre, campo in campos.items() if nombre in incluir}
+        for nombre in omitir:
+            campos.pop(nombre, None)
+        return campos
+
+    def ruta_campos(self):
+        nombres = []
+        nodo = self
+        while nodo.parent is not None:
+            if nodo.field_name:
+                nombres.append(nodo.field_name)
+            nodo = nodo.parent
+        return '.'.join(reversed(nombres))
+
+def tarjetas(libros):
+    """
+    Representación compacta (CAMPOS_TARJETA) de filas obtenidas con valores_tarjeta(),
+    armada directamente sin pasar por los campos de DRF
+    """
+    return [
+        {**{campo: fila[campo] for campo in CAMPOS_TARJETA}, 'precio': str(fila['precio'])}
+        for fila in libros
+    ]
+
+def valores_tarjeta(libros, *extra):
+    """Queryset de diccionarios con solo las columnas de la tarjeta (y `extra`, p. ej. las de orden)"""
+    columnas = {campo for campo in CAMPOS_TARJETA if campo != 'categoria_nombre'} | set(extra)
+    return libros.values(*columnas, categoria_nombre=F('categoria__nombre'))
 
 class CategoriaSerializer(serializers.ModelSerializer):
     class Meta:
         model = Categoria
         fields = ['id', 'nombre']
 
-class LibroSerializer(serializers.ModelSerializer):
-    portada_url = serializers.SerializerMethodField()
+class LibroSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     categoria_nombre = serializers.CharField(source='categoria.nombre', read_only=True)
     
     class Meta:
         model = Libro
         fields = ['id', 'titulo', 'autor', 'isbn', 'categoria', 'categoria_nombre', 'editorial', 
                   'precio', 'stock', 'año_publicacion', 'descripcion', 'portada', 'portada_url',
-                  'fecha_creacion', 'fecha_actualizacion']
-        read_only_fields = ('fecha_creacion', 'fecha_actualizacion', 'portada_url')
+                  'portada_miniaturas', 'popularidad', 'fecha_creacion', 'fecha_actualizacion']
+        read_only_fields = ('fecha_creacion', 'fecha_actualizacion', 'portada_url', 'portada_miniaturas', 'popularidad')
 
-    @extend_schema_field(URLField)
-    def get_portada_url(self, obj):
-        """Obtiene la URL de la portada desde Cloudinary"""
-        if obj.portada:
-            try:
-                # CloudinaryField tiene una URL directa
-                if hasattr(obj.portada, 'url'):
-                    return obj.portada.url
-                # Si no, construir usando cloudinary_url
-                elif obj.portada:
-                    from cloudinary.utils import cloudinary_url
-                    url, _ = cloudinary_url(obj.portada.public_id if hasattr(obj.portada, 'public_id') else str(obj.portada))
-                    return url
-            except Exception as e:
-                print(f"Error obteniendo URL de portada para libro {obj.id}: {e}")
-        return None
-    
     def create(self, validated_data):
         """Crear un nuevo libro con manejo de portada"""
         return super().create(validated_data)
@@ -75,3 +118,9 @@ class LibroSerializer(serializers.ModelSerializer):
         if value < 0:
             raise serializers.ValidationError("El stock no puede ser negativo.")
         return value
+
+class InventarioResultadoSerializer(serializers.Serializer):
+    """Resultado de una fila de la actualización masiva de inventario (solo para la documentación)"""
+    isbn = serializers.CharField(allow_null=True)
+    estado = serializers.ChoiceField(choices=['actualizado', 'no_encontrado', 'invalido'])
+    error = serializers.CharField(allow_null=True)
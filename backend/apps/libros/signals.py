@@ -0,0 +1,17 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver, Signal
+from .media import necesita_renombrar, programar_mantenimiento_portada
+from .models import Libro
+
+# Se envía una vez al terminar una importación o actualización masiva (que no envía post_save por libro).
+# Argumentos: creados (ids de los libros nuevos) y actualizados (cantidad de libros existentes modificados)
+catalogo_importado = Signal()
+
+@receiver(post_save, sender=Libro)
+def renombrar_portada(sender, instance, **kwargs):
+    """
+    Si el nombre de la portada no coincide con el título, la renombra en segundo plano
+    después del commit; guardar el libro solo cuesta la escritura en la base de datos
+    """
+    if necesita_renombrar(instance):
+        programar_mantenimiento_portada(instance.pk)
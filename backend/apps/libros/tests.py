@@ -1,3 +1,469 @@
-from django.test import TestCase
+import csv
+import json
+import os
+import re
+import tempfile
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from apps.busqueda.cache import version_catalogo
+from .media import mantener_portada, obtener_almacenamiento
+from .models import Libro, Categoria
+from .serializers import CAMPOS_TARJETA
 
-# Create your tests here.
+def crear_libros(cantidad, inicio=0):
+    """Crea libros en categorías distintas, para que cada uno tenga su propia relación"""
+    for i in range(inicio, inicio + cantidad):
+        categoria = Categoria.objects.create(nombre=f'Categoría {i}')
+        Libro.objects.create(
+            titulo=f'Libro {i}', autor=f'Autor {i}', isbn=f'9780000000{i:03d}',
+            categoria=categoria, precio='10.00', stock=1, año_publicacion=2000
+        )
+
+class ConsultasLibrosTests(APITestCase):
+    """La cantidad de consultas SQL por endpoint no depende de la cantidad de libros"""
+
+    def test_listar_libros(self):
+        url = reverse('libro-list')
+        crear_libros(2)
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        crear_libros(10, inicio=2)
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data), 12)
+        self.assertEqual(response.data[0]['categoria_nombre'], 'Categoría 11')
+
+    def test_detalle_libro(self):
+        crear_libros(1)
+        libro = Libro.objects.get()
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('libro-detail', args=[libro.id]))
+        self.assertEqual(response.data['categoria_nombre'], 'Categoría 0')
+
+class PaginacionLibrosTests(APITestCase):
+    def setUp(self):
+        crear_libros(7)
+
+    def recorrer(self, url):
+        """Sigue el encabezado Link y retorna los ids de todas las páginas"""
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids += [libro['id'] for libro in response.data]
+            siguiente = re.search(r'<([^>]+)>; rel="next"', response.get('Link', ''))
+            url = siguiente.group(1) if siguiente else None
+        return ids
+
+    def test_paginacion_por_cursor(self):
+        url = reverse('libro-list')
+        response = self.client.get(url, {'page_size': 3})
+        # El cuerpo sigue siendo una lista; las páginas se enlazan en el encabezado Link
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 3)
+        self.assertIn('rel="next"', response['Link'])
+
+        esperado = list(Libro.objects.order_by('-fecha_creacion').values_list('id', flat=True))
+        self.assertEqual(self.recorrer(f'{url}?page_size=3'), esperado)
+        # Con precios repetidos el id desempata y no se repiten ni se pierden libros
+        esperado = list(Libro.objects.order_by('precio', 'id').values_list('id', flat=True))
+        self.assertEqual(self.recorrer(f'{url}?page_size=2&ordering=precio'), esperado)
+
+    def test_tamano_maximo(self):
+        with self.settings(PAGINACION_TAMANO_MAXIMO=5):
+            response = self.client.get(reverse('libro-list'), {'page_size': 1000})
+        self.assertEqual(len(response.data), 5)
+        with self.settings(PAGINACION_TAMANO=4):
+            self.assertEqual(len(self.client.get(reverse('libro-list')).data), 4)
+
+    def test_filtro_de_precio_paginado(self):
+        """El catálogo filtra por precio en la API, así cada página ya llega filtrada"""
+        Libro.objects.filter(titulo__in=['Libro 1', 'Libro 2']).update(precio='25.00')
+        url = reverse('libro-list')
+        ids = self.recorrer(f'{url}?page_size=1&precio_min=20&precio_max=30&ordering=titulo')
+        self.assertEqual(ids, list(Libro.objects.filter(precio=25).order_by('titulo').values_list('id', flat=True)))
+
+@override_settings(
+    LIBROS_ALMACENAMIENTO_PORTADAS='apps.libros.media.AlmacenamientoLocal',
+    LIBROS_MEDIA_EN_SEGUNDO_PLANO=False, LIBROS_MEDIA_ESPERA=0, RECOMENDACIONES_CONTENIDO_EN_SEGUNDO_PLANO=False
+)
+class MantenimientoPortadaTests(APITestCase):
+    def setUp(self):
+        self.almacenamiento = obtener_almacenamiento()
+        self.almacenamiento.reiniciar()
+        self.categoria = Categoria.objects.create(nombre='Ficción')
+
+    def crear_libro(self):
+        return Libro.objects.create(
+            titulo='El principito', autor='Antoine de Saint-Exupéry', isbn='9780156012195',
+            categoria=self.categoria, precio='12.50', año_publicacion=1943,
+            portada='image/upload/v1/foto_subida.jpg'
+        )
+
+    def test_renombrado_despues_del_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            libro = self.crear_libro()
+        # Guardar el libro no toca el almacenamiento
+        self.assertEqual(self.almacenamiento.operaciones, [])
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.almacenamiento.operaciones, [('renombrar', 'foto_subida', 'El_principito')])
+        libro.refresh_from_db()
+        self.assertEqual(libro.portada.public_id, 'El_principito')
+
+        # Un cambio que no afecta el título no programa nada
+        with self.captureOnCommitCallbacks(execute=True):
+            libro.stock = 3
+            libro.save()
+        self.assertEqual(len(self.almacenamiento.operaciones), 1)
+
+    def test_reintentos(self):
+        self.almacenamiento.fallos_pendientes = 2
+        with self.captureOnCommitCallbacks(execute=True):
+            libro = self.crear_libro()
+        libro.refresh_from_db()
+        self.assertEqual(libro.portada.public_id, 'El_principito')
+
+        # Si se agotan los reintentos la portada queda como estaba
+        self.almacenamiento.fallos_pendientes = 10
+        with self.assertLogs('apps.libros.media', 'ERROR'), self.captureOnCommitCallbacks(execute=True):
+            libro.titulo = 'Vuelo nocturno'
+            libro.save()
+        libro.refresh_from_db()
+        self.assertEqual(libro.portada.public_id, 'El_principito')
+
+    def test_urls_de_portada_calculadas_al_guardar(self):
+        libro = self.crear_libro()
+        self.assertEqual(libro.portada_url, '/media/portadas/foto_subida')
+        self.assertEqual(set(libro.portada_miniaturas), {'pequena', 'mediana'})
+
+        # El renombrado actualiza también las URLs, y la API solo lee las columnas
+        mantener_portada(libro.id)
+        response = self.client.get(reverse('libro-detail', args=[libro.id]))
+        self.assertEqual(response.data['portada_url'], '/media/portadas/El_principito')
+        self.assertTrue(response.data['portada_miniaturas']['pequena'].endswith('/El_principito'))
+        self.assertIn('width_150', response.data['portada_miniaturas']['pequena'])
+
+@override_settings(
+    LIBROS_ALMACENAMIENTO_PORTADAS='apps.libros.media.AlmacenamientoLocal',
+    LIBROS_MEDIA_EN_SEGUNDO_PLANO=False, LIBROS_MEDIA_ESPERA=0, RECOMENDACIONES_CONTENIDO_EN_SEGUNDO_PLANO=False
+)
+class ComandoPortadasTests(APITestCase):
+    def setUp(self):
+        self.almacenamiento = obtener_almacenamiento()
+        self.almacenamiento.reiniciar()
+        crear_libros(5)
+        for i in range(4):
+            self.almacenamiento.agregar(f'Libro_{i}', version=7, format='png')
+        self.almacenamiento.agregar('Otra_imagen')
+
+    def ejecutar(self, *args):
+        salida = StringIO()
+        call_command('portadas', *args, '--tamano-pagina', '2', stdout=salida)
+        return salida.getvalue()
+
+    def test_sincronizar(self):
+        salida = self.ejecutar('sincronizar')
+        self.assertIn('por vincular: 4 | faltantes: 1', salida)
+        # Un listado paginado (3 páginas de 2) en lugar de una consulta por libro
+        self.assertEqual(self.almacenamiento.operaciones, [('listar', '')] * 3)
+
+        libro = Libro.objects.get(titulo='Libro 0')
+        self.assertEqual(libro.portada.public_id, 'Libro_0')
+        self.assertEqual(libro.portada.format, 'png')
+        self.assertEqual(libro.portada_url, '/media/portadas/Libro_0')
+        self.assertIsNone(Libro.objects.get(titulo='Libro 4').portada)
+
+        # Una segunda ejecución no tiene nada que cambiar
+        self.assertIn('al día: 4 | por vincular: 0', self.ejecutar('sincronizar'))
+
+    def test_dry_run_no_modifica(self):
+        salida = self.ejecutar('sincronizar', '--dry-run')
+        self.assertIn('se vincularían 4 portadas', salida)
+        self.assertFalse(Libro.objects.exclude(portada=None).exists())
+
+    def test_verificar_fuera_del_prefijo(self):
+        # Los nombres que no cubre el prefijo se consultan uno por uno
+        salida = self.ejecutar('verificar', '--prefijo', 'Libro_1', '--hilos', '2')
+        self.assertIn('por vincular: 4 | faltantes: 1', salida)
+        self.assertEqual(self.almacenamiento.operaciones.count(('listar', 'Libro_1')), 1)
+        self.assertIn(('obtener', 'Libro_0'), self.almacenamiento.operaciones)
+        self.assertFalse(Libro.objects.exclude(portada=None).exists())
+
+class ImportarLibrosTests(APITestCase):
+    def setUp(self):
+        get_user_model().objects.create_user(
+            username='admin', password='admin123', email='admin@example.com',
+            is_staff=True, is_superuser=True, numero_identificacion='9000'
+        )
+        Categoria.objects.create(nombre='Ficción')
+        self.directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directorio.cleanup)
+
+    def escribir(self, nombre, contenido):
+        ruta = os.path.join(self.directorio.name, nombre)
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            archivo.write(contenido)
+        return ruta
+
+    def importar(self, ruta, *args):
+        salida, errores = StringIO(), StringIO()
+        call_command('importar_libros', ruta, *args, stdout=salida, stderr=errores)
+        return salida.getvalue(), errores.getvalue()
+
+    def test_importar_csv_en_lotes(self):
+        filas = ['isbn,titulo,autor,categoria,precio,stock,año_publicacion']
+        filas += [f'97800000{i:05d},Libro {i},Autor {i},{"Ficción" if i % 2 else "Historia"},10.50,{i},2001'
+                  for i in range(25)]
+        filas.append('123,Sin precio,Autor,Ficción,,1,2001')
+        ruta = self.escribir('libros.csv', '\n'.join(filas))
+
+        # Consultas constantes por lote, sin señales por libro
+        with self.assertNumQueries(23):
+            salida, errores = self.importar(ruta, '--lote', '10')
+        self.assertIn('Libros creados: 25 | actualizados: 0 | filas con errores: 1', salida)
+        self.assertIn('Línea 27: faltan campos: precio', errores)
+        self.assertEqual(Libro.objects.count(), 25)
+        self.assertEqual(Libro.objects.get(isbn='9780000000003').categoria.nombre, 'Ficción')
+        self.assertEqual(Categoria.objects.filter(nombre='Historia').count(), 1)
+
+        # Una sola noticia con el resumen de la importación
+        from apps.noticias.models import Noticia
+        self.assertEqual(Noticia.objects.count(), 1)
+        self.assertEqual(Noticia.objects.get().titulo, '¡25 nuevos libros disponibles!')
+
+    def test_actualizar_por_isbn(self):
+        libro = Libro.objects.create(
+            titulo='Viejo', autor='Autor', isbn='9780000000001', categoria=Categoria.objects.get(),
+            precio='5.00', stock=1, año_publicacion=2000, portada='image/upload/v1/viejo.jpg'
+        )
+        lineas = [
+            {'isbn': '9780000000001', 'titulo': 'Nuevo', 'autor': 'Autor', 'categoria': 'Ficción',
+             'precio': '7.25', 'stock': 4, 'año_publicacion': 2000},
+            {'isbn': '9780000000002', 'titulo': 'Otro', 'autor': 'Autor', 'categoria': 'Ficción',
+             'precio': '3', 'año_publicacion': 1999},
+        ]
+        ruta = self.escribir('libros.jsonl', '\n'.join(json.dumps(l, ensure_ascii=False) for l in lineas) + '\n{roto')
+
+        salida, _ = self.importar(ruta, '--dry-run')
+        self.assertIn('se crearían 1 libros y se actualizarían 1 (1 filas con errores)', salida)
+        self.assertEqual(Libro.objects.count(), 1)
+
+        salida, errores = self.importar(ruta)
+        self.assertIn('Libros creados: 1 | actualizados: 1', salida)
+        self.assertIn('JSON inválido', errores)
+        libro.refresh_from_db()
+        self.assertEqual((libro.titulo, str(libro.precio), libro.stock), ('Nuevo', '7.25', 4))
+        # La portada de un libro existente se conserva
+        self.assertEqual(libro.portada.public_id, 'viejo')
+        self.assertEqual(Libro.objects.filter(titulo__search='Nuevo').count(), 1)
+
+class InventarioTests(APITestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_user(
+            username='admin', password='admin123', email='admin@example.com',
+            is_staff=True, numero_identificacion='9001'
+        )
+        crear_libros(3)
+        self.url = reverse('libro-inventario')
+
+    def test_requiere_staff(self):
+        response = self.client.post(self.url, [{'isbn': '9780000000000', 'stock': 1}], format='json')
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+
+    def test_actualizacion_masiva(self):
+        self.client.force_authenticate(self.admin)
+        version = version_catalogo()
+        filas = [
+            {'isbn': '9780000000000', 'stock': 7},
+            {'isbn': '9780000000001', 'precio': '15.90'},
+            {'isbn': '9780000000002', 'stock': 0, 'precio': 8},
+            {'isbn': '9789999999999', 'stock': 1},
+            {'isbn': '9780000000000', 'precio': '-1'},
+            {'stock': 3},
+        ]
+        # Una consulta para resolver los ISBN, un UPDATE y la transacción; sin guardar libro por libro
+        with self.assertNumQueries(4), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, filas, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [fila['estado'] for fila in response.data],
+            ['actualizado', 'actualizado', 'actualizado', 'no_encontrado', 'invalido', 'invalido']
+        )
+
+        libros = {libro.isbn: libro for libro in Libro.objects.all()}
+        self.assertEqual((libros['9780000000000'].stock, str(libros['9780000000000'].precio)), (7, '10.00'))
+        self.assertEqual((libros['9780000000001'].stock, str(libros['9780000000001'].precio)), (1, '15.90'))
+        self.assertEqual((libros['9780000000002'].stock, str(libros['9780000000002'].precio)), (0, '8.00'))
+        # La caché del catálogo se invalida una sola vez
+        self.assertEqual(version_catalogo(), version + 1)
+
+    def test_isbn_repetido_y_limite(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.post(self.url, [
+            {'isbn': '9780000000000', 'stock': 1}, {'isbn': '9780000000000', 'stock': 2}
+        ], format='json')
+        self.assertEqual([fila['error'] for fila in response.data], ["ISBN repetido en el lote"] * 2)
+        self.assertEqual(Libro.objects.get(isbn='9780000000000').stock, 1)
+
+        with self.settings(LIBROS_INVENTARIO_MAX_FILAS=1):
+            response = self.client.post(self.url, [{'isbn': 'a', 'stock': 1}] * 2, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+class ExportacionTests(APITestCase):
+    def setUp(self):
+        crear_libros(5)
+        self.url = reverse('libro-exportar')
+
+    def leer(self, response):
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_exportar_ndjson(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        # Una sola consulta con la categoría, sin importar la cantidad de libros
+        with self.assertNumQueries(1):
+            filas = [json.loads(linea) for linea in self.leer(response).splitlines()]
+        self.assertEqual(len(filas), 5)
+        self.assertEqual(filas[0]['categoria_nombre'], 'Categoría 0')
+        self.assertEqual(filas[0]['precio'], '10.00')
+
+    def test_exportar_csv_incremental(self):
+        libro_id, corte = Libro.objects.order_by('fecha_actualizacion', 'id').values_list('id', 'fecha_actualizacion')[2]
+        response = self.client.get(self.url, {'formato': 'csv', 'since': corte.isoformat(), 'since_id': libro_id})
+        filas = list(csv.DictReader(self.leer(response).splitlines()))
+        self.assertEqual([fila['titulo'] for fila in filas], ['Libro 3', 'Libro 4'])
+        self.assertEqual(filas[0]['categoria_nombre'], 'Categoría 3')
+
+        # Sin since_id la fecha es inclusiva
+        response = self.client.get(self.url, {'formato': 'csv', 'since': corte.isoformat()})
+        filas = list(csv.DictReader(self.leer(response).splitlines()))
+        self.assertEqual([fila['titulo'] for fila in filas], ['Libro 2', 'Libro 3', 'Libro 4'])
+
+        response = self.client.get(self.url, {'since': 'ayer'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {'since_id': 3})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_incremental_con_fechas_repetidas(self):
+        # Varios libros con la misma fecha que la última fila vista no se pierden entre exportaciones
+        corte = Libro.objects.order_by('fecha_actualizacion').values_list('fecha_actualizacion', flat=True)[0]
+        Libro.objects.update(fecha_actualizacion=corte)
+        ids = list(Libro.objects.order_by('id').values_list('id', flat=True))
+
+        response = self.client.get(self.url, {'since': corte.isoformat(), 'since_id': ids[1]})
+        filas = [json.loads(linea) for linea in self.leer(response).splitlines()]
+        self.assertEqual([fila['id'] for fila in filas], ids[2:])
+
+class CamposLibrosTests(APITestCase):
+    def setUp(self):
+        crear_libros(6)
+
+    def test_fields_y_omit(self):
+        response = self.client.get(reverse('libro-list'), {'fields': 'id,titulo,categoria_nombre'})
+        self.assertEqual(set(response.data[0]), {'id', 'titulo', 'categoria_nombre'})
+
+        response = self.client.get(reverse('libro-list'), {'omit': 'descripcion,portada_miniaturas'})
+        self.assertNotIn('descripcion', response.data[0])
+        self.assertIn('precio', response.data[0])
+
+        libro = Libro.objects.get(titulo='Libro 2')
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('libro-detail', args=[libro.id]), {'fields': 'titulo,precio'})
+        self.assertEqual(response.data, {'titulo': 'Libro 2', 'precio': '10.00'})
+
+    def test_vista_tarjeta(self):
+        completo = self.client.get(reverse('libro-list'), {'page_size': 4})
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('libro-list'), {'vista': 'tarjeta', 'page_size': 4})
+        self.assertEqual(len(response.data), 4)
+        self.assertEqual(list(response.data[0]), CAMPOS_TARJETA)
+        # Es un subconjunto de la representación completa, con los mismos valores
+        self.assertEqual(response.data[0], {campo: completo.data[0][campo] for campo in CAMPOS_TARJETA})
+
+        # La paginación por cursor sigue funcionando, también con otro orden
+        siguiente = re.search(r'<([^>]+)>; rel="next"', response['Link']).group(1)
+        response = self.client.get(siguiente)
+        self.assertEqual(len(response.data), 2)
+        response = self.client.get(reverse('libro-list'), {'vista': 'tarjeta', 'ordering': 'titulo'})
+        self.assertEqual([libro['titulo'] for libro in response.data][:2], ['Libro 0', 'Libro 1'])
+
+class LecturaCondicionalTests(APITestCase):
+    def setUp(self):
+        crear_libros(3)
+
+    def test_304_sin_consultas(self):
+        url = reverse('libro-list')
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=', response['Cache-Control'])
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+        # Otra URL (otros parámetros) tiene su propio ETag
+        response = self.client.get(url, {'ordering': 'titulo'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # Un cambio en el catálogo invalida el ETag
+        libro = Libro.objects.first()
+        libro.stock = 9
+        libro.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_detalle_y_categorias(self):
+        libro = Libro.objects.first()
+        for url in (reverse('libro-detail', args=[libro.id]), reverse('libro-categorias')):
+            etag = self.client.get(url)['ETag']
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Categoria.objects.create(nombre='Nueva')
+        response = self.client.get(reverse('libro-categorias'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_usuario_autenticado_privado(self):
+        usuario = get_user_model().objects.create_user(
+            username='lector', password='lector123', email='lector@example.com', numero_identificacion='9002'
+        )
+        self.client.force_authenticate(usuario)
+        response = self.client.get(reverse('libro-list'))
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('no-cache', response['Cache-Control'])
+
+class IndicesLibrosTests(APITestCase):
+    def setUp(self):
+        crear_libros(4)
+        Libro.objects.filter(titulo__in=['Libro 1', 'Libro 3']).update(stock=0)
+
+    def test_filtro_disponible(self):
+        response = self.client.get(reverse('libro-list'), {'disponible': 'true'})
+        self.assertEqual(sorted(libro['titulo'] for libro in response.data), ['Libro 0', 'Libro 2'])
+        response = self.client.get(reverse('libro-list'), {'disponible': 'false'})
+        self.assertEqual(sorted(libro['titulo'] for libro in response.data), ['Libro 1', 'Libro 3'])
+
+    def test_analizar_consultas(self):
+        salida = StringIO()
+        call_command('analizar_consultas', 'libros.listado', 'libros.en_stock', stdout=salida)
+        self.assertIn('libros.listado: costo', salida.getvalue())
+        self.assertIn('buffers hit=', salida.getvalue())
+        # Con tablas tan pequeñas el planificador recorre la tabla: con umbral 0 se marca
+        with self.assertRaises(CommandError):
+            call_command('analizar_consultas', 'libros.listado', '--umbral-filas', '0',
+                         '--estricto', '--sin-analyze', stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command('analizar_consultas', 'no.existe', stdout=StringIO())
@@ -1,102 +1,231 @@
+import hashlib
+from django.conf import settings
+from django.db.models import F
+from django.http import StreamingHttpResponse
 from django.shortcuts import render
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.dateparse import parse_datetime
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
 from rest_framework import filters
 from django_filters.rest_framework import DjangoFilterBackend
-from drf_spectacular.utils import extend_schema, extend_schema_view
+from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
+from apps.busqueda.cache import version_catalogo
+from apps.recomendaciones.contenido import similares_por_contenido
+from .exportacion import filas_catalogo, generar_csv, generar_ndjson
+from .filters import LibroFilter
+from .inventario import actualizar_inventario
 from .models import Libro, Categoria
-from .serializers import LibroSerializer, CategoriaSerializer
+from .serializers import (
+    LibroSerializer, CategoriaSerializer, InventarioResultadoSerializer,
+    campos_solicitados, tarjetas, valores_tarjeta
+)
+
+def etag_catalogo(request, *args, **kwargs):
+    """
+    ETag de una lectura del catálogo. Cambia con la versión del catálogo (cualquier cambio en libros
+    o categorías), así que se calcula sin consultar la base de datos.
+    """
+    formato = getattr(getattr(request, 'accepted_renderer', None), 'format', '')
+    valor = f'{version_catalogo()}:{request.get_full_path()}:{formato}'
+    return hashlib.md5(valor.encode()).hexdigest()
+
+# Responde 304 sin consultar ni serializar si el If-None-Match del cliente coincide
+lectura_condicional = method_decorator(condition(etag_func=etag_catalogo))
+
+class CacheCatalogoMixin:
+    """
+    Cache-Control de las lecturas del catálogo: públicas y reutilizables por LIBROS_CACHE_MAX_AGE
+    segundos para usuarios anónimos; privadas y siempre revalidadas (con el ETag) si hay sesión.
+    """
+    acciones_cacheables = ('list', 'retrieve', 'categorias')
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if (request.method in ('GET', 'HEAD') and self.action in self.acciones_cacheables
+                and response.status_code in (200, 304)):
+            if request.user and request.user.is_authenticated:
+                patch_cache_control(response, private=True, no_cache=True)
+            else:
+                patch_cache_control(response, public=True, max_age=settings.LIBROS_CACHE_MAX_AGE)
+            patch_vary_headers(response, ['Accept', 'Authorization'])
+        return response
+
+PARAMETROS_CAMPOS = [
+    OpenApiParameter('fields', str, description="Campos a incluir, separados por comas"),
+    OpenApiParameter('omit', str, description="Campos a excluir, separados por comas"),
+]
 
 @extend_schema_view(
-    list=extend_schema(description="Obtener lista de libros"),
+    list=extend_schema(
+        description="Obtener lista de libros. Con ?vista=tarjeta retorna solo los campos para tarjetas del catálogo.",
+        parameters=PARAMETROS_CAMPOS + [OpenApiParameter('vista', str, enum=['tarjeta'])]
+    ),
     create=extend_schema(description="Crear un nuevo libro"),
-    retrieve=extend_schema(description="Obtener detalles de un libro"),
+    retrieve=extend_schema(description="Obtener detalles de un libro", parameters=PARAMETROS_CAMPOS),
     update=extend_schema(description="Actualizar un libro completamente"),
     partial_update=extend_schema(description="Actualizar parcialmente un libro"),
     destroy=extend_schema(description="Eliminar un libro"),
 )
-class LibroViewSet(viewsets.ModelViewSet):
+class LibroViewSet(CacheCatalogoMixin, viewsets.ModelViewSet):
     """
     API endpoint para gestionar libros.
     """
-    queryset = Libro.objects.all()
+    queryset = Libro.objects.select_related('categoria')
     serializer_class = LibroSerializer
     permission_classes = [permissions.AllowAny]  # Permitir acceso público a la lista de libros
     parser_classes = [JSONParser, MultiPartParser, FormParser]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['categoria', 'editorial', 'año_publicacion']
+    filterset_class = LibroFilter
     search_fields = ['titulo', 'autor', 'isbn', 'descripcion', 'editorial']
-    ordering_fields = ['titulo', 'autor', 'precio', 'año_publicacion', 'fecha_creacion']
+    ordering_fields = ['titulo', 'autor', 'precio', 'año_publicacion', 'fecha_creacion', 'popularidad']
     ordering = ['-fecha_creacion']
 
-    def create(self, request, *args, **kwargs):
-        """Crear un nuevo libro con soporte para subida de portada"""
-        serializer = self.get_serializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        
-        # Guardar el libro
-        libro = serializer.save()
-        
-        # Si hay una portada, renombrarla según el título
-        if libro.portada and libro.titulo:
-            try:
-                nuevo_nombre = libro.normalize_title_for_filename()
-                if libro.portada.public_id != nuevo_nombre:
-                    import cloudinary.uploader as uploader
-                    uploader.rename(libro.portada.public_id, nuevo_nombre)
-                    libro.portada.public_id = nuevo_nombre
-                    libro.save(update_fields=['portada'])
-            except Exception as e:
-                print(f"Error al renombrar imagen: {e}")
-        
-        headers = self.get_success_headers(serializer.data)
-        return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
-
-    def update(self, request, *args, **kwargs):
-        """Actualizar libro con soporte para subida de portada"""
-        partial = kwargs.pop('partial', False)
-        instance = self.get_object()
-        serializer = self.get_serializer(instance, data=request.data, partial=partial)
-        serializer.is_valid(raise_exception=True)
-        
-        # Guardar los cambios
-        libro = serializer.save()
-        
-        # Si se actualizó la portada o el título, renombrar la imagen
-        if libro.portada and libro.titulo:
-            try:
-                nuevo_nombre = libro.normalize_title_for_filename()
-                if libro.portada.public_id != nuevo_nombre:
-                    import cloudinary.uploader as uploader
-                    uploader.rename(libro.portada.public_id, nuevo_nombre)
-                    libro.portada.public_id = nuevo_nombre
-                    libro.save(update_fields=['portada'])
-            except Exception as e:
-                print(f"Error al renombrar imagen: {e}")
-        
-        if getattr(instance, '_prefetched_objects_cache', None):
-            instance._prefetched_objects_cache = {}
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action not in ('list', 'retrieve'):
+            return queryset
+        # Con ?fields= / ?omit= solo se leen las columnas que se van a serializar
+        # (más las de orden, que usa el cursor de la paginación)
+        columnas = {campo.name for campo in Libro._meta.concrete_fields}
+        siempre = {'id', 'categoria', *self.ordering_fields}
+        incluir = campos_solicitados(self.request.query_params.get('fields'))
+        omitir = campos_solicitados(self.request.query_params.get('omit'))
+        if incluir:
+            queryset = queryset.only(*((incluir & columnas) | siempre), 'categoria__nombre')
+        diferidas = (omitir - siempre) & columnas
+        if diferidas:
+            queryset = queryset.defer(*diferidas)
+        return queryset
 
-        return Response(serializer.data)
+    @lectura_condicional
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @lectura_condicional
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get('vista') != 'tarjeta':
+            return super().list(request, *args, **kwargs)
+        # Listado compacto: diccionarios de .values() sin pasar por el serializer
+        libros = valores_tarjeta(self.filter_queryset(self.get_queryset()), *self.ordering_fields)
+        pagina = self.paginate_queryset(libros)
+        if pagina is None:
+            return Response(tarjetas(libros))
+        return self.get_paginated_response(tarjetas(pagina))
 
-    def partial_update(self, request, *args, **kwargs):
-        """Actualización parcial con soporte para subida de portada"""
-        kwargs['partial'] = True
-        return self.update(request, *args, **kwargs)
-    
     @action(detail=False, methods=['get'])
+    @lectura_condicional
     def categorias(self, request):
         """Retorna todas las categorías disponibles"""
         categorias = Categoria.objects.all()
         serializer = CategoriaSerializer(categorias, many=True)
         return Response(serializer.data)
 
-class CategoriaViewSet(viewsets.ReadOnlyModelViewSet):
+    @extend_schema(
+        description="Libros parecidos por contenido (título, autor, editorial, descripción y categoría), "
+                    "de más a menos similar. Sirve también para los libros que todavía no tienen ventas.",
+        parameters=[OpenApiParameter('limite', int, description="Por defecto y como máximo RECOMENDACIONES_CONTENIDO_VECINOS")]
+    )
+    @action(detail=True, methods=['get'], pagination_class=None, filter_backends=[])
+    @lectura_condicional
+    def similares(self, request, pk=None):
+        """Vecinos precalculados del libro: una consulta por índice, sin serializer"""
+        try:
+            limite = int(request.query_params.get('limite', settings.RECOMENDACIONES_CONTENIDO_VECINOS))
+            libro_id = int(pk)
+        except ValueError:
+            return Response({"error": "El límite y el id del libro deben ser números enteros"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if limite < 1:
+            return Response({"error": "El límite debe ser mayor que cero"}, status=status.HTTP_400_BAD_REQUEST)
+
+        filas = list(valores_tarjeta(
+            similares_por_contenido(libro_id).annotate(puntaje=F('similar_contenido_de__puntaje')), 'puntaje'
+        )[:min(limite, settings.RECOMENDACIONES_CONTENIDO_VECINOS)])
+        # Solo si no hay vecinos se distingue un libro inexistente de uno sin parecidos
+        if not filas and not Libro.objects.filter(pk=libro_id).exists():
+            return Response({"error": "Libro no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+        return Response([
+            {**tarjeta, 'puntaje': round(fila['puntaje'], 4)} for tarjeta, fila in zip(tarjetas(filas), filas)
+        ])
+
+    @extend_schema(
+        description="Exporta el catálogo completo como NDJSON (un libro por línea) o CSV, en streaming.",
+        parameters=[
+            OpenApiParameter('formato', str, enum=['ndjson', 'csv'], description="Por defecto ndjson"),
+            OpenApiParameter('since', str, description="Solo los libros modificados desde esta fecha (ISO 8601), inclusive"),
+            OpenApiParameter('since_id', int, description="Id del último libro exportado con fecha `since`: "
+                                                          "continúa después de (since, since_id)"),
+        ],
+        responses={(200, 'application/x-ndjson'): str, (200, 'text/csv'): str}
+    )
+    @action(detail=False, methods=['get'], pagination_class=None, filter_backends=[])
+    def exportar(self, request):
+        """Exportación del catálogo para socios e informes, con memoria constante"""
+        formato = request.query_params.get('formato', 'ndjson')
+        if formato not in ('ndjson', 'csv'):
+            return Response({"error": "El formato debe ser 'ndjson' o 'csv'"}, status=status.HTTP_400_BAD_REQUEST)
+        desde = request.query_params.get('since')
+        if desde:
+            fecha = parse_datetime(desde)
+            if fecha is None:
+                return Response({"error": "El parámetro since debe ser una fecha ISO 8601"},
+                                status=status.HTTP_400_BAD_REQUEST)
+            desde = fecha if timezone.is_aware(fecha) else timezone.make_aware(fecha)
+        desde_id = request.query_params.get('since_id')
+        if desde_id is not None:
+            if not desde or not desde_id.isdigit():
+                return Response({"error": "since_id debe ser un entero y requiere since"},
+                                status=status.HTTP_400_BAD_REQUEST)
+            desde_id = int(desde_id)
+
+        filas = filas_catalogo(desde or None, desde_id)
+        if formato == 'csv':
+            response = StreamingHttpResponse(generar_csv(filas), content_type='text/csv; charset=utf-8')
+            response['Content-Disposition'] = 'attachment; filename="catalogo.csv"'
+        else:
+            response = StreamingHttpResponse(generar_ndjson(filas), content_type='application/x-ndjson; charset=utf-8')
+        return response
+
+    @extend_schema(
+        description="Actualiza stock y/o precio de muchos libros por ISBN. "
+                    "Recibe una lista de objetos {isbn, stock?, precio?} y retorna un resultado por fila.",
+        responses=InventarioResultadoSerializer(many=True)
+    )
+    @action(detail=False, methods=['post'], permission_classes=[permissions.IsAdminUser],
+            parser_classes=[JSONParser], pagination_class=None)
+    def inventario(self, request):
+        """Actualización masiva de inventario (sincronización con el almacén)"""
+        filas = request.data
+        if not isinstance(filas, list) or not filas:
+            return Response(
+                {"error": "Se espera una lista no vacía de objetos {isbn, stock, precio}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(filas) > settings.LIBROS_INVENTARIO_MAX_FILAS:
+            return Response(
+                {"error": f"Se admiten como máximo {settings.LIBROS_INVENTARIO_MAX_FILAS} filas por petición"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(actualizar_inventario(filas))
+
+class CategoriaViewSet(CacheCatalogoMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint para consultar categorías disponibles.
     """
     queryset = Categoria.objects.all()
     serializer_class = CategoriaSerializer
     permission_classes = [permissions.AllowAny]
+
+    @lectura_condicional
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @lectura_condicional
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
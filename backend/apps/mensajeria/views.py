@@ -191,6 +191,7 @@ class MensajeViewSet(viewsets.ModelViewSet):
 class NotificacionMensajeViewSet(viewsets.ModelViewSet):
     serializer_class = NotificacionMensajeSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrStaff]
+    ordering = '-id'  # Mismo orden que '-fecha_creacion', sobre el índice de la clave primaria
     lookup_field = 'id'
     lookup_url_kwarg = 'id'
 
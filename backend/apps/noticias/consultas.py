@@ -0,0 +1,8 @@
+from config.consultas import registrar_consulta
+from .models import Noticia, EstadoNoticia
+
+@registrar_consulta('noticias.publicadas')
+def consulta_publicadas():
+    return Noticia.objects.filter(estado_noticia=EstadoNoticia.PUBLICADO).select_related(
+        'autor', 'libro_relacionado__categoria'
+    ).order_by('-fecha_publicacion', '-id')[:50]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('noticias', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='noticia',
+            index=models.Index(fields=['estado_noticia', '-fecha_publicacion'], name='noticia_estado_fecha_idx'),
+        ),
+    ]
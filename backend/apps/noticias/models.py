@@ -33,6 +33,10 @@ class Noticia(models.Model):
 
     class Meta:
         ordering = ['-fecha_publicacion']
+        indexes = [
+            # Orden de la paginación por cursor del listado público (solo publicadas)
+            models.Index(fields=['estado_noticia', '-fecha_publicacion'], name='noticia_estado_fecha_idx'),
+        ]
         verbose_name = 'Noticia'
         verbose_name_plural = 'Noticias'
 
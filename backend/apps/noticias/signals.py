@@ -2,6 +2,7 @@ from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from apps.libros.models import Libro
+from apps.libros.signals import catalogo_importado
 from .models import Noticia, Suscripcion, EstadoNoticia
 from .notifications import enviar_notificacion_nueva_noticia, enviar_confirmacion_suscripcion
 
@@ -32,6 +33,32 @@ def crear_noticia_nuevo_libro(sender, instance, created, **kwargs):
             )
             # Ya no enviamos el email aquí, se enviará en la señal de noticia
 
+@receiver(catalogo_importado)
+def crear_noticia_importacion(sender, creados, **kwargs):
+    """
+    Crea una sola noticia con el resumen de los libros nuevos de una importación masiva,
+    en lugar de una por libro (y un solo envío de emails)
+    """
+    if not creados:
+        return
+    autor = User.objects.filter(is_superuser=True).first() or User.objects.filter(is_staff=True).first()
+    if not autor:
+        return
+    libros = list(
+        Libro.objects.filter(id__in=creados).select_related('categoria').order_by('titulo')[:10]
+    )
+    categorias = sorted({libro.categoria.nombre for libro in libros})
+    listado = '\n'.join(f"- {libro.titulo} ({libro.autor})" for libro in libros)
+    restantes = len(creados) - len(libros)
+    Noticia.objects.create(
+        titulo=f"¡{len(creados)} nuevos libros disponibles!",
+        contenido=f"Hemos añadido {len(creados)} libros a nuestro catálogo, entre ellos:\n\n{listado}"
+                  + (f"\n\n...y {restantes} más." if restantes > 0 else ""),
+        autor=autor,
+        estado_noticia=EstadoNoticia.PUBLICADO,
+        tags=','.join(['nuevo', *categorias])[:200]
+    )
+
 @receiver(post_save, sender=Noticia)
 def notificar_nueva_noticia(sender, instance, created, **kwargs):
     """
@@ -104,3 +104,32 @@ class SuscripcionTests(APITestCase):
         url = reverse('suscripcion-mis-noticias')
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+class ConsultasNoticiasTests(APITestCase):
+    """La cantidad de consultas SQL del listado no depende de la cantidad de noticias"""
+
+    def setUp(self):
+        # Con un usuario staff, cada libro nuevo crea una noticia publicada
+        self.staff_user = User.objects.create_user(
+            username='staff', email='staff@test.com', password='testpass123',
+            is_staff=True, numero_identificacion='100'
+        )
+
+    def crear_libros(self, cantidad, inicio=0):
+        for i in range(inicio, inicio + cantidad):
+            Libro.objects.create(
+                titulo=f'Libro {i}', autor='Autor', isbn=f'9780000000{i:03d}',
+                categoria=Categoria.objects.create(nombre=f'Categoría {i}'),
+                precio='10.00', año_publicacion=2000
+            )
+
+    def test_listar_noticias(self):
+        url = reverse('noticia-list')
+        self.crear_libros(2)
+        with self.assertNumQueries(1):
+            self.client.get(url)
+        self.crear_libros(10, inicio=2)
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data), 12)
+        self.assertIsNotNone(response.data[0]['libro_relacionado']['categoria_nombre'])
@@ -29,7 +29,7 @@ class NoticiaViewSet(viewsets.ModelViewSet):
     * Cualquier usuario puede ver las noticias publicadas.
     * Solo el staff puede crear, editar y eliminar noticias.
     """
-    queryset = Noticia.objects.all()
+    queryset = Noticia.objects.select_related('autor', 'libro_relacionado__categoria')
     serializer_class = NoticiaSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['estado_noticia', 'autor']
@@ -122,14 +122,14 @@ class SuscripcionViewSet(viewsets.ModelViewSet):
                 Q(estado_noticia='PUBLICADO') &
                 (Q(libro_relacionado__categoria__in=categorias) | 
                  Q(libro_relacionado__isnull=True))
-            ).distinct()
+            ).distinct().select_related('autor', 'libro_relacionado__categoria')
 
             page = self.paginate_queryset(noticias)
             if page is not None:
-                serializer = NoticiaSerializer(page, many=True)
+                serializer = NoticiaSerializer(page, many=True, context={'request': request})
                 return self.get_paginated_response(serializer.data)
 
-            serializer = NoticiaSerializer(noticias, many=True)
+            serializer = NoticiaSerializer(noticias, many=True, context={'request': request})
             return Response(serializer.data)
         except Exception as e:
             return Response({
@@ -1,3 +1,14 @@
 from django.contrib import admin
+from .models import LibroSimilar, ReglaAsociacion
 
-# Register your models here.
+@admin.register(LibroSimilar)
+class LibroSimilarAdmin(admin.ModelAdmin):
+    list_display = ('libro', 'posicion', 'similar', 'puntaje')
+    list_select_related = ('libro', 'similar')
+    raw_id_fields = ('libro', 'similar')
+
+@admin.register(ReglaAsociacion)
+class ReglaAsociacionAdmin(admin.ModelAdmin):
+    list_display = ('antecedente', 'posicion', 'consecuente', 'pedidos', 'soporte', 'confianza', 'lift')
+    list_select_related = ('antecedente', 'consecuente')
+    raw_id_fields = ('antecedente', 'consecuente')
@@ -4,3 +4,6 @@ class RecomendacionesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.recomendaciones'
     verbose_name = 'Sistema de Recomendaciones'
+
+    def ready(self):
+        import apps.recomendaciones.signals
@@ -0,0 +1,19 @@
+from config.consultas import registrar_consulta
+from .contenido import similares_por_contenido
+from .models import FeedUsuario, LibroSimilar, LibroSimilarContenido
+from .similares import tambien_compraron
+
+@registrar_consulta('recomendaciones.tambien_compraron')
+def consulta_tambien_compraron():
+    libro_id = LibroSimilar.objects.order_by().values_list('libro_id', flat=True).first()
+    return tambien_compraron(libro_id, 10)
+
+@registrar_consulta('recomendaciones.similares_contenido')
+def consulta_similares_contenido():
+    libro_id = LibroSimilarContenido.objects.order_by().values_list('libro_id', flat=True).first()
+    return similares_por_contenido(libro_id)[:10]
+
+@registrar_consulta('recomendaciones.feed_usuario')
+def consulta_feed_usuario():
+    usuario_id = FeedUsuario.objects.order_by().values_list('usuario_id', flat=True).first()
+    return FeedUsuario.objects.filter(usuario_id=usuario_id)
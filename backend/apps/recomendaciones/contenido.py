@@ -0,0 +1,275 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import connection, transaction
+from apps.busqueda.cache import incrementar_version_catalogo
+from apps.libros.models import Libro
+from .models import LibroSimilarContenido, TerminoLibro
+
+# Peso de una aparición del término según el campo del search_vector en que está (ver la migración
+# 0003 de libros): A título, B autor, C editorial, D descripción. La categoría cuenta como un término más.
+PESOS_CAMPO = {'A': 3.0, 'B': 2.0, 'C': 1.0, 'D': 1.0}
+PESO_CATEGORIA = 2.0
+
+# Campos del libro que cambian su vector; un save() que no modifica ninguno no lo recalcula
+CAMPOS_CONTENIDO = {'titulo', 'autor', 'editorial', 'descripcion', 'categoria'}
+
+logger = logging.getLogger(__name__)
+
+# Clave del advisory lock que serializa la reconstrucción completa y las actualizaciones incrementales
+# (hilos de cada proceso y cron): las dos borran y reinsertan las listas de los mismos libros
+BLOQUEO_CONTENIDO = 7301
+
+def _bloquear(cursor):
+    """Espera a que termine otra actualización del contenido; el lock se libera al terminar la transacción"""
+    cursor.execute("SELECT pg_advisory_xact_lock(%s)", [BLOQUEO_CONTENIDO])
+_ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='recomendaciones-contenido')
+
+# Cantidad de libros para el IDF de la actualización incremental: la estimación de las estadísticas
+# de PostgreSQL evita contar el catálogo en cada guardado (se cuenta si la tabla nunca se analizó)
+SQL_TOTAL_ESTIMADO = f"""
+    SELECT CASE WHEN c.reltuples > 0 THEN c.reltuples::bigint
+                ELSE (SELECT COUNT(*) FROM {Libro._meta.db_table}) END AS n
+    FROM pg_class c WHERE c.oid = '{Libro._meta.db_table}'::regclass
+"""
+
+def _sql_terminos(filtro=''):
+    """Términos de los libros (libro_id, termino, frecuencia), leídos de search_vector y categoria_id"""
+    tabla = Libro._meta.db_table
+    return f"""
+        SELECT l.id AS libro_id, t.lexeme AS termino,
+               COALESCE((
+                   SELECT SUM(CASE p::text WHEN 'A' THEN %(peso_a)s WHEN 'B' THEN %(peso_b)s
+                                           WHEN 'C' THEN %(peso_c)s ELSE %(peso_d)s END)
+                   FROM unnest(t.weights) AS p
+               ), 1) AS frecuencia
+        FROM {tabla} l CROSS JOIN LATERAL unnest(l.search_vector) AS t
+        {filtro}
+        UNION ALL
+        SELECT l.id, 'categoria:' || l.categoria_id, %(peso_categoria)s
+        FROM {tabla} l
+        {filtro}
+    """
+
+def _parametros(**extra):
+    return {
+        'peso_a': PESOS_CAMPO['A'], 'peso_b': PESOS_CAMPO['B'], 'peso_c': PESOS_CAMPO['C'], 'peso_d': PESOS_CAMPO['D'],
+        'peso_categoria': PESO_CATEGORIA,
+        'vecinos': settings.RECOMENDACIONES_CONTENIDO_VECINOS,
+        'max_df': settings.RECOMENDACIONES_CONTENIDO_MAX_DF,
+        'terminos_busqueda': settings.RECOMENDACIONES_CONTENIDO_TERMINOS,
+        'libros_termino': settings.RECOMENDACIONES_CONTENIDO_LIBROS_POR_TERMINO,
+        **extra
+    }
+
+def calcular_similares_contenido():
+    """
+    Reconstruye la matriz TF-IDF (TerminoLibro) y los vecinos por contenido (LibroSimilarContenido).
+
+    TF es la frecuencia del término ponderada por campo (PESOS_CAMPO) e IDF es ln((1 + N) / (1 + df)) + 1;
+    cada vector se normaliza, así el coseno entre dos libros es la suma de los productos de sus pesos.
+    Los términos presentes en más de RECOMENDACIONES_CONTENIDO_MAX_DF del catálogo cuentan en la norma
+    pero no generan pares. Para acotar el producto, cada libro busca vecinos solo con sus
+    RECOMENDACIONES_CONTENIDO_TERMINOS términos de mayor peso, y cada término empareja solo a los
+    RECOMENDACIONES_CONTENIDO_LIBROS_POR_TERMINO libros en que más pesa (a lo sumo N·T·M pares).
+    Todo se calcula en PostgreSQL; los lectores ven las tablas anteriores hasta el commit.
+    Retorna la cantidad de pares de vecinos escritos.
+    """
+    terminos = TerminoLibro._meta.db_table
+    vecinos = LibroSimilarContenido._meta.db_table
+    with transaction.atomic(), connection.cursor() as cursor:
+        _bloquear(cursor)
+        cursor.execute(f"DELETE FROM {vecinos}")
+        cursor.execute(f"DELETE FROM {terminos}")
+        cursor.execute(f"""
+            WITH lexemas AS ({_sql_terminos()}),
+            total AS (SELECT COUNT(*) AS n FROM {Libro._meta.db_table}),
+            documentos AS (SELECT termino, COUNT(*) AS df FROM lexemas GROUP BY termino),
+            pesos AS (
+                SELECT t.libro_id, t.termino, t.frecuencia,
+                       t.frecuencia * (LN((1 + total.n)::float / (1 + d.df)) + 1) AS peso
+                FROM lexemas t JOIN documentos d ON d.termino = t.termino CROSS JOIN total
+            )
+            INSERT INTO {terminos} (libro_id, termino, frecuencia, peso)
+            SELECT libro_id, termino, frecuencia, peso / SQRT(SUM(peso * peso) OVER (PARTITION BY libro_id))
+            FROM pesos
+        """, _parametros())
+        cursor.execute(f"""
+            WITH total AS (SELECT COUNT(*) AS n FROM {Libro._meta.db_table}),
+            validos AS (
+                SELECT termino FROM {terminos} GROUP BY termino
+                HAVING COUNT(*) > 1 AND COUNT(*) <= %(max_df)s * (SELECT n FROM total)
+            ),
+            busqueda AS (
+                SELECT libro_id, termino, peso FROM (
+                    SELECT t.libro_id, t.termino, t.peso,
+                           ROW_NUMBER() OVER (PARTITION BY t.libro_id ORDER BY t.peso DESC, t.termino) AS orden
+                    FROM {terminos} t JOIN validos v ON v.termino = t.termino
+                ) x WHERE orden <= %(terminos_busqueda)s
+            ),
+            listas AS (
+                SELECT libro_id, termino, peso FROM (
+                    SELECT t.libro_id, t.termino, t.peso,
+                           ROW_NUMBER() OVER (PARTITION BY t.termino ORDER BY t.peso DESC, t.libro_id) AS orden
+                    FROM {terminos} t JOIN validos v ON v.termino = t.termino
+                ) x WHERE orden <= %(libros_termino)s
+            ),
+            pares AS (
+                SELECT a.libro_id, b.libro_id AS similar_id, SUM(a.peso * b.peso) AS puntaje
+                FROM busqueda a
+                JOIN listas b ON b.termino = a.termino AND b.libro_id <> a.libro_id
+                GROUP BY a.libro_id, b.libro_id
+            ),
+            ranking AS (
+                SELECT libro_id, similar_id, puntaje,
+                       ROW_NUMBER() OVER (PARTITION BY libro_id ORDER BY puntaje DESC, similar_id) AS posicion
+                FROM pares
+            )
+            INSERT INTO {vecinos} (libro_id, similar_id, posicion, puntaje)
+            SELECT libro_id, similar_id, posicion, puntaje FROM ranking WHERE posicion <= %(vecinos)s
+        """, _parametros())
+        return cursor.rowcount
+
+def actualizar_similares_contenido(libro_ids):
+    """
+    Actualiza incrementalmente los libros indicados (nuevos o modificados).
+
+    Solo se procesan los libros cuyos términos cambiaron. Sus vectores se recalculan con la frecuencia
+    de documento actual, sus listas de vecinos se rehacen y se insertan en las listas de los libros
+    que comparten términos con ellos en las que quedan entre los primeros. Los vectores de los demás libros (y el IDF) solo se ajustan en la
+    próxima reconstrucción completa; una lista de la que sale un libro queda con un vecino menos hasta entonces.
+    Retorna la cantidad de libros actualizados.
+    """
+    if not libro_ids:
+        return 0
+    terminos = TerminoLibro._meta.db_table
+    vecinos = LibroSimilarContenido._meta.db_table
+    with transaction.atomic(), connection.cursor() as cursor:
+        _bloquear(cursor)
+        cursor.execute(_sql_terminos('WHERE l.id = ANY(%(ids)s)'), _parametros(ids=list(libro_ids)))
+        nuevos = {}
+        for libro_id, termino, frecuencia in cursor.fetchall():
+            nuevos.setdefault(libro_id, {})[termino] = frecuencia
+        actuales = {}
+        for libro_id, termino, frecuencia in TerminoLibro.objects.filter(libro_id__in=nuevos).values_list(
+            'libro_id', 'termino', 'frecuencia'
+        ):
+            actuales.setdefault(libro_id, {})[termino] = frecuencia
+        ids = [libro_id for libro_id, vector in nuevos.items() if actuales.get(libro_id) != vector]
+        if not ids:
+            return 0
+
+        cursor.execute(f"DELETE FROM {terminos} WHERE libro_id = ANY(%(ids)s)", {'ids': ids})
+        cursor.execute(f"""
+            WITH lexemas AS ({_sql_terminos('WHERE l.id = ANY(%(ids)s)')}),
+            total AS ({SQL_TOTAL_ESTIMADO}),
+            pesos AS (
+                SELECT t.libro_id, t.termino, t.frecuencia,
+                       t.frecuencia * (LN((1 + total.n)::float / (1 + d.df)) + 1) AS peso
+                FROM lexemas t
+                CROSS JOIN total
+                CROSS JOIN LATERAL (
+                    SELECT COUNT(*) + (SELECT COUNT(*) FROM lexemas o WHERE o.termino = t.termino) AS df
+                    FROM {terminos} e WHERE e.termino = t.termino
+                ) d
+            )
+            INSERT INTO {terminos} (libro_id, termino, frecuencia, peso)
+            SELECT libro_id, termino, frecuencia, peso / SQRT(SUM(peso * peso) OVER (PARTITION BY libro_id))
+            FROM pesos
+        """, _parametros(ids=ids))
+        # Los pares son simétricos: los del libro cambiado se insertan en ambas listas
+        cursor.execute(f"""
+            WITH total AS ({SQL_TOTAL_ESTIMADO}),
+            validos AS (
+                SELECT c.termino
+                FROM (SELECT DISTINCT termino FROM {terminos} WHERE libro_id = ANY(%(ids)s)) c
+                WHERE (SELECT COUNT(*) FROM {terminos} e WHERE e.termino = c.termino)
+                      BETWEEN 2 AND %(max_df)s * (SELECT n FROM total)
+            ),
+            busqueda AS (
+                SELECT libro_id, termino, peso FROM (
+                    SELECT t.libro_id, t.termino, t.peso,
+                           ROW_NUMBER() OVER (PARTITION BY t.libro_id ORDER BY t.peso DESC, t.termino) AS orden
+                    FROM {terminos} t JOIN validos v ON v.termino = t.termino
+                    WHERE t.libro_id = ANY(%(ids)s)
+                ) x WHERE orden <= %(terminos_busqueda)s
+            ),
+            pares AS (
+                SELECT a.libro_id, b.libro_id AS similar_id, SUM(a.peso * b.peso) AS puntaje
+                FROM busqueda a
+                CROSS JOIN LATERAL (
+                    SELECT e.libro_id, e.peso FROM {terminos} e
+                    WHERE e.termino = a.termino
+                    ORDER BY e.peso DESC, e.libro_id
+                    LIMIT %(libros_termino)s
+                ) b
+                WHERE b.libro_id <> a.libro_id
+                GROUP BY a.libro_id, b.libro_id
+            ),
+            nuevos AS (
+                SELECT libro_id, similar_id, puntaje FROM pares
+                UNION ALL
+                -- En las listas de los demás libros solo entra si supera al último vecino (o la lista no está llena)
+                SELECT p.similar_id, p.libro_id, p.puntaje FROM pares p
+                WHERE NOT p.similar_id = ANY(%(ids)s) AND NOT EXISTS (
+                    SELECT 1 FROM {vecinos} v
+                    WHERE v.libro_id = p.similar_id AND v.posicion = %(vecinos)s AND v.puntaje >= p.puntaje
+                )
+            ),
+            afectados AS (
+                SELECT libro_id FROM nuevos
+                UNION
+                SELECT libro_id FROM {vecinos} WHERE similar_id = ANY(%(ids)s)
+                UNION
+                SELECT unnest(%(ids)s::bigint[])
+            ),
+            anteriores AS (
+                DELETE FROM {vecinos} WHERE libro_id IN (SELECT libro_id FROM afectados)
+                RETURNING libro_id, similar_id, puntaje
+            ),
+            ranking AS (
+                SELECT libro_id, similar_id, puntaje,
+                       ROW_NUMBER() OVER (PARTITION BY libro_id ORDER BY puntaje DESC, similar_id) AS posicion
+                FROM (
+                    SELECT * FROM anteriores
+                    WHERE NOT (libro_id = ANY(%(ids)s) OR similar_id = ANY(%(ids)s))
+                    UNION ALL
+                    SELECT * FROM nuevos
+                ) candidatos
+            )
+            INSERT INTO {vecinos} (libro_id, similar_id, posicion, puntaje)
+            SELECT libro_id, similar_id, posicion, puntaje FROM ranking WHERE posicion <= %(vecinos)s
+        """, _parametros(ids=ids))
+        return len(ids)
+
+def similares_por_contenido(libro_id):
+    """Libros más parecidos por contenido, de más a menos similar: una consulta por el índice (libro, posicion)"""
+    return Libro.objects.filter(similar_contenido_de__libro_id=libro_id).order_by('similar_contenido_de__posicion')
+
+def programar_actualizacion_contenido(libro_ids):
+    """
+    Programa la actualización incremental de los libros para después del commit, fuera del hilo
+    de la petición. Si la transacción se revierte, no se hace nada.
+    """
+    transaction.on_commit(lambda: _enviar(list(libro_ids)))
+
+def _enviar(libro_ids):
+    if settings.RECOMENDACIONES_CONTENIDO_EN_SEGUNDO_PLANO:
+        _ejecutor.submit(_actualizar_en_hilo, libro_ids)
+    else:
+        actualizar_contenido(libro_ids)
+
+def _actualizar_en_hilo(libro_ids):
+    try:
+        actualizar_contenido(libro_ids)
+    except Exception as e:
+        # La reconstrucción completa (manage.py calcular_similares_contenido) los corrige después
+        logger.error(f"Error al actualizar los similares por contenido de los libros {libro_ids}: {e}")
+    finally:
+        # El hilo abre su propia conexión; se cierra para no dejarla huérfana
+        connection.close()
+
+def actualizar_contenido(libro_ids):
+    """Actualiza los libros y, si cambió algún vecino, invalida la caché de las lecturas del catálogo"""
+    if actualizar_similares_contenido(libro_ids):
+        incrementar_version_catalogo()
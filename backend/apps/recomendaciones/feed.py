@@ -0,0 +1,116 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from apps.compras.models import PedidoLibro, Pedidos
+from apps.libros.models import Categoria, Libro
+from apps.usuarios.models import Usuario, UsuarioPreferencias
+from .models import FeedUsuario, LibroSimilar
+
+def calcular_feeds(usuario_ids):
+    """
+    Calcula y guarda el feed de cada usuario indicado con una sola sentencia. Retorna {usuario_id: FeedUsuario}.
+
+    Candidatos: libros de los autores y categorías de sus preferencias, vecinos (LibroSimilar) de lo que
+    compró y los más populares del catálogo. El puntaje de cada libro con stock que no compró es
+      RECOMENDACIONES_FEED_PESO_PREFERENCIA por cada preferencia que cumple
+      + RECOMENDACIONES_FEED_PESO_HISTORIAL × la similitud con cada libro comprado
+      + RECOMENDACIONES_FEED_PESO_POPULARIDAD × popularidad / popularidad máxima.
+    """
+    if not usuario_ids:
+        return {}
+    libros = Libro._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            WITH usuarios AS (SELECT DISTINCT unnest(%(usuarios)s::bigint[]) AS usuario_id),
+            preferencias AS (
+                SELECT p.usuario_id, unnest(p.preferencias) AS valor
+                FROM {UsuarioPreferencias._meta.db_table} p JOIN usuarios u ON u.usuario_id = p.usuario_id
+            ),
+            compras AS (
+                SELECT DISTINCT p.usuario_id, pl.libro_id
+                FROM {Pedidos._meta.db_table} p
+                JOIN usuarios u ON u.usuario_id = p.usuario_id
+                JOIN {PedidoLibro._meta.db_table} pl ON pl.pedido_id = p.id
+                WHERE p.estado <> 'Cancelado'
+            ),
+            populares AS (
+                SELECT id AS libro_id FROM {libros}
+                ORDER BY popularidad DESC, id DESC
+                LIMIT %(tamano)s
+            ),
+            candidatos AS (
+                SELECT pr.usuario_id, l.id AS libro_id, %(peso_preferencia)s AS puntaje
+                FROM preferencias pr JOIN {libros} l ON l.autor = pr.valor
+                UNION ALL
+                SELECT pr.usuario_id, l.id, %(peso_preferencia)s
+                FROM preferencias pr
+                JOIN {Categoria._meta.db_table} c ON c.nombre = pr.valor
+                JOIN {libros} l ON l.categoria_id = c.id
+                UNION ALL
+                SELECT c.usuario_id, s.similar_id, %(peso_historial)s * s.puntaje
+                FROM compras c JOIN {LibroSimilar._meta.db_table} s ON s.libro_id = c.libro_id
+                UNION ALL
+                SELECT u.usuario_id, p.libro_id, 0 FROM usuarios u CROSS JOIN populares p
+            ),
+            puntajes AS (
+                SELECT c.usuario_id, c.libro_id,
+                       SUM(c.puntaje) + %(peso_popularidad)s * MAX(l.popularidad) / m.maxima AS puntaje
+                FROM candidatos c
+                JOIN {libros} l ON l.id = c.libro_id
+                CROSS JOIN (SELECT GREATEST(MAX(popularidad), 1) AS maxima FROM {libros}) m
+                WHERE l.stock > 0 AND NOT EXISTS (
+                    SELECT 1 FROM compras x WHERE x.usuario_id = c.usuario_id AND x.libro_id = c.libro_id
+                )
+                GROUP BY c.usuario_id, c.libro_id, m.maxima
+            ),
+            ranking AS (
+                SELECT usuario_id, libro_id, puntaje,
+                       ROW_NUMBER() OVER (PARTITION BY usuario_id ORDER BY puntaje DESC, libro_id DESC) AS posicion
+                FROM puntajes
+            )
+            INSERT INTO {FeedUsuario._meta.db_table} (usuario_id, libros, puntajes, fecha_calculo)
+            SELECT u.usuario_id,
+                   COALESCE(array_agg(r.libro_id ORDER BY r.posicion) FILTER (WHERE r.libro_id IS NOT NULL), '{{}}'),
+                   COALESCE(array_agg(r.puntaje ORDER BY r.posicion) FILTER (WHERE r.libro_id IS NOT NULL), '{{}}'),
+                   %(ahora)s
+            FROM usuarios u
+            JOIN {Usuario._meta.db_table} existente ON existente.id = u.usuario_id
+            LEFT JOIN ranking r ON r.usuario_id = u.usuario_id AND r.posicion <= %(tamano)s
+            GROUP BY u.usuario_id
+            ON CONFLICT (usuario_id) DO UPDATE
+            SET libros = EXCLUDED.libros, puntajes = EXCLUDED.puntajes, fecha_calculo = EXCLUDED.fecha_calculo
+            RETURNING usuario_id, libros, puntajes, fecha_calculo
+        """, {
+            'usuarios': list(usuario_ids),
+            'tamano': settings.RECOMENDACIONES_FEED_TAMANO,
+            'peso_preferencia': settings.RECOMENDACIONES_FEED_PESO_PREFERENCIA,
+            'peso_historial': settings.RECOMENDACIONES_FEED_PESO_HISTORIAL,
+            'peso_popularidad': settings.RECOMENDACIONES_FEED_PESO_POPULARIDAD,
+            'ahora': timezone.now(),
+        })
+        return {
+            usuario_id: FeedUsuario(usuario_id=usuario_id, libros=libros, puntajes=puntajes, fecha_calculo=fecha)
+            for usuario_id, libros, puntajes, fecha in cursor.fetchall()
+        }
+
+def obtener_feed(usuario):
+    """
+    Feed guardado del usuario (una consulta por clave primaria). Si no existe o venció
+    (RECOMENDACIONES_FEED_VIGENCIA_HORAS) se calcula en ese momento y queda guardado.
+    """
+    feed = FeedUsuario.objects.filter(usuario=usuario).first()
+    vencimiento = timezone.now() - timedelta(hours=settings.RECOMENDACIONES_FEED_VIGENCIA_HORAS)
+    if feed is None or feed.fecha_calculo < vencimiento:
+        feed = calcular_feeds([usuario.pk])[usuario.pk]
+    return feed
+
+def invalidar_feed(usuario_id):
+    FeedUsuario.objects.filter(usuario_id=usuario_id).delete()
+
+def usuarios_activos(dias):
+    """Ids de los usuarios que iniciaron sesión o hicieron un pedido en los últimos `dias` días"""
+    desde = timezone.now() - timedelta(days=dias)
+    con_sesion = Usuario.objects.filter(last_login__gte=desde).values_list('id', flat=True)
+    con_pedidos = Pedidos.objects.filter(fecha__gte=desde).values_list('usuario_id', flat=True)
+    return con_sesion.union(con_pedidos).order_by('id')
@@ -0,0 +1,80 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from apps.compras.models import PedidoLibro, Pedidos
+from apps.libros.models import Categoria, Libro
+from apps.recomendaciones.similares import calcular_similares, tambien_compraron
+from apps.usuarios.models import Usuario
+
+class Command(BaseCommand):
+    help = (
+        "Mide el cálculo de libros similares y la consulta del endpoint sobre un conjunto sintético de pedidos. "
+        "Los datos se generan dentro de una transacción que siempre se revierte."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pedidos', type=int, default=100000, help="Pedidos sintéticos")
+        parser.add_argument('--libros', type=int, default=5000, help="Libros sintéticos")
+        parser.add_argument('--max-libros-pedido', type=int, default=5, help="Máximo de libros distintos por pedido")
+        parser.add_argument('--consultas', type=int, default=1000, help="Consultas del endpoint a medir")
+        parser.add_argument('--semilla', type=float, default=0.42, help="Semilla de random() de PostgreSQL (-1 a 1)")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("El benchmark requiere PostgreSQL")
+        if min(options['pedidos'], options['libros'], options['max_libros_pedido'], options['consultas']) < 1:
+            raise CommandError("--pedidos, --libros, --max-libros-pedido y --consultas deben ser mayores que cero")
+
+        with transaction.atomic():
+            inicio = time.perf_counter()
+            libros = self.generar_datos(options)
+            self.stdout.write(f"Datos generados en {time.perf_counter() - inicio:.2f} s")
+
+            inicio = time.perf_counter()
+            filas = calcular_similares()
+            self.stdout.write(f"calcular_similares: {filas} filas en {time.perf_counter() - inicio:.2f} s")
+
+            consultados = [libros[i * len(libros) // options['consultas']] for i in range(options['consultas'])]
+            inicio = time.perf_counter()
+            for libro_id in consultados:
+                list(tambien_compraron(libro_id, 10).values_list('id', flat=True))
+            total = time.perf_counter() - inicio
+            self.stdout.write(
+                f"tambien_compraron: {options['consultas']} consultas, {total * 1000 / options['consultas']:.3f} ms promedio"
+            )
+            transaction.set_rollback(True)
+
+    def generar_datos(self, options):
+        """Libros, pedidos y líneas de pedido sintéticos; los libros de menor índice se venden más"""
+        categoria = Categoria.objects.create(nombre='Benchmark similares')
+        usuario = Usuario.objects.create_user(
+            username='benchmark_similares', email='benchmark@similares.local', password=None,
+            numero_identificacion='benchmark-similares'
+        )
+        Libro.objects.bulk_create([
+            Libro(
+                titulo=f'Libro {i}', autor=f'Autor {i % 500}', isbn=f'B{i:012d}', categoria=categoria,
+                precio='10.00', stock=10, año_publicacion=2000
+            )
+            for i in range(options['libros'])
+        ], batch_size=2000)
+        libros = list(Libro.objects.filter(categoria=categoria).order_by('id').values_list('id', flat=True))
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT setseed(%s)", [options['semilla']])
+            cursor.execute(f"""
+                INSERT INTO {Pedidos._meta.db_table} (fecha, usuario_id, estado)
+                SELECT NOW(), %s, 'Entregado' FROM generate_series(1, %s)
+            """, [usuario.id, options['pedidos']])
+            # power(random(), 2) concentra las ventas en pocos libros, como en un catálogo real
+            cursor.execute(f"""
+                INSERT INTO {PedidoLibro._meta.db_table} (pedido_id, libro_id, cantidad)
+                SELECT p.id, (%s::integer[])[1 + floor(power(random(), 2) * %s)::integer], 1
+                FROM {Pedidos._meta.db_table} p
+                CROSS JOIN LATERAL generate_series(1, 1 + p.id %% %s) AS linea
+                WHERE p.usuario_id = %s
+                ON CONFLICT (pedido_id, libro_id) DO NOTHING
+            """, [libros, len(libros), options['max_libros_pedido'], usuario.id])
+            self.stdout.write(f"{options['pedidos']} pedidos, {cursor.rowcount} líneas, {len(libros)} libros")
+            cursor.execute(f"ANALYZE {PedidoLibro._meta.db_table}")
+        return libros
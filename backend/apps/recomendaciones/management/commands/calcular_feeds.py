@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from apps.recomendaciones.feed import calcular_feeds, usuarios_activos
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula en lote el feed personalizado de los usuarios activos (sesión o pedido en los últimos días). "
+        "Los demás lo calculan al consultarlo. Pensado para ejecutarse periódicamente (p. ej. cada noche con cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=settings.RECOMENDACIONES_FEED_DIAS_ACTIVO,
+                            help="Días hacia atrás para considerar activo a un usuario")
+        parser.add_argument('--lote', type=int, default=500, help="Usuarios por sentencia")
+
+    def handle(self, *args, **options):
+        if options['dias'] < 1 or options['lote'] < 1:
+            raise CommandError("--dias y --lote deben ser mayores que cero")
+        usuarios = list(usuarios_activos(options['dias']))
+        for inicio in range(0, len(usuarios), options['lote']):
+            calcular_feeds(usuarios[inicio:inicio + options['lote']])
+        self.stdout.write(self.style.SUCCESS(
+            f"Feeds recalculados: {len(usuarios)} usuarios activos en los últimos {options['dias']} días."
+        ))
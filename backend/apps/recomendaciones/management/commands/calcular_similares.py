@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from apps.recomendaciones.similares import calcular_similares
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye la tabla de libros similares (\"los clientes también compraron\") a partir de pedidos, "
+        "carritos y reservas. Pensado para ejecutarse periódicamente (p. ej. cada noche con cron)."
+    )
+
+    def handle(self, *args, **options):
+        filas = calcular_similares()
+        self.stdout.write(self.style.SUCCESS(
+            f"Libros similares recalculados: {filas} filas (hasta {settings.RECOMENDACIONES_VECINOS} vecinos por libro)."
+        ))
@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from apps.busqueda.cache import incrementar_version_catalogo
+from apps.recomendaciones.contenido import calcular_similares_contenido
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye la matriz TF-IDF del contenido de los libros y sus vecinos por contenido. "
+        "Los cambios de cada libro se aplican incrementalmente; la reconstrucción recalcula el IDF "
+        "de todo el catálogo (p. ej. cada noche con cron, o después de una importación grande)."
+    )
+
+    def handle(self, *args, **options):
+        filas = calcular_similares_contenido()
+        incrementar_version_catalogo()
+        self.stdout.write(self.style.SUCCESS(
+            f"Libros similares por contenido recalculados: {filas} filas "
+            f"(hasta {settings.RECOMENDACIONES_CONTENIDO_VECINOS} vecinos por libro)."
+        ))
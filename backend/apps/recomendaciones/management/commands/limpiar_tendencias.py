@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from apps.recomendaciones.tendencias import limpiar_actividad
+
+class Command(BaseCommand):
+    help = (
+        "Borra los contadores de actividad que quedaron fuera de la ventana de tendencias "
+        "(RECOMENDACIONES_TENDENCIAS_VENTANA_HORAS). Pensado para ejecutarse periódicamente (p. ej. cada hora)."
+    )
+
+    def handle(self, *args, **options):
+        borrados = limpiar_actividad()
+        self.stdout.write(self.style.SUCCESS(
+            f"Contadores borrados: {borrados} (ventana de {settings.RECOMENDACIONES_TENDENCIAS_VENTANA_HORAS} horas)."
+        ))
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from apps.recomendaciones.reglas import minar_reglas
+
+class Command(BaseCommand):
+    help = (
+        "Mina las reglas de asociación \"se compran juntos\" de los pedidos y reemplaza la tabla de reglas. "
+        "Los pares se cuentan en PostgreSQL por tandas de libros, con memoria acotada en el proceso. "
+        "Pensado para ejecutarse periódicamente (p. ej. cada noche con cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=1000, help="Libros antecedentes por sentencia")
+        parser.add_argument('--min-pedidos', type=int, default=settings.RECOMENDACIONES_REGLAS_MIN_PEDIDOS,
+                            help="Pedidos mínimos en que aparecen juntos los dos libros (soporte absoluto)")
+        parser.add_argument('--min-confianza', type=float, default=settings.RECOMENDACIONES_REGLAS_MIN_CONFIANZA,
+                            help="Confianza mínima de una regla (0 a 1)")
+        parser.add_argument('--reglas-por-libro', type=int, default=settings.RECOMENDACIONES_REGLAS_POR_LIBRO,
+                            help="Reglas que se guardan por libro")
+
+    def handle(self, *args, **options):
+        if min(options['lote'], options['min_pedidos'], options['reglas_por_libro']) < 1:
+            raise CommandError("--lote, --min-pedidos y --reglas-por-libro deben ser mayores que cero")
+        if not 0 <= options['min_confianza'] <= 1:
+            raise CommandError("--min-confianza debe estar entre 0 y 1")
+
+        procesados = escritas = 0
+        for procesados, escritas in minar_reglas(
+            lote=options['lote'], min_pedidos=options['min_pedidos'],
+            min_confianza=options['min_confianza'], reglas_por_libro=options['reglas_por_libro']
+        ):
+            self.stdout.write(f"  {procesados} libros procesados, {escritas} reglas")
+        self.stdout.write(self.style.SUCCESS(
+            f"Reglas de asociación minadas: {escritas} reglas para {procesados} libros frecuentes."
+        ))
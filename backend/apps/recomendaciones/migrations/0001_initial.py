@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:47
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('libros', '0009_libro_popularidad'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LibroSimilar',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('posicion', models.PositiveSmallIntegerField()),
+                ('puntaje', models.FloatField()),
+                ('libro', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similares', to='libros.libro')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_de', to='libros.libro')),
+            ],
+            options={
+                'verbose_name': 'Libro similar',
+                'verbose_name_plural': 'Libros similares',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='librosimilar',
+            constraint=models.UniqueConstraint(fields=('libro', 'posicion'), name='libro_similar_posicion_unica'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('libros', '0009_libro_popularidad'),
+        ('recomendaciones', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LibroSimilarContenido',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('posicion', models.PositiveSmallIntegerField()),
+                ('puntaje', models.FloatField()),
+                ('libro', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similares_contenido', to='libros.libro')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_contenido_de', to='libros.libro')),
+            ],
+            options={
+                'verbose_name': 'Libro similar por contenido',
+                'verbose_name_plural': 'Libros similares por contenido',
+            },
+        ),
+        migrations.CreateModel(
+            name='TerminoLibro',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('termino', models.TextField()),
+                ('frecuencia', models.FloatField()),
+                ('peso', models.FloatField()),
+                ('libro', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terminos', to='libros.libro')),
+            ],
+            options={
+                'verbose_name': 'Término de libro',
+                'verbose_name_plural': 'Términos de libros',
+                'indexes': [models.Index(fields=['termino', '-peso'], name='termino_libro_termino_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='terminolibro',
+            constraint=models.UniqueConstraint(fields=('libro', 'termino'), name='termino_libro_unico'),
+        ),
+        migrations.AddConstraint(
+            model_name='librosimilarcontenido',
+            constraint=models.UniqueConstraint(fields=('libro', 'posicion'), name='libro_similar_contenido_posicion_unica'),
+        ),
+    ]
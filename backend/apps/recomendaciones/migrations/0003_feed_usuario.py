@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:16
+
+from django.conf import settings
+import django.contrib.postgres.fields
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0001_initial'),
+        ('recomendaciones', '0002_contenido'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedUsuario',
+            fields=[
+                ('usuario', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='feed', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('libros', django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), default=list, size=None)),
+                ('puntajes', django.contrib.postgres.fields.ArrayField(base_field=models.FloatField(), default=list, size=None)),
+                ('fecha_calculo', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Feed de usuario',
+                'verbose_name_plural': 'Feeds de usuarios',
+            },
+        ),
+    ]
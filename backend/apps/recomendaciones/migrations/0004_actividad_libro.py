@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('libros', '0009_libro_popularidad'),
+        ('recomendaciones', '0003_feed_usuario'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActividadLibro',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hora', models.DateTimeField()),
+                ('puntaje', models.FloatField(default=0)),
+                ('libro', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='actividad', to='libros.libro')),
+            ],
+            options={
+                'verbose_name': 'Actividad de libro',
+                'verbose_name_plural': 'Actividad de libros',
+                'indexes': [models.Index(fields=['hora'], name='actividad_libro_hora_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='actividadlibro',
+            constraint=models.UniqueConstraint(fields=('libro', 'hora'), name='actividad_libro_hora_unica'),
+        ),
+    ]
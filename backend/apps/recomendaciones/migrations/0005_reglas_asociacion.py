@@ -0,0 +1,36 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('libros', '0009_libro_popularidad'),
+        ('recomendaciones', '0004_actividad_libro'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReglaAsociacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('posicion', models.PositiveSmallIntegerField()),
+                ('pedidos', models.PositiveIntegerField()),
+                ('soporte', models.FloatField()),
+                ('confianza', models.FloatField()),
+                ('lift', models.FloatField()),
+                ('antecedente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reglas', to='libros.libro')),
+                ('consecuente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reglas_consecuente', to='libros.libro')),
+            ],
+            options={
+                'verbose_name': 'Regla de asociación',
+                'verbose_name_plural': 'Reglas de asociación',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='reglaasociacion',
+            constraint=models.UniqueConstraint(fields=('antecedente', 'posicion'), name='regla_antecedente_posicion_unica'),
+        ),
+    ]
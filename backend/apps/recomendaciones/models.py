@@ -1,3 +1,137 @@
+from django.contrib.postgres.fields import ArrayField
 from django.db import models
+from apps.libros.models import Libro
+from apps.usuarios.models import Usuario
 
-# Create your models here.
+class LibroSimilar(models.Model):
+    """
+    Vecinos más cercanos de cada libro según la co-ocurrencia en pedidos, carritos y reservas
+    ("los clientes que compraron este libro también compraron"). La tabla se reconstruye
+    con manage.py calcular_similares; cada libro guarda a lo sumo RECOMENDACIONES_VECINOS filas.
+    """
+    libro = models.ForeignKey(Libro, on_delete=models.CASCADE, related_name='similares')
+    similar = models.ForeignKey(Libro, on_delete=models.CASCADE, related_name='similar_de')
+    posicion = models.PositiveSmallIntegerField()
+    puntaje = models.FloatField()
+
+    class Meta:
+        constraints = [
+            # También es el índice de la consulta del endpoint: libro_id = X ORDER BY posicion
+            models.UniqueConstraint(fields=['libro', 'posicion'], name='libro_similar_posicion_unica'),
+        ]
+        verbose_name = 'Libro similar'
+        verbose_name_plural = 'Libros similares'
+
+    def __str__(self):
+        return f"{self.libro_id} → {self.similar_id} ({self.puntaje:.3f})"
+
+class TerminoLibro(models.Model):
+    """
+    Fila dispersa de la matriz TF-IDF del contenido de un libro: un término (lexema de su search_vector
+    o la categoría) con su frecuencia ponderada por campo y su peso TF-IDF normalizado (norma 1 por libro).
+    """
+    libro = models.ForeignKey(Libro, on_delete=models.CASCADE, related_name='terminos')
+    termino = models.TextField()
+    frecuencia = models.FloatField()
+    peso = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['libro', 'termino'], name='termino_libro_unico'),
+        ]
+        indexes = [
+            # Lista invertida ordenada por peso: frecuencia de documento y libros en que más pesa un término
+            models.Index(fields=['termino', '-peso'], name='termino_libro_termino_idx'),
+        ]
+        verbose_name = 'Término de libro'
+        verbose_name_plural = 'Términos de libros'
+
+    def __str__(self):
+        return f"{self.libro_id}: {self.termino} ({self.peso:.3f})"
+
+class LibroSimilarContenido(models.Model):
+    """
+    Vecinos más cercanos de cada libro por similitud de contenido (coseno entre sus vectores TF-IDF).
+    Sirve para los libros sin historial de compras; se mantiene con cada cambio de un libro
+    y se reconstruye con manage.py calcular_similares_contenido.
+    """
+    libro = models.ForeignKey(Libro, on_delete=models.CASCADE, related_name='similares_contenido')
+    similar = models.ForeignKey(Libro, on_delete=models.CASCADE, related_name='similar_contenido_de')
+    posicion = models.PositiveSmallIntegerField()
+    puntaje = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['libro', 'posicion'], name='libro_similar_contenido_posicion_unica'),
+        ]
+        verbose_name = 'Libro similar por contenido'
+        verbose_name_plural = 'Libros similares por contenido'
+
+    def __str__(self):
+        return f"{self.libro_id} → {self.similar_id} ({self.puntaje:.3f})"
+
+class FeedUsuario(models.Model):
+    """
+    Recomendaciones personalizadas precalculadas de un usuario: ids de libros y sus puntajes, en orden.
+    Se borra cuando cambian sus preferencias o hace un pedido, y se vuelve a calcular en lote
+    (manage.py calcular_feeds) o al consultarla.
+    """
+    usuario = models.OneToOneField(Usuario, on_delete=models.CASCADE, primary_key=True, related_name='feed')
+    libros = ArrayField(models.BigIntegerField(), default=list)
+    puntajes = ArrayField(models.FloatField(), default=list)
+    fecha_calculo = models.DateTimeField()
+
+    class Meta:
+        verbose_name = 'Feed de usuario'
+        verbose_name_plural = 'Feeds de usuarios'
+
+    def __str__(self):
+        return f"Feed de {self.usuario_id} ({len(self.libros)} libros)"
+
+class ActividadLibro(models.Model):
+    """
+    Contador de actividad de un libro (carrito, reservas, compras y clics en la búsqueda) en una hora.
+    Cada evento suma su peso a la fila de la hora actual con un upsert atómico; el ranking de tendencias
+    se calcula sobre las horas de la ventana, con decaimiento exponencial.
+    """
+    libro = models.ForeignKey(Libro, on_delete=models.CASCADE, related_name='actividad')
+    hora = models.DateTimeField()
+    puntaje = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['libro', 'hora'], name='actividad_libro_hora_unica'),
+        ]
+        indexes = [
+            models.Index(fields=['hora'], name='actividad_libro_hora_idx'),
+        ]
+        verbose_name = 'Actividad de libro'
+        verbose_name_plural = 'Actividad de libros'
+
+    def __str__(self):
+        return f"{self.libro_id} @ {self.hora:%Y-%m-%d %H:00}: {self.puntaje}"
+
+class ReglaAsociacion(models.Model):
+    """
+    Regla "quien compra `antecedente` también compra `consecuente`", minada de los pedidos con
+    manage.py minar_reglas. Se guardan las RECOMENDACIONES_REGLAS_POR_LIBRO de mayor confianza de cada libro.
+    soporte = pedidos con ambos / pedidos; confianza = pedidos con ambos / pedidos con el antecedente;
+    lift = confianza / soporte del consecuente.
+    """
+    antecedente = models.ForeignKey(Libro, on_delete=models.CASCADE, related_name='reglas')
+    consecuente = models.ForeignKey(Libro, on_delete=models.CASCADE, related_name='reglas_consecuente')
+    posicion = models.PositiveSmallIntegerField()
+    pedidos = models.PositiveIntegerField()
+    soporte = models.FloatField()
+    confianza = models.FloatField()
+    lift = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['antecedente', 'posicion'], name='regla_antecedente_posicion_unica'),
+        ]
+        verbose_name = 'Regla de asociación'
+        verbose_name_plural = 'Reglas de asociación'
+
+    def __str__(self):
+        return f"{self.antecedente_id} → {self.consecuente_id} (confianza {self.confianza:.2f})"
@@ -0,0 +1,106 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max, Subquery
+from apps.compras.models import CarritoLibro, PedidoLibro, Pedidos
+from apps.libros.models import Libro
+from .models import ReglaAsociacion
+
+def minar_reglas(lote=1000, min_pedidos=None, min_confianza=None, reglas_por_libro=None):
+    """
+    Reconstruye la tabla de reglas de asociación entre pares de libros a partir de los pedidos no cancelados.
+
+    Primero se cuentan los pedidos de cada libro y se descartan los que no llegan a `min_pedidos`
+    (ningún par que los incluya puede llegar). Después los pares se cuentan dentro de PostgreSQL
+    por tandas de `lote` libros antecedentes: el proceso solo guarda la lista de ids de libros frecuentes
+    y cada sentencia agrega una parte acotada de los pares, sin importar cuántas líneas de pedido haya.
+    Todo ocurre en una transacción; los lectores ven las reglas anteriores hasta el commit.
+    Genera (antecedentes procesados, reglas escritas) después de cada tanda.
+    """
+    min_pedidos = min_pedidos or settings.RECOMENDACIONES_REGLAS_MIN_PEDIDOS
+    min_confianza = settings.RECOMENDACIONES_REGLAS_MIN_CONFIANZA if min_confianza is None else min_confianza
+    reglas_por_libro = reglas_por_libro or settings.RECOMENDACIONES_REGLAS_POR_LIBRO
+    lineas = PedidoLibro._meta.db_table
+    pedidos = Pedidos._meta.db_table
+    reglas = ReglaAsociacion._meta.db_table
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {reglas}")
+        # ON COMMIT DROP no aplica si la transacción es un savepoint dentro de otra
+        cursor.execute("DROP TABLE IF EXISTS reglas_frecuentes")
+        cursor.execute(f"""
+            CREATE TEMPORARY TABLE reglas_frecuentes ON COMMIT DROP AS
+            SELECT pl.libro_id, COUNT(*) AS pedidos
+            FROM {lineas} pl JOIN {pedidos} p ON p.id = pl.pedido_id
+            WHERE p.estado <> 'Cancelado'
+            GROUP BY pl.libro_id
+            HAVING COUNT(*) >= %s
+        """, [min_pedidos])
+        cursor.execute("CREATE UNIQUE INDEX ON reglas_frecuentes (libro_id)")
+        cursor.execute("ANALYZE reglas_frecuentes")
+        cursor.execute(f"""
+            SELECT COUNT(DISTINCT pl.pedido_id)
+            FROM {lineas} pl JOIN {pedidos} p ON p.id = pl.pedido_id
+            WHERE p.estado <> 'Cancelado'
+        """)
+        total = cursor.fetchone()[0]
+        cursor.execute("SELECT libro_id FROM reglas_frecuentes ORDER BY libro_id")
+        frecuentes = [fila[0] for fila in cursor.fetchall()]
+
+        escritas = 0
+        for inicio in range(0, len(frecuentes), lote):
+            cursor.execute(f"""
+                WITH pares AS (
+                    SELECT a.libro_id AS antecedente_id, b.libro_id AS consecuente_id, COUNT(*) AS juntos
+                    FROM {lineas} a
+                    JOIN {pedidos} p ON p.id = a.pedido_id AND p.estado <> 'Cancelado'
+                    JOIN {lineas} b ON b.pedido_id = a.pedido_id AND b.libro_id <> a.libro_id
+                    JOIN reglas_frecuentes fb ON fb.libro_id = b.libro_id
+                    WHERE a.libro_id = ANY(%(antecedentes)s)
+                    GROUP BY a.libro_id, b.libro_id
+                    HAVING COUNT(*) >= %(min_pedidos)s
+                ),
+                medidas AS (
+                    SELECT pares.antecedente_id, pares.consecuente_id, pares.juntos,
+                           pares.juntos::float / %(total)s AS soporte,
+                           pares.juntos::float / fa.pedidos AS confianza,
+                           pares.juntos::float * %(total)s / (fa.pedidos * fb.pedidos) AS lift
+                    FROM pares
+                    JOIN reglas_frecuentes fa ON fa.libro_id = pares.antecedente_id
+                    JOIN reglas_frecuentes fb ON fb.libro_id = pares.consecuente_id
+                ),
+                ranking AS (
+                    SELECT *, ROW_NUMBER() OVER (
+                        PARTITION BY antecedente_id ORDER BY confianza DESC, lift DESC, consecuente_id
+                    ) AS posicion
+                    FROM medidas
+                    WHERE confianza >= %(min_confianza)s
+                )
+                INSERT INTO {reglas} (antecedente_id, consecuente_id, posicion, pedidos, soporte, confianza, lift)
+                SELECT antecedente_id, consecuente_id, posicion, juntos, soporte, confianza, lift
+                FROM ranking
+                WHERE posicion <= %(reglas_por_libro)s
+            """, {
+                'antecedentes': frecuentes[inicio:inicio + lote],
+                'min_pedidos': min_pedidos,
+                'min_confianza': min_confianza,
+                'reglas_por_libro': reglas_por_libro,
+                'total': total,
+            })
+            escritas += cursor.rowcount
+            yield min(inicio + lote, len(frecuentes)), escritas
+        cursor.execute("DROP TABLE reglas_frecuentes")
+
+def sugerencias_carrito(usuario):
+    """
+    Libros que suelen comprarse junto con los del carrito del usuario y que todavía no están en él,
+    de mayor a menor confianza. Es una sola consulta: los libros del carrito se leen en subconsultas.
+    Si varios libros del carrito sugieren el mismo, cuenta su regla más fuerte.
+    """
+    en_carrito = Subquery(CarritoLibro.objects.filter(carrito__usuario=usuario).values('libro_id'))
+    return (
+        Libro.objects
+        .filter(reglas_consecuente__antecedente_id__in=en_carrito, stock__gt=0)
+        .exclude(id__in=en_carrito)
+        .annotate(confianza=Max('reglas_consecuente__confianza'), lift=Max('reglas_consecuente__lift'))
+        .order_by('-confianza', '-lift', 'id')
+    )
@@ -0,0 +1,54 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from apps.compras.models import CarritoLibro, PedidoLibro, Pedidos, Reserva
+from apps.libros.models import Libro
+from apps.libros.signals import catalogo_importado
+from apps.usuarios.models import UsuarioPreferencias
+from .contenido import CAMPOS_CONTENIDO, programar_actualizacion_contenido
+from .feed import invalidar_feed
+from .tendencias import CARRITO, COMPRA, RESERVA, registrar_actividad
+
+@receiver(post_save, sender=Libro)
+def actualizar_similares_libro(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Recalcula el vector de contenido del libro y sus vecinos en segundo plano después del commit
+    (el search_vector ya está al día). Los guardados que no modifican el texto (stock, precio, portada)
+    no hacen nada, con o sin update_fields.
+    """
+    if update_fields is not None and not CAMPOS_CONTENIDO & set(update_fields):
+        return
+    if not created and not instance.campos_modificados(CAMPOS_CONTENIDO):
+        return
+    programar_actualizacion_contenido([instance.pk])
+
+@receiver(catalogo_importado)
+def actualizar_similares_importacion(sender, creados=(), **kwargs):
+    """Los libros nuevos de una importación se indexan juntos; los modificados, en la próxima reconstrucción"""
+    if creados:
+        programar_actualizacion_contenido(creados)
+
+@receiver(post_save, sender=UsuarioPreferencias)
+@receiver(post_save, sender=Pedidos)
+def invalidar_feed_usuario(sender, instance, **kwargs):
+    """
+    Las preferencias y los pedidos (nuevos, cancelados o entregados) cambian el feed del usuario:
+    se descarta después del commit, cuando las líneas del pedido ya son visibles, y se recalcula al consultarlo
+    """
+    transaction.on_commit(lambda: invalidar_feed(instance.usuario_id))
+
+@receiver(post_save, sender=CarritoLibro)
+def tendencia_por_carrito(sender, instance, created, **kwargs):
+    """Agregar un libro al carrito (volver a agregar uno que ya está no cuenta de nuevo)"""
+    if created:
+        registrar_actividad(instance.libro_id, CARRITO)
+
+@receiver(post_save, sender=Reserva)
+def tendencia_por_reserva(sender, instance, created, **kwargs):
+    if created:
+        registrar_actividad(instance.libro_id, RESERVA, instance.cantidad)
+
+@receiver(post_save, sender=PedidoLibro)
+def tendencia_por_compra(sender, instance, created, **kwargs):
+    if created:
+        registrar_actividad(instance.libro_id, COMPRA, instance.cantidad)
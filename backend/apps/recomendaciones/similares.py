@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.db import connection, transaction
+from apps.compras.models import CarritoLibro, PedidoLibro, Pedidos, Reserva
+from apps.libros.models import Libro
+from .models import LibroSimilar
+
+def calcular_similares():
+    """
+    Reconstruye la tabla de vecinos (LibroSimilar) con similitud coseno item-item.
+
+    Cada pedido, carrito y conjunto de reservas de un usuario es una "cesta"; cada libro es un vector
+    disperso sobre las cestas con el peso de su origen. La co-ocurrencia de cada par de libros
+    (producto punto), las normas y el top-K por libro se calculan dentro de PostgreSQL en una sola
+    sentencia, sin traer las cestas a memoria. Los lectores ven la tabla anterior hasta el commit.
+    Retorna la cantidad de filas escritas.
+    """
+    tabla = LibroSimilar._meta.db_table
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {tabla}")
+        cursor.execute(f"""
+            WITH cestas AS (
+                SELECT 1 AS origen, pl.pedido_id AS cesta, pl.libro_id, MAX(%(peso_pedido)s) AS peso
+                FROM {PedidoLibro._meta.db_table} pl
+                JOIN {Pedidos._meta.db_table} p ON p.id = pl.pedido_id
+                WHERE p.estado <> 'Cancelado'
+                GROUP BY pl.pedido_id, pl.libro_id
+                UNION ALL
+                SELECT 2, carrito_id, libro_id, MAX(%(peso_carrito)s)
+                FROM {CarritoLibro._meta.db_table}
+                GROUP BY carrito_id, libro_id
+                UNION ALL
+                SELECT 3, usuario_id, libro_id, MAX(%(peso_reserva)s)
+                FROM {Reserva._meta.db_table}
+                GROUP BY usuario_id, libro_id
+            ), normas AS (
+                SELECT libro_id, SQRT(SUM(peso * peso)) AS norma
+                FROM cestas
+                GROUP BY libro_id
+            ), pares AS (
+                SELECT a.libro_id, b.libro_id AS similar_id, SUM(a.peso * b.peso) AS producto, COUNT(*) AS coincidencias
+                FROM cestas a
+                JOIN cestas b ON b.origen = a.origen AND b.cesta = a.cesta AND b.libro_id <> a.libro_id
+                GROUP BY a.libro_id, b.libro_id
+            ), puntajes AS (
+                SELECT pares.libro_id, pares.similar_id,
+                       pares.producto / (na.norma * nb.norma) AS puntaje,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY pares.libro_id
+                           ORDER BY pares.producto / (na.norma * nb.norma) DESC, pares.similar_id
+                       ) AS posicion
+                FROM pares
+                JOIN normas na ON na.libro_id = pares.libro_id
+                JOIN normas nb ON nb.libro_id = pares.similar_id
+                WHERE pares.coincidencias >= %(min_coincidencias)s
+            )
+            INSERT INTO {tabla} (libro_id, similar_id, posicion, puntaje)
+            SELECT libro_id, similar_id, posicion, puntaje
+            FROM puntajes
+            WHERE posicion <= %(vecinos)s
+        """, {
+            'peso_pedido': settings.RECOMENDACIONES_PESO_PEDIDO,
+            'peso_carrito': settings.RECOMENDACIONES_PESO_CARRITO,
+            'peso_reserva': settings.RECOMENDACIONES_PESO_RESERVA,
+            'min_coincidencias': settings.RECOMENDACIONES_MIN_COINCIDENCIAS,
+            'vecinos': settings.RECOMENDACIONES_VECINOS,
+        })
+        return cursor.rowcount
+
+def tambien_compraron(libro_id, limite):
+    """Libros vecinos, de más a menos similar: una consulta por el índice (libro, posicion)"""
+    return Libro.objects.filter(
+        similar_de__libro_id=libro_id, similar_de__posicion__lte=limite
+    ).order_by('similar_de__posicion')
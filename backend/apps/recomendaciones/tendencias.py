@@ -0,0 +1,76 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+from apps.libros.models import Libro
+from .models import ActividadLibro
+
+CARRITO = 'carrito'
+RESERVA = 'reserva'
+COMPRA = 'compra'
+CLIC = 'clic'
+
+CLAVE_CACHE = 'recomendaciones:tendencias'
+
+def peso_evento(tipo):
+    return {
+        CARRITO: settings.RECOMENDACIONES_TENDENCIAS_PESO_CARRITO,
+        RESERVA: settings.RECOMENDACIONES_TENDENCIAS_PESO_RESERVA,
+        COMPRA: settings.RECOMENDACIONES_TENDENCIAS_PESO_COMPRA,
+        CLIC: settings.RECOMENDACIONES_TENDENCIAS_PESO_CLIC,
+    }[tipo]
+
+def sumar_actividad(libro_id, tipo, cantidad=1):
+    """
+    Suma un evento al contador de la hora actual del libro con un único INSERT ... ON CONFLICT.
+    Es atómico aunque varios procesos registren eventos del mismo libro a la vez.
+    Retorna False si el libro no existe.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            INSERT INTO {ActividadLibro._meta.db_table} AS actividad (libro_id, hora, puntaje)
+            SELECT id, date_trunc('hour', NOW()), %(puntaje)s FROM {Libro._meta.db_table} WHERE id = %(libro_id)s
+            ON CONFLICT (libro_id, hora) DO UPDATE SET puntaje = actividad.puntaje + EXCLUDED.puntaje
+        """, {'libro_id': libro_id, 'puntaje': peso_evento(tipo) * cantidad})
+        return cursor.rowcount > 0
+
+def registrar_actividad(libro_id, tipo, cantidad=1):
+    """Registra el evento cuando se confirma la transacción (si se revierte, no cuenta)"""
+    transaction.on_commit(lambda: sumar_actividad(libro_id, tipo, cantidad))
+
+def calcular_tendencias():
+    """
+    Los RECOMENDACIONES_TENDENCIAS_TAMANO libros con más actividad reciente: [(libro_id, puntaje)].
+    Cada hora de la ventana cuenta con peso 2^(-antigüedad / RECOMENDACIONES_TENDENCIAS_VIDA_MEDIA_HORAS).
+    Solo lee los contadores de la ventana (por el índice de hora), no los pedidos ni las reservas.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT libro_id,
+                   SUM(puntaje * POWER(0.5, EXTRACT(EPOCH FROM date_trunc('hour', NOW()) - hora) / 3600.0
+                                            / %(vida_media)s)) AS tendencia
+            FROM {ActividadLibro._meta.db_table}
+            WHERE hora > date_trunc('hour', NOW()) - make_interval(hours => %(ventana)s)
+            GROUP BY libro_id
+            ORDER BY tendencia DESC, libro_id DESC
+            LIMIT %(tamano)s
+        """, {
+            'vida_media': settings.RECOMENDACIONES_TENDENCIAS_VIDA_MEDIA_HORAS,
+            'ventana': settings.RECOMENDACIONES_TENDENCIAS_VENTANA_HORAS,
+            'tamano': settings.RECOMENDACIONES_TENDENCIAS_TAMANO,
+        })
+        return [(libro_id, float(tendencia)) for libro_id, tendencia in cursor.fetchall()]
+
+def obtener_tendencias():
+    """Ranking de tendencias guardado en caché durante RECOMENDACIONES_TENDENCIAS_CACHE segundos"""
+    tendencias = cache.get(CLAVE_CACHE)
+    if tendencias is None:
+        tendencias = calcular_tendencias()
+        cache.set(CLAVE_CACHE, tendencias, timeout=settings.RECOMENDACIONES_TENDENCIAS_CACHE)
+    return tendencias
+
+def limpiar_actividad():
+    """Borra los contadores que ya salieron de la ventana; retorna cuántos"""
+    desde = timezone.now() - timedelta(hours=settings.RECOMENDACIONES_TENDENCIAS_VENTANA_HORAS + 1)
+    return ActividadLibro.objects.filter(hora__lt=desde).delete()[0]
@@ -1,3 +1,474 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from apps.compras.models import Carrito, PedidoLibro, Pedidos, Reserva
+from apps.finanzas.models import Saldo
+from apps.libros.models import Categoria, Libro
+from apps.libros.serializers import CAMPOS_TARJETA
+from apps.usuarios.models import UsuarioPreferencias
+from .contenido import BLOQUEO_CONTENIDO, actualizar_similares_contenido, calcular_similares_contenido
+from .models import ActividadLibro, FeedUsuario, LibroSimilar, LibroSimilarContenido, ReglaAsociacion, TerminoLibro
+from .reglas import minar_reglas
+from .similares import calcular_similares
+from .tendencias import CLAVE_CACHE
 
-# Create your tests here.
+User = get_user_model()
+
+class LibrosSimilaresTests(APITestCase):
+    def setUp(self):
+        self.usuarios = [
+            User.objects.create_user(
+                username=f'lector{i}', email=f'lector{i}@test.com', password='testpass123',
+                numero_identificacion=f'50{i}'
+            )
+            for i in range(3)
+        ]
+        categoria = Categoria.objects.create(nombre='General')
+        self.libros = [
+            Libro.objects.create(
+                titulo=f'Libro {i}', autor='Autor', isbn=f'9780000005{i:03d}',
+                categoria=categoria, precio='10.00', stock=10, año_publicacion=2000
+            )
+            for i in range(5)
+        ]
+
+    def pedido(self, usuario, indices, estado='Entregado'):
+        pedido = Pedidos.objects.create(usuario=usuario, estado=estado)
+        PedidoLibro.objects.bulk_create([PedidoLibro(pedido=pedido, libro=self.libros[i]) for i in indices])
+
+    def similares(self, indice):
+        return list(
+            LibroSimilar.objects.filter(libro=self.libros[indice]).order_by('posicion').values_list('similar__titulo', 'puntaje')
+        )
+
+    def test_similitud_coseno_entre_cestas(self):
+        self.pedido(self.usuarios[0], [0, 1])
+        self.pedido(self.usuarios[1], [0, 1, 2])
+        # Los pedidos cancelados no cuentan
+        self.pedido(self.usuarios[2], [0, 3], estado='Cancelado')
+        calcular_similares()
+
+        vecinos = self.similares(0)
+        self.assertEqual([titulo for titulo, _ in vecinos], ['Libro 1', 'Libro 2'])
+        # Libro 0 y Libro 1 aparecen siempre juntos; Libro 2 solo en una de las dos cestas
+        self.assertAlmostEqual(vecinos[0][1], 1.0)
+        self.assertAlmostEqual(vecinos[1][1], 1 / 2 ** 0.5)
+        self.assertEqual(self.similares(3), [])
+
+    def test_carritos_y_reservas_con_su_peso(self):
+        carrito = Carrito.objects.get(usuario=self.usuarios[0])
+        carrito.agregar_libro(self.libros[0], 1)
+        carrito.agregar_libro(self.libros[4], 1)
+        Reserva.objects.create(usuario=self.usuarios[1], libro=self.libros[0])
+        Reserva.objects.create(usuario=self.usuarios[1], libro=self.libros[3])
+        calcular_similares()
+
+        self.assertEqual([titulo for titulo, _ in self.similares(0)], ['Libro 3', 'Libro 4'])
+        self.assertEqual([titulo for titulo, _ in self.similares(4)], ['Libro 0'])
+
+    @override_settings(RECOMENDACIONES_VECINOS=2)
+    def test_recalcular_conserva_los_k_mejores(self):
+        self.pedido(self.usuarios[0], [0, 1, 2, 3])
+        self.pedido(self.usuarios[1], [0, 1])
+        calcular_similares()
+        self.assertEqual([titulo for titulo, _ in self.similares(0)], ['Libro 1', 'Libro 2'])
+
+        # Reconstruir reemplaza la tabla anterior
+        self.pedido(self.usuarios[2], [0, 3])
+        self.pedido(self.usuarios[0], [0, 3], estado='Pendiente')
+        salida = StringIO()
+        call_command('calcular_similares', stdout=salida)
+        self.assertEqual([titulo for titulo, _ in self.similares(0)], ['Libro 3', 'Libro 1'])
+        self.assertLessEqual(LibroSimilar.objects.filter(libro=self.libros[0]).count(), 2)
+        self.assertIn('hasta 2 vecinos', salida.getvalue())
+
+    def test_endpoint_una_consulta(self):
+        self.pedido(self.usuarios[0], [0, 1])
+        self.pedido(self.usuarios[1], [0, 1, 2])
+        calcular_similares()
+        url = reverse('tambien-compraron', args=[self.libros[0].id])
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([libro['titulo'] for libro in response.data], ['Libro 1', 'Libro 2'])
+        self.assertEqual(response.data[0]['precio'], '10.00')
+        self.assertEqual(response.data[0]['puntaje'], 1.0)
+
+        response = self.client.get(url, {'limite': 1})
+        self.assertEqual([libro['titulo'] for libro in response.data], ['Libro 1'])
+        self.assertEqual(self.client.get(url, {'limite': 'x'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(url, {'limite': 0}).status_code, status.HTTP_400_BAD_REQUEST)
+        # Un libro sin vecinos (o inexistente) retorna una lista vacía
+        self.assertEqual(self.client.get(reverse('tambien-compraron', args=[999999])).data, [])
+
+    def test_benchmark_revierte_los_datos(self):
+        salida = StringIO()
+        call_command('benchmark_similares', pedidos=200, libros=50, consultas=10, stdout=salida)
+        self.assertIn('calcular_similares', salida.getvalue())
+        self.assertIn('tambien_compraron', salida.getvalue())
+        self.assertEqual(Libro.objects.count(), 5)
+        self.assertEqual(Pedidos.objects.count(), 0)
+
+@override_settings(RECOMENDACIONES_CONTENIDO_EN_SEGUNDO_PLANO=False)
+class SimilaresContenidoTests(APITestCase):
+    def setUp(self):
+        novela = Categoria.objects.create(nombre='Novela')
+        ciencia = Categoria.objects.create(nombre='Ciencia')
+        cocina = Categoria.objects.create(nombre='Cocina')
+        datos = [
+            ('El dragón de fuego', 'Ana Pérez', 'Una historia de dragones y magia en un reino lejano', novela),
+            ('La magia del dragón', 'Luis Gómez', 'Dragones, magos y un reino en guerra', novela),
+            ('Reino de dragones', 'Ana Pérez', 'La saga continúa con más magia', novela),
+            ('Física cuántica', 'Marta Ruiz', 'Introducción a la mecánica cuántica', ciencia),
+            ('Química orgánica', 'Marta Ruiz', 'Reacciones y moléculas orgánicas', ciencia),
+            ('Cocina española', 'Pedro Sanz', 'Recetas tradicionales', cocina),
+        ]
+        self.libros = [
+            Libro.objects.create(
+                titulo=titulo, autor=autor, descripcion=descripcion, categoria=categoria,
+                isbn=f'9780000006{i:03d}', precio='10.00', stock=10, año_publicacion=2000
+            )
+            for i, (titulo, autor, descripcion, categoria) in enumerate(datos)
+        ]
+        calcular_similares_contenido()
+
+    def vecinos(self, indice):
+        return list(
+            LibroSimilarContenido.objects.filter(libro=self.libros[indice])
+            .order_by('posicion').values_list('similar_id', flat=True)
+        )
+
+    def test_reconstruccion(self):
+        dragones = {self.libros[0].id, self.libros[1].id, self.libros[2].id}
+        self.assertEqual(set(self.vecinos(0)), dragones - {self.libros[0].id})
+        # El mismo autor pesa más que compartir solo palabras de la descripción
+        self.assertEqual(self.vecinos(0)[0], self.libros[2].id)
+        self.assertEqual(self.vecinos(3), [self.libros[4].id])
+        self.assertEqual(self.vecinos(5), [])
+        # Vectores con norma 1
+        norma = sum(peso ** 2 for peso in TerminoLibro.objects.filter(libro=self.libros[0]).values_list('peso', flat=True))
+        self.assertAlmostEqual(norma, 1.0)
+
+    def test_actualizacion_incremental(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            nuevo = Libro.objects.create(
+                titulo='Dragones del norte', autor='Luis Gómez', descripcion='Magia y dragones',
+                categoria=self.libros[0].categoria, isbn='9780000006999', precio='10.00', stock=10,
+                año_publicacion=2001
+            )
+        self.libros.append(nuevo)
+        self.assertEqual(self.vecinos(6)[0], self.libros[1].id)
+        self.assertIn(nuevo.id, self.vecinos(1))
+        self.assertNotIn(nuevo.id, self.vecinos(3))
+
+        # Cambiar el texto mueve el libro a otro grupo y lo quita de las listas anteriores
+        with self.captureOnCommitCallbacks(execute=True):
+            nuevo.titulo, nuevo.autor, nuevo.descripcion = 'Física moderna', 'Marta Ruiz', 'Mecánica cuántica'
+            nuevo.categoria = self.libros[3].categoria
+            nuevo.save()
+        self.assertEqual(set(self.vecinos(6)), {self.libros[3].id, self.libros[4].id})
+        self.assertNotIn(nuevo.id, self.vecinos(1))
+        self.assertIn(nuevo.id, self.vecinos(3))
+        for indice in range(len(self.libros)):
+            posiciones = LibroSimilarContenido.objects.filter(libro=self.libros[indice]).values_list('posicion', flat=True)
+            self.assertEqual(sorted(posiciones), list(range(1, len(posiciones) + 1)))
+
+        # Guardar sin cambiar el texto no recalcula nada
+        self.assertEqual(actualizar_similares_contenido([nuevo.id]), 0)
+        with self.assertNumQueries(1), self.captureOnCommitCallbacks(execute=True):
+            nuevo.stock = 3
+            nuevo.save(update_fields=['stock'])
+        # Tampoco sin update_fields, como al descontar stock en una venta
+        libro = Libro.objects.get(pk=nuevo.pk)
+        with self.assertNumQueries(1), self.captureOnCommitCallbacks(execute=True):
+            libro.stock, libro.precio = 2, '12.00'
+            libro.save()
+
+    def test_endpoint_similares(self):
+        url = reverse('libro-similares', args=[self.libros[0].id])
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['id'], self.libros[2].id)
+        self.assertEqual(set(response.data[0]), {*CAMPOS_TARJETA, 'puntaje'})
+        self.assertGreater(response.data[0]['puntaje'], response.data[1]['puntaje'])
+
+        self.assertEqual(len(self.client.get(url, {'limite': 1}).data), 1)
+        self.assertEqual(self.client.get(url, {'limite': 'x'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(reverse('libro-similares', args=[self.libros[5].id])).data, [])
+        self.assertEqual(self.client.get(reverse('libro-similares', args=[999999])).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_bloqueo_entre_reconstruccion_e_incremental(self):
+        """Las dos toman el mismo advisory lock de transacción (el test corre dentro de una transacción)"""
+        def bloqueos():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT COUNT(*) FROM pg_locks WHERE locktype = 'advisory' AND objid = %s AND pid = pg_backend_pid()",
+                    [BLOQUEO_CONTENIDO]
+                )
+                return cursor.fetchone()[0]
+        self.assertEqual(bloqueos(), 1)
+        Libro.objects.filter(pk=self.libros[5].pk).update(titulo='Cocina vasca')
+        self.assertEqual(actualizar_similares_contenido([self.libros[5].id]), 1)
+        self.assertEqual(bloqueos(), 1)
+
+    def test_comando_reconstruye(self):
+        TerminoLibro.objects.all().delete()
+        salida = StringIO()
+        call_command('calcular_similares_contenido', stdout=salida)
+        self.assertIn('recalculados', salida.getvalue())
+        self.assertEqual(self.vecinos(3), [self.libros[4].id])
+
+class FeedTests(APITestCase):
+    def setUp(self):
+        self.usuario = User.objects.create_user(
+            username='lector_feed', email='feed@test.com', password='testpass123', numero_identificacion='700'
+        )
+        self.client.force_authenticate(self.usuario)
+        novela = Categoria.objects.create(nombre='Novela')
+        ciencia = Categoria.objects.create(nombre='Ciencia')
+        datos = [('Ana', novela, 10), ('Luis', ciencia, 10), ('Ana', ciencia, 10), ('Marta', novela, 0), ('Pedro', ciencia, 10)]
+        self.libros = [
+            Libro.objects.create(
+                titulo=f'Libro {i}', autor=autor, categoria=categoria, isbn=f'9780000007{i:03d}',
+                precio='10.00', stock=stock, año_publicacion=2000
+            )
+            for i, (autor, categoria, stock) in enumerate(datos)
+        ]
+        Libro.objects.filter(pk=self.libros[1].pk).update(popularidad=10)
+        self.url = reverse('feed')
+
+    def ids(self, response):
+        return [libro['id'] for libro in response.data]
+
+    def test_mezcla_preferencias_y_popularidad(self):
+        UsuarioPreferencias.objects.create(usuario=self.usuario, preferencias=['Ana', 'Novela'])
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Libro 0 cumple dos preferencias, Libro 2 una, Libro 1 es el más popular; Libro 3 no tiene stock
+        self.assertEqual(self.ids(response), [self.libros[i].id for i in (0, 2, 1, 4)])
+        self.assertEqual(response.data[0]['puntaje'], 2.0)
+        self.assertEqual(response.data[2]['puntaje'], 0.5)
+
+        # Las visitas siguientes leen el feed guardado y los datos de sus libros, sin volver a puntuar
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {'limite': 2})
+        self.assertEqual(self.ids(response), [self.libros[0].id, self.libros[2].id])
+        self.assertEqual(self.client.get(self.url, {'limite': 0}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_historial_de_compras(self):
+        pedido = Pedidos.objects.create(usuario=self.usuario, estado='Entregado')
+        PedidoLibro.objects.create(pedido=pedido, libro=self.libros[1])
+        LibroSimilar.objects.create(libro=self.libros[1], similar=self.libros[4], posicion=1, puntaje=0.8)
+        response = self.client.get(self.url)
+        # Lo ya comprado no se recomienda; lo parecido a lo comprado sube
+        self.assertEqual(self.ids(response)[0], self.libros[4].id)
+        self.assertNotIn(self.libros[1].id, self.ids(response))
+
+    def test_invalidacion_por_preferencias_y_pedidos(self):
+        self.client.get(self.url)
+        self.assertTrue(FeedUsuario.objects.filter(usuario=self.usuario).exists())
+        with self.captureOnCommitCallbacks(execute=True):
+            UsuarioPreferencias.objects.create(usuario=self.usuario, preferencias=['Pedro'])
+        self.assertFalse(FeedUsuario.objects.filter(usuario=self.usuario).exists())
+        self.assertEqual(self.ids(self.client.get(self.url))[0], self.libros[4].id)
+
+        Saldo.objects.get(usuario=self.usuario).recargar_saldo(100)
+        carrito = Carrito.objects.get(usuario=self.usuario)
+        carrito.agregar_libro(self.libros[4], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(carrito.pagar()['estado'], 'exito')
+        self.assertFalse(FeedUsuario.objects.filter(usuario=self.usuario).exists())
+        self.assertNotIn(self.libros[4].id, self.ids(self.client.get(self.url)))
+
+    def test_calculo_en_lote_y_vencimiento(self):
+        inactivo = User.objects.create_user(
+            username='inactivo', email='inactivo@test.com', password='testpass123', numero_identificacion='701'
+        )
+        User.objects.filter(pk=self.usuario.pk).update(last_login=timezone.now())
+        salida = StringIO()
+        call_command('calcular_feeds', stdout=salida)
+        self.assertIn('1 usuarios activos', salida.getvalue())
+        self.assertTrue(FeedUsuario.objects.filter(usuario=self.usuario).exists())
+        self.assertFalse(FeedUsuario.objects.filter(usuario=inactivo).exists())
+
+        vencido = timezone.now() - timedelta(hours=settings.RECOMENDACIONES_FEED_VIGENCIA_HORAS + 1)
+        FeedUsuario.objects.filter(usuario=self.usuario).update(fecha_calculo=vencido, libros=[], puntajes=[])
+        self.assertEqual(len(self.client.get(self.url).data), 4)
+        self.assertGreater(FeedUsuario.objects.get(usuario=self.usuario).fecha_calculo, vencido)
+
+    def test_requiere_autenticacion(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+class TendenciasTests(APITestCase):
+    def setUp(self):
+        cache.delete(CLAVE_CACHE)
+        self.usuario = User.objects.create_user(
+            username='lector_tendencias', email='tendencias@test.com', password='testpass123', numero_identificacion='800'
+        )
+        Saldo.objects.get(usuario=self.usuario).recargar_saldo(1000)
+        categoria = Categoria.objects.create(nombre='General')
+        self.libros = [
+            Libro.objects.create(
+                titulo=f'Libro {i}', autor='Autor', isbn=f'9780000008{i:03d}',
+                categoria=categoria, precio='10.00', stock=10, año_publicacion=2000
+            )
+            for i in range(3)
+        ]
+        self.hora = timezone.now().replace(minute=0, second=0, microsecond=0)
+
+    def actividad(self, libro):
+        return list(ActividadLibro.objects.filter(libro=libro).values_list('puntaje', flat=True))
+
+    def test_eventos_suman_en_la_hora_actual(self):
+        carrito = Carrito.objects.get(usuario=self.usuario)
+        with self.captureOnCommitCallbacks(execute=True):
+            carrito.agregar_libro(self.libros[0], 2)
+            # Volver a agregar un libro que ya está en el carrito no cuenta de nuevo
+            carrito.agregar_libro(self.libros[0], 1)
+        self.assertEqual(self.actividad(self.libros[0]), [1.0])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Reserva().reservar_libro(self.libros[1], self.usuario, 1)
+        self.assertEqual(self.actividad(self.libros[1]), [2.0])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(carrito.pagar()['estado'], 'exito')
+        # Una sola fila por libro y hora: la compra de 3 unidades se suma al evento del carrito
+        self.assertEqual(self.actividad(self.libros[0]), [1.0 + 3 * 3.0])
+
+    def test_ranking_con_decaimiento(self):
+        ActividadLibro.objects.bulk_create([
+            ActividadLibro(libro=self.libros[0], hora=self.hora - timedelta(hours=24), puntaje=10),
+            ActividadLibro(libro=self.libros[1], hora=self.hora, puntaje=4),
+            # Fuera de la ventana
+            ActividadLibro(libro=self.libros[2], hora=self.hora - timedelta(hours=100), puntaje=100),
+        ])
+        url = reverse('tendencias')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([libro['id'] for libro in response.data], [self.libros[1].id, self.libros[0].id])
+        # 24 horas son dos vidas medias: 10 / 4
+        self.assertEqual([libro['puntaje'] for libro in response.data], [4.0, 2.5])
+
+        # El ranking queda en caché: solo se leen los datos de los libros
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {'limite': 1})
+        self.assertEqual([libro['id'] for libro in response.data], [self.libros[1].id])
+        self.assertEqual(self.client.get(url, {'limite': 'x'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_limpiar_contadores_fuera_de_la_ventana(self):
+        ActividadLibro.objects.bulk_create([
+            ActividadLibro(libro=self.libros[0], hora=self.hora - timedelta(hours=100), puntaje=1),
+            ActividadLibro(libro=self.libros[0], hora=self.hora, puntaje=1),
+        ])
+        salida = StringIO()
+        call_command('limpiar_tendencias', stdout=salida)
+        self.assertIn('Contadores borrados: 1', salida.getvalue())
+        self.assertEqual(ActividadLibro.objects.get().hora, self.hora)
+
+class ReglasAsociacionTests(APITestCase):
+    def setUp(self):
+        self.usuario = User.objects.create_user(
+            username='comprador', email='comprador@test.com', password='testpass123', numero_identificacion='901'
+        )
+        categoria = Categoria.objects.create(nombre='General')
+        self.libros = [
+            Libro.objects.create(
+                titulo=f'Libro {i}', autor='Autor', isbn=f'9780000009{i:03d}',
+                categoria=categoria, precio='10.00', stock=10, año_publicacion=2000
+            )
+            for i in range(5)
+        ]
+        for indices in ([0, 1], [0, 1, 2], [0, 2], [1, 3]):
+            self.pedido(indices)
+        # Los pedidos cancelados no cuentan
+        self.pedido([0, 4], estado='Cancelado')
+        self.pedido([0, 4], estado='Cancelado')
+        self.url = reverse('carrito-sugerencias')
+
+    def pedido(self, indices, estado='Entregado'):
+        pedido = Pedidos.objects.create(usuario=self.usuario, estado=estado)
+        PedidoLibro.objects.bulk_create([PedidoLibro(pedido=pedido, libro=self.libros[i]) for i in indices])
+
+    def reglas(self, indice):
+        return list(
+            ReglaAsociacion.objects.filter(antecedente=self.libros[indice]).order_by('posicion')
+            .values_list('consecuente__titulo', 'pedidos', 'soporte', 'confianza', 'lift')
+        )
+
+    def minar(self, **opciones):
+        for _ in minar_reglas(**opciones):
+            pass
+
+    def test_soporte_confianza_y_lift(self):
+        self.minar(min_pedidos=2)
+
+        # 4 pedidos válidos: Libro 0 está en 3, Libro 2 en 2 y ambos juntos en 2
+        consecuentes = self.reglas(0)
+        self.assertEqual([regla[0] for regla in consecuentes], ['Libro 2', 'Libro 1'])
+        titulo, pedidos, soporte, confianza, lift = consecuentes[0]
+        self.assertEqual(pedidos, 2)
+        self.assertAlmostEqual(soporte, 2 / 4)
+        self.assertAlmostEqual(confianza, 2 / 3)
+        self.assertAlmostEqual(lift, (2 / 3) / (2 / 4))
+        self.assertAlmostEqual(self.reglas(2)[0][3], 1.0)
+        # Libro 1 y Libro 2 solo coinciden una vez; Libro 3 y Libro 4 no alcanzan el soporte mínimo
+        self.assertEqual([regla[0] for regla in self.reglas(1)], ['Libro 0'])
+        self.assertEqual(self.reglas(3), [])
+        self.assertEqual(self.reglas(4), [])
+
+    def test_comando_por_lotes_reemplaza_las_reglas(self):
+        self.minar(min_pedidos=2)
+        esperadas = {indice: self.reglas(indice) for indice in range(3)}
+        salida = StringIO()
+        call_command('minar_reglas', '--lote', '1', '--min-pedidos', '2', stdout=salida)
+
+        self.assertIn('4 reglas', salida.getvalue())
+        self.assertEqual({indice: self.reglas(indice) for indice in range(3)}, esperadas)
+        call_command('minar_reglas', '--min-pedidos', '2', '--min-confianza', '0.9', stdout=StringIO())
+        self.assertEqual(ReglaAsociacion.objects.count(), 1)
+
+    def test_sugerencias_del_carrito_en_una_consulta(self):
+        self.minar(min_pedidos=2)
+        carrito = Carrito.objects.get(usuario=self.usuario)
+        carrito.agregar_libro(self.libros[0], 1)
+        self.client.force_authenticate(user=self.usuario)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([libro['titulo'] for libro in response.data], ['Libro 2', 'Libro 1'])
+        self.assertEqual(set(response.data[0]), set(CAMPOS_TARJETA) | {'confianza', 'lift'})
+        self.assertEqual(response.data[0]['confianza'], round(2 / 3, 4))
+
+        # Lo que ya está en el carrito no se sugiere, aunque otro libro del carrito lo tenga como consecuente
+        carrito.agregar_libro(self.libros[2], 1)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual([libro['titulo'] for libro in response.data], ['Libro 1'])
+
+        Libro.objects.filter(pk=self.libros[1].pk).update(stock=0)
+        self.assertEqual(self.client.get(self.url).data, [])
+
+    def test_sugerencias_limite_y_autenticacion(self):
+        self.minar(min_pedidos=2)
+        Carrito.objects.get(usuario=self.usuario).agregar_libro(self.libros[0], 1)
+
+        self.assertIn(self.client.get(self.url).status_code,
+                      (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+        self.client.force_authenticate(user=self.usuario)
+        self.assertEqual(len(self.client.get(self.url, {'limite': 1}).data), 1)
+        self.assertEqual(self.client.get(self.url, {'limite': 'x'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'limite': 0}).status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import FeedView, TambienCompraronView, TendenciasView
+
+urlpatterns = [
+    path('feed/', FeedView.as_view(), name='feed'),
+    path('tendencias/', TendenciasView.as_view(), name='tendencias'),
+    path('libros/<int:libro_id>/tambien-compraron/', TambienCompraronView.as_view(), name='tambien-compraron'),
+]
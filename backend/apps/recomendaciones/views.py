@@ -1,3 +1,109 @@
-from django.shortcuts import render
+from django.conf import settings
+from django.db.models import F
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from drf_spectacular.types import OpenApiTypes
+from apps.libros.models import Libro
+from apps.libros.serializers import tarjetas, valores_tarjeta
+from .feed import obtener_feed
+from .tendencias import obtener_tendencias
+from .similares import tambien_compraron
 
-# Create your views here.
+class TambienCompraronView(APIView):
+    permission_classes = [AllowAny]
+
+    @extend_schema(
+        description="Libros que los clientes también compraron, reservaron o agregaron al carrito junto con este, "
+                    "de más a menos similar. Se calculan periódicamente con manage.py calcular_similares.",
+        parameters=[
+            OpenApiParameter(
+                name='limite',
+                type=OpenApiTypes.INT,
+                description="Cantidad máxima de libros (por defecto y como máximo RECOMENDACIONES_VECINOS)",
+                required=False
+            ),
+        ]
+    )
+    def get(self, request, libro_id):
+        try:
+            limite = int(request.query_params.get('limite', settings.RECOMENDACIONES_VECINOS))
+        except ValueError:
+            return Response({"error": "El límite debe ser un número entero"}, status=status.HTTP_400_BAD_REQUEST)
+        if limite < 1:
+            return Response({"error": "El límite debe ser mayor que cero"}, status=status.HTTP_400_BAD_REQUEST)
+
+        libros = valores_tarjeta(
+            tambien_compraron(libro_id, min(limite, settings.RECOMENDACIONES_VECINOS))
+            .annotate(puntaje=F('similar_de__puntaje')),
+            'puntaje'
+        )
+        return Response([
+            {**tarjeta, 'puntaje': round(fila['puntaje'], 4)}
+            for tarjeta, fila in zip(tarjetas(libros), libros)
+        ])
+
+class FeedView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        description="Libros recomendados para el usuario autenticado según sus preferencias, sus compras y la "
+                    "popularidad del catálogo. La lista está precalculada: la consulta solo lee el feed guardado "
+                    "y los datos actuales de sus libros.",
+        parameters=[
+            OpenApiParameter(
+                name='limite',
+                type=OpenApiTypes.INT,
+                description="Cantidad máxima de libros (por defecto y como máximo RECOMENDACIONES_FEED_TAMANO)",
+                required=False
+            ),
+        ]
+    )
+    def get(self, request):
+        try:
+            limite = int(request.query_params.get('limite', settings.RECOMENDACIONES_FEED_TAMANO))
+        except ValueError:
+            return Response({"error": "El límite debe ser un número entero"}, status=status.HTTP_400_BAD_REQUEST)
+        if limite < 1:
+            return Response({"error": "El límite debe ser mayor que cero"}, status=status.HTTP_400_BAD_REQUEST)
+
+        feed = obtener_feed(request.user)
+        puntajes = dict(zip(feed.libros[:limite], feed.puntajes[:limite]))
+        # Los libros eliminados o sin stock desde el cálculo se omiten
+        filas = {fila['id']: fila for fila in valores_tarjeta(Libro.objects.filter(id__in=puntajes, stock__gt=0))}
+        ordenadas = [filas[libro_id] for libro_id in puntajes if libro_id in filas]
+        return Response([
+            {**tarjeta, 'puntaje': round(puntajes[tarjeta['id']], 4)} for tarjeta in tarjetas(ordenadas)
+        ])
+
+class TendenciasView(APIView):
+    permission_classes = [AllowAny]
+
+    @extend_schema(
+        description="Libros en tendencia: los que más se agregaron al carrito, reservaron, compraron y abrieron "
+                    "desde la búsqueda en las últimas horas, con más peso para la actividad más reciente.",
+        parameters=[
+            OpenApiParameter(
+                name='limite',
+                type=OpenApiTypes.INT,
+                description="Cantidad máxima de libros (por defecto y como máximo RECOMENDACIONES_TENDENCIAS_TAMANO)",
+                required=False
+            ),
+        ]
+    )
+    def get(self, request):
+        try:
+            limite = int(request.query_params.get('limite', settings.RECOMENDACIONES_TENDENCIAS_TAMANO))
+        except ValueError:
+            return Response({"error": "El límite debe ser un número entero"}, status=status.HTTP_400_BAD_REQUEST)
+        if limite < 1:
+            return Response({"error": "El límite debe ser mayor que cero"}, status=status.HTTP_400_BAD_REQUEST)
+
+        puntajes = dict(obtener_tendencias()[:limite])
+        filas = {fila['id']: fila for fila in valores_tarjeta(Libro.objects.filter(id__in=puntajes))}
+        ordenadas = [filas[libro_id] for libro_id in puntajes if libro_id in filas]
+        return Response([
+            {**tarjeta, 'puntaje': round(puntajes[tarjeta['id']], 4)} for tarjeta in tarjetas(ordenadas)
+        ])
@@ -5,4 +5,5 @@ from .serializers import TiendaSerializer
 class TiendaViewSet(viewsets.ModelViewSet):
     queryset = Tienda.objects.all()
     serializer_class = TiendaSerializer
+    ordering = 'id'
     permission_classes = [permissions.AllowAny]  # Permitir acceso público a todas las operaciones
\ No newline at end of file
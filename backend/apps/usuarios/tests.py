@@ -1,3 +1,36 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
 
-# Create your tests here.
+User = get_user_model()
+
+class PaginacionUsuariosTests(APITestCase):
+    def setUp(self):
+        for i in range(5):
+            User.objects.create_user(
+                username=f'usuario{i}', email=f'usuario{i}@test.com', password='testpass123',
+                numero_identificacion=str(i)
+            )
+        self.client.force_authenticate(User.objects.get(username='usuario0'))
+
+    def test_paginacion_por_pagina(self):
+        """El listado de usuarios usa páginas numeradas e informa el total"""
+        url = reverse('usuario-list')
+        response = self.client.get(url, {'page_size': 2, 'page': 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response['X-Total-Count'], '5')
+        self.assertIn('rel="prev"', response['Link'])
+        self.assertNotIn('rel="next"', response['Link'])
+
+    def test_tamano_de_pagina_limitado(self):
+        """?page_size= no puede superar PAGINACION_TAMANO_MAXIMO"""
+        with self.settings(PAGINACION_TAMANO=2, PAGINACION_TAMANO_MAXIMO=3):
+            response = self.client.get(reverse('usuario-list'))
+            self.assertEqual(len(response.data), 2)
+            response = self.client.get(reverse('usuario-list'), {'page_size': 1000})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(response['X-Total-Count'], '5')
+        self.assertIn('rel="next"', response['Link'])
@@ -21,6 +21,7 @@ from .serializers import (
 from .models import UsuarioPreferencias, TokenRecuperacionPassword, Libro, Categoria
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter, OpenApiExample
 from django.utils.http import urlencode
+from config.pagination import PaginacionPorPagina
 
 Usuario = get_user_model()
 
@@ -91,6 +92,8 @@ class UsuarioViewSet(viewsets.ModelViewSet):
     queryset = Usuario.objects.all()
     serializer_class = UsuarioSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # La administración de usuarios necesita el total y saltar a una página
+    pagination_class = PaginacionPorPagina
 
     def get_permissions(self):
         if self.action in ['create', 'recuperar_contraseña', 'validar_token', 'restablecer_contraseña']:
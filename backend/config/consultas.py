@@ -0,0 +1,20 @@
+from django.utils.module_loading import autodiscover_modules
+
+# Consultas frecuentes de la API, por nombre, para revisar sus planes de ejecución
+# (manage.py analizar_consultas). Cada app las registra en su módulo consultas.py.
+_consultas = {}
+
+def registrar_consulta(nombre):
+    """
+    Registra una función sin argumentos que retorna el QuerySet de una consulta frecuente,
+    con valores de ejemplo tomados de la base de datos.
+    """
+    def decorador(funcion):
+        _consultas[nombre] = funcion
+        return funcion
+    return decorador
+
+def consultas_registradas():
+    """Carga el módulo consultas.py de cada app y retorna {nombre: función}"""
+    autodiscover_modules('consultas')
+    return dict(sorted(_consultas.items()))
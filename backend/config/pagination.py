@@ -0,0 +1,80 @@
+from django.conf import settings
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+
+def encabezado_link(siguiente, anterior):
+    """Encabezado Link (RFC 8288) con las URLs de las páginas siguiente y anterior"""
+    enlaces = []
+    if siguiente:
+        enlaces.append(f'<{siguiente}>; rel="next"')
+    if anterior:
+        enlaces.append(f'<{anterior}>; rel="prev"')
+    return ', '.join(enlaces)
+
+class PaginacionCursor(CursorPagination):
+    """
+    Paginación por defecto de la API (DEFAULT_PAGINATION_CLASS): páginas de PAGINACION_TAMANO objetos,
+    hasta PAGINACION_TAMANO_MAXIMO con ?page_size=. Los clientes que necesitan el listado completo
+    siguen los enlaces (fetchAllPages en el frontend).
+
+    Cada página continúa desde la posición del cursor en lugar de usar OFFSET, por lo que recorre
+    el índice de la columna de orden. El orden es el atributo `ordering` de cada viewset (o el que pida
+    el cliente si el viewset usa OrderingFilter); sin él, '-id'.
+    El cuerpo sigue siendo la lista de objetos: los enlaces a otras páginas van en el encabezado Link.
+    """
+    ordering = '-id'
+    page_size_query_param = 'page_size'
+
+    @property
+    def max_page_size(self):
+        return settings.PAGINACION_TAMANO_MAXIMO
+
+    def get_page_size(self, request):
+        self.page_size = settings.PAGINACION_TAMANO
+        return super().get_page_size(request)
+
+    def get_ordering(self, request, queryset, view):
+        filtros = getattr(view, 'filter_backends', [])
+        orden = getattr(view, 'ordering', None)
+        if orden and not any(issubclass(filtro, OrderingFilter) for filtro in filtros):
+            orden = (orden,) if isinstance(orden, str) else tuple(orden)
+        else:
+            orden = tuple(super().get_ordering(request, queryset, view))
+        # Con valores repetidos (p. ej. ?ordering=precio) el id desempata, para que el orden sea estable
+        if not {'id', '-id', 'pk', '-pk'} & set(orden):
+            orden += ('-id' if orden[0].startswith('-') else 'id',)
+        return orden
+
+    def get_paginated_response(self, data):
+        enlaces = encabezado_link(self.get_next_link(), self.get_previous_link())
+        return Response(data, headers={'Link': enlaces} if enlaces else None)
+
+    def get_paginated_response_schema(self, schema):
+        return schema
+
+class PaginacionPorPagina(PageNumberPagination):
+    """
+    Paginación por número de página (?page=N), para los pocos endpoints que necesitan saltar
+    a una página o conocer el total. Se activa con `pagination_class` en el viewset.
+    El total va en el encabezado X-Total-Count.
+    """
+    page_size_query_param = 'page_size'
+
+    @property
+    def max_page_size(self):
+        return settings.PAGINACION_TAMANO_MAXIMO
+
+    def get_page_size(self, request):
+        self.page_size = settings.PAGINACION_TAMANO
+        return super().get_page_size(request)
+
+    def get_paginated_response(self, data):
+        headers = {'X-Total-Count': str(self.page.paginator.count)}
+        enlaces = encabezado_link(self.get_next_link(), self.get_previous_link())
+        if enlaces:
+            headers['Link'] = enlaces
+        return Response(data, headers=headers)
+
+    def get_paginated_response_schema(self, schema):
+        return schema
@@ -54,6 +54,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third party apps
     'rest_framework',
@@ -193,7 +194,11 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_PAGINATION_CLASS': 'config.pagination.PaginacionCursor',
 }
+# Tamaño de página por defecto de los listados y máximo que un cliente puede pedir con ?page_size=
+PAGINACION_TAMANO = env.int('PAGINACION_TAMANO', default=50)
+PAGINACION_TAMANO_MAXIMO = env.int('PAGINACION_TAMANO_MAXIMO', default=200)
 
 # Spectacular API settings
 SPECTACULAR_SETTINGS = {
@@ -248,6 +253,42 @@ CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",  # Next.js frontend
     "https://pausa11.github.io",  # GitHub Pages
 ]
+# Los listados paginados informan las páginas siguiente/anterior y el total en encabezados
+CORS_EXPOSE_HEADERS = ['Link', 'X-Total-Count']
+
+# Configuración de búsqueda
+# Tamaño de página por defecto y máximo permitido en /api/search/
+BUSQUEDA_PAGE_SIZE = env.int('BUSQUEDA_PAGE_SIZE', default=20)
+BUSQUEDA_MAX_PAGE_SIZE = env.int('BUSQUEDA_MAX_PAGE_SIZE', default=100)
+# Similitud mínima (0-1) de pg_trgm para la búsqueda tolerante a errores
+BUSQUEDA_DIFUSA_UMBRAL = env.float('BUSQUEDA_DIFUSA_UMBRAL', default=0.3)
+# La búsqueda difusa solo se ejecuta si la de texto completo devuelve menos resultados que esto
+BUSQUEDA_DIFUSA_MIN_RESULTADOS = env.int('BUSQUEDA_DIFUSA_MIN_RESULTADOS', default=3)
+# Máximo de resultados que aporta la búsqueda difusa
+BUSQUEDA_DIFUSA_LIMITE = env.int('BUSQUEDA_DIFUSA_LIMITE', default=20)
+
+# Límites entre los rangos de precio de las facetas (se pueden cambiar por petición con rangos_precio)
+BUSQUEDA_FACETAS_PRECIOS = env.list('BUSQUEDA_FACETAS_PRECIOS', cast=float, default=[10, 20, 50, 100])
+# Máximo de valores por faceta de categoría y editorial
+BUSQUEDA_FACETAS_LIMITE = env.int('BUSQUEDA_FACETAS_LIMITE', default=30)
+
+# Sugerencias de autocompletado por defecto y máximo por petición
+BUSQUEDA_AUTOCOMPLETAR_LIMITE = 8
+BUSQUEDA_AUTOCOMPLETAR_MAX_LIMITE = 20
+
+# Analítica de búsquedas: se acumulan en memoria y se guardan en lote
+BUSQUEDA_ANALITICA_LOTE = env.int('BUSQUEDA_ANALITICA_LOTE', default=100)
+BUSQUEDA_ANALITICA_INTERVALO = env.int('BUSQUEDA_ANALITICA_INTERVALO', default=30)  # segundos
+BUSQUEDA_ANALITICA_TOP_IDS = 10
+BUSQUEDA_ANALITICA_EN_SEGUNDO_PLANO = True
+# Tiempo máximo (segundos) que se guarda un resultado; los cambios del catálogo lo invalidan antes
+BUSQUEDA_CACHE_TIMEOUT = env.int('BUSQUEDA_CACHE_TIMEOUT', default=600)
+
+# Caché. Con varios workers debe ser compartida (p. ej. CACHE_URL=rediscache://...)
+# para que la versión del catálogo de la búsqueda sea la misma en todos los procesos
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
 
 # Channels settings
 ASGI_APPLICATION = 'config.asgi.application'
@@ -272,3 +313,76 @@ CLOUDINARY_STORAGE = {
 }
 
 DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
+
+# Mantenimiento de portadas (renombrado según el título) después del commit
+# Almacenamiento de las portadas; 'apps.libros.media.AlmacenamientoLocal' lo reemplaza en tests
+LIBROS_ALMACENAMIENTO_PORTADAS = env(
+    'LIBROS_ALMACENAMIENTO_PORTADAS', default='apps.libros.media.AlmacenamientoCloudinary'
+)
+LIBROS_MEDIA_EN_SEGUNDO_PLANO = True
+# Miniaturas de la portada cuyas URLs se guardan en el libro (transformaciones de Cloudinary)
+LIBROS_PORTADA_MINIATURAS = {
+    'pequena': {'width': 150, 'height': 225, 'crop': 'fill', 'quality': 'auto', 'fetch_format': 'auto'},
+    'mediana': {'width': 300, 'height': 450, 'crop': 'fill', 'quality': 'auto', 'fetch_format': 'auto'},
+}
+LIBROS_MEDIA_REINTENTOS = env.int('LIBROS_MEDIA_REINTENTOS', default=3)
+# Espera (segundos) antes del primer reintento; se duplica en cada uno
+LIBROS_MEDIA_ESPERA = env.float('LIBROS_MEDIA_ESPERA', default=1.0)
+
+# Máximo de filas por petición a la actualización masiva de inventario (stock y precio)
+LIBROS_INVENTARIO_MAX_FILAS = env.int('LIBROS_INVENTARIO_MAX_FILAS', default=10000)
+# Segundos que los clientes y cachés compartidas pueden reutilizar las lecturas públicas del catálogo
+# sin volver a validarlas (después se validan con el ETag y reciben 304 si no cambiaron)
+LIBROS_CACHE_MAX_AGE = env.int('LIBROS_CACHE_MAX_AGE', default=60)
+# Filas que trae cada lectura del cursor del servidor en la exportación del catálogo
+LIBROS_EXPORTACION_LOTE = env.int('LIBROS_EXPORTACION_LOTE', default=2000)
+
+# Popularidad de los libros: unidades vendidas y reservadas en los últimos POPULARIDAD_VENTANA_DIAS días,
+# ponderadas. Se suma al confirmar cada pedido o reserva y se recalcula con manage.py recalcular_popularidad
+POPULARIDAD_VENTANA_DIAS = env.int('POPULARIDAD_VENTANA_DIAS', default=30)
+POPULARIDAD_PESO_VENTA = env.float('POPULARIDAD_PESO_VENTA', default=1.0)
+POPULARIDAD_PESO_RESERVA = env.float('POPULARIDAD_PESO_RESERVA', default=0.5)
+
+# Libros similares ("los clientes también compraron"): similitud coseno entre libros según las cestas
+# (pedidos no cancelados, carritos y reservas de cada usuario) en que aparecen, con el peso de cada origen.
+# Se guardan RECOMENDACIONES_VECINOS por libro; se recalculan con manage.py calcular_similares
+RECOMENDACIONES_VECINOS = env.int('RECOMENDACIONES_VECINOS', default=20)
+RECOMENDACIONES_MIN_COINCIDENCIAS = env.int('RECOMENDACIONES_MIN_COINCIDENCIAS', default=1)
+RECOMENDACIONES_PESO_PEDIDO = env.float('RECOMENDACIONES_PESO_PEDIDO', default=1.0)
+RECOMENDACIONES_PESO_CARRITO = env.float('RECOMENDACIONES_PESO_CARRITO', default=0.5)
+RECOMENDACIONES_PESO_RESERVA = env.float('RECOMENDACIONES_PESO_RESERVA', default=0.75)
+# Libros similares por contenido (TF-IDF de título, autor, editorial, descripción y categoría).
+# Los términos presentes en más de MAX_DF del catálogo no se usan para emparejar libros; cada libro busca con
+# sus TERMINOS términos de mayor peso y cada término empareja a sus LIBROS_POR_TERMINO libros de mayor peso
+RECOMENDACIONES_CONTENIDO_VECINOS = env.int('RECOMENDACIONES_CONTENIDO_VECINOS', default=20)
+RECOMENDACIONES_CONTENIDO_MAX_DF = env.float('RECOMENDACIONES_CONTENIDO_MAX_DF', default=0.5)
+RECOMENDACIONES_CONTENIDO_TERMINOS = env.int('RECOMENDACIONES_CONTENIDO_TERMINOS', default=15)
+RECOMENDACIONES_CONTENIDO_LIBROS_POR_TERMINO = env.int('RECOMENDACIONES_CONTENIDO_LIBROS_POR_TERMINO', default=50)
+# La actualización incremental al guardar un libro corre en un hilo, fuera de la petición
+RECOMENDACIONES_CONTENIDO_EN_SEGUNDO_PLANO = True
+# Feed personalizado: TAMANO libros por usuario, puntuados por preferencias (autores y categorías),
+# similitud con lo comprado y popularidad. Se recalcula en lote para los usuarios activos en los últimos
+# DIAS_ACTIVO días (manage.py calcular_feeds) y al consultarlo si no existe o tiene más de VIGENCIA_HORAS
+RECOMENDACIONES_FEED_TAMANO = env.int('RECOMENDACIONES_FEED_TAMANO', default=50)
+RECOMENDACIONES_FEED_PESO_PREFERENCIA = env.float('RECOMENDACIONES_FEED_PESO_PREFERENCIA', default=1.0)
+RECOMENDACIONES_FEED_PESO_HISTORIAL = env.float('RECOMENDACIONES_FEED_PESO_HISTORIAL', default=1.0)
+RECOMENDACIONES_FEED_PESO_POPULARIDAD = env.float('RECOMENDACIONES_FEED_PESO_POPULARIDAD', default=0.5)
+RECOMENDACIONES_FEED_DIAS_ACTIVO = env.int('RECOMENDACIONES_FEED_DIAS_ACTIVO', default=30)
+RECOMENDACIONES_FEED_VIGENCIA_HORAS = env.int('RECOMENDACIONES_FEED_VIGENCIA_HORAS', default=24)
+# Tendencias: actividad por hora (carrito, reservas, compras y clics en la búsqueda, con su peso) de las últimas
+# VENTANA_HORAS horas; cada hora vale la mitad cada VIDA_MEDIA_HORAS. El ranking se guarda en caché CACHE segundos
+RECOMENDACIONES_TENDENCIAS_TAMANO = env.int('RECOMENDACIONES_TENDENCIAS_TAMANO', default=50)
+RECOMENDACIONES_TENDENCIAS_VENTANA_HORAS = env.int('RECOMENDACIONES_TENDENCIAS_VENTANA_HORAS', default=72)
+RECOMENDACIONES_TENDENCIAS_VIDA_MEDIA_HORAS = env.float('RECOMENDACIONES_TENDENCIAS_VIDA_MEDIA_HORAS', default=12.0)
+RECOMENDACIONES_TENDENCIAS_CACHE = env.int('RECOMENDACIONES_TENDENCIAS_CACHE', default=60)
+RECOMENDACIONES_TENDENCIAS_PESO_CARRITO = env.float('RECOMENDACIONES_TENDENCIAS_PESO_CARRITO', default=1.0)
+RECOMENDACIONES_TENDENCIAS_PESO_RESERVA = env.float('RECOMENDACIONES_TENDENCIAS_PESO_RESERVA', default=2.0)
+RECOMENDACIONES_TENDENCIAS_PESO_COMPRA = env.float('RECOMENDACIONES_TENDENCIAS_PESO_COMPRA', default=3.0)
+RECOMENDACIONES_TENDENCIAS_PESO_CLIC = env.float('RECOMENDACIONES_TENDENCIAS_PESO_CLIC', default=0.5)
+# Reglas "se compran juntos" para el carrito (manage.py minar_reglas): pares de libros presentes juntos en al
+# menos MIN_PEDIDOS pedidos y con confianza mínima MIN_CONFIANZA; se guardan POR_LIBRO reglas por libro
+RECOMENDACIONES_REGLAS_MIN_PEDIDOS = env.int('RECOMENDACIONES_REGLAS_MIN_PEDIDOS', default=2)
+RECOMENDACIONES_REGLAS_MIN_CONFIANZA = env.float('RECOMENDACIONES_REGLAS_MIN_CONFIANZA', default=0.05)
+RECOMENDACIONES_REGLAS_POR_LIBRO = env.int('RECOMENDACIONES_REGLAS_POR_LIBRO', default=10)
+# Sugerencias que devuelve GET /api/compras/carritos/sugerencias/
+RECOMENDACIONES_REGLAS_SUGERENCIAS = env.int('RECOMENDACIONES_REGLAS_SUGERENCIAS', default=6)
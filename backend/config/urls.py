@@ -40,6 +40,7 @@ urlpatterns = [
     path('api/noticias/', include('apps.noticias.urls')),
     path('api/mensajeria/', include('apps.mensajeria.urls')),
     path('api/compras/', include('apps.compras.urls')),  
+    path('api/recomendaciones/', include('apps.recomendaciones.urls')),
     
     # JWT Authentication
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
@@ -59,4 +59,25 @@ export const getApiUrlByKey = (endpointKey) => {
   return `${baseURL}${endpoint}`;
 };
 
+// Fetches one page of a paginated list; `next` is the URL of the following page (from the Link header) or null
+export const fetchPage = async (url, options = {}) => {
+  const response = await fetch(url, options);
+  if (!response.ok) throw new Error(`Error en la petición: ${response.status}`);
+  const results = await response.json();
+  const match = (response.headers.get("Link") || "").match(/<([^>]+)>;\s*rel="next"/);
+  return { results, next: match ? match[1] : null };
+};
+
+// Fetches every page of a paginated list by following the Link header
+export const fetchAllPages = async (url, options = {}) => {
+  let results = [];
+  let nextUrl = url;
+  while (nextUrl) {
+    const page = await fetchPage(nextUrl, options);
+    results = results.concat(page.results);
+    nextUrl = page.next;
+  }
+  return results;
+};
+
 export default config;
@@ -2,7 +2,7 @@ import AOS from 'aos';
 import 'aos/dist/aos.css';
 import { useEffect, useState } from "react";
 import { useNavigate } from "react-router-dom";
-import { getApiUrl } from "../api/config";
+import { fetchPage, getApiUrl } from "../api/config";
 import BookCard from "./book/bookCard";
 import NavBar from "./navBar";
 import ButtonA from "./ui/buttonA";
@@ -31,12 +31,9 @@ const Home = () => {
 
   const fetchBooks = async () => {
     try {
-      const response = await fetch(backendURL);
-      if (!response.ok) {
-        throw new Error("Error en la petición");
-      }
-      const data = await response.json();
-      setBooks(data);
+      // The catalog is paginated; one page is enough to pick the featured books from
+      const { results } = await fetchPage(`${backendURL}?page_size=50`);
+      setBooks(results);
       setIsLoading(false);
     } catch (error) {
       console.error("Error fetching books:", error);
@@ -1,18 +1,22 @@
 import 'aos/dist/aos.css';
-import { useEffect, useState } from "react";
+import { useEffect, useRef, useState } from "react";
 import { useLocation } from "react-router-dom";
-import { getApiUrl } from "../api/config";
+import { fetchPage, getApiUrl } from "../api/config";
 import NavBar from "./navBar";
 import BookCard from "./book/bookCard";
 import LoadingSpinner from "./ui/LoadingSpinner";
 
+// Libros por página; las siguientes se cargan al llegar al final de la lista
+const PAGE_SIZE = 24;
+
 function Catalogo() {
   const backendURL = getApiUrl("/api/libros/");
   const location = useLocation();
   
   const [books, setBooks] = useState([]);
-  const [filteredBooks, setFilteredBooks] = useState([]);
+  const [nextUrl, setNextUrl] = useState(null);
   const [isLoading, setIsLoading] = useState(true);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [categorias, setCategorias] = useState([]);
   const [searchTerm, setSearchTerm] = useState("");
   const [showSearchInterface, setShowSearchInterface] = useState(false);
@@ -25,6 +29,10 @@ function Catalogo() {
     field: "titulo",
     direction: "asc"
   });
+  const loaderRef = useRef(null);
+  // Identifica la última petición: las respuestas de búsquedas anteriores se descartan
+  const requestId = useRef(0);
+  const isFetching = useRef(false);
   
   // Verificar si debe mostrar la interfaz de búsqueda al cargar
   useEffect(() => {
@@ -40,25 +48,61 @@ function Catalogo() {
 
   useEffect(() => {
     // No se requiere autenticación para ver el catálogo
-    fetchBooks();
     fetchCategorias();
   }, []);
 
-  const fetchBooks = async () => {
+  const buildQuery = () => {
+    const params = new URLSearchParams({ page_size: PAGE_SIZE });
+    if (searchTerm) params.set("search", searchTerm);
+    if (filters.categoria) params.set("categoria", filters.categoria);
+    if (filters.precio_min) params.set("precio_min", filters.precio_min);
+    if (filters.precio_max) params.set("precio_max", filters.precio_max);
+    params.set("ordering", `${sortConfig.direction === "desc" ? "-" : ""}${sortConfig.field}`);
+    return `${backendURL}?${params}`;
+  };
+
+  const loadPage = async (url, reset) => {
+    const id = ++requestId.current;
+    isFetching.current = true;
+    if (!reset) setIsLoadingMore(true);
     try {
-      setIsLoading(true);
-      const response = await fetch(backendURL);
-      if (!response.ok) throw new Error("Error en la petición");
-      const data = await response.json();
-      setBooks(data);
-      setFilteredBooks(data);
-      setIsLoading(false);
+      const page = await fetchPage(url);
+      if (id !== requestId.current) return;
+      setBooks(prev => (reset ? page.results : [...prev, ...page.results]));
+      setNextUrl(page.next);
     } catch (error) {
       console.error("Error fetching books:", error);
-      setIsLoading(false);
+    } finally {
+      if (id === requestId.current) {
+        isFetching.current = false;
+        setIsLoading(false);
+        setIsLoadingMore(false);
+      }
     }
   };
 
+  const loadMore = () => {
+    if (nextUrl && !isFetching.current) loadPage(nextUrl, false);
+  };
+
+  // La búsqueda, los filtros y el orden los aplica la API: al cambiarlos se vuelve a la primera página
+  useEffect(() => {
+    const timer = setTimeout(() => loadPage(buildQuery(), true), searchTerm ? 300 : 0);
+    return () => clearTimeout(timer);
+  }, [searchTerm, filters, sortConfig]);
+
+  // Carga la página siguiente cuando el final de la lista entra en pantalla
+  useEffect(() => {
+    const sentinel = loaderRef.current;
+    if (!sentinel || !nextUrl) return;
+    const observer = new IntersectionObserver(
+      (entries) => { if (entries[0].isIntersecting) loadMore(); },
+      { rootMargin: "400px" }
+    );
+    observer.observe(sentinel);
+    return () => observer.disconnect();
+  }, [nextUrl, isLoadingMore]);
+
   const fetchCategorias = async () => {
     try {
       const response = await fetch(getApiUrl("/api/libros/categorias/"));
@@ -70,54 +114,6 @@ function Catalogo() {
     }
   };
 
-  useEffect(() => {
-    // Aplicar filtros y búsqueda
-    let result = [...books];
-    
-    // Aplicar término de búsqueda
-    if (searchTerm) {
-      const term = searchTerm.toLowerCase();
-      result = result.filter(book => 
-        book.titulo?.toLowerCase().includes(term) || 
-        book.autor?.toLowerCase().includes(term) ||
-        book.isbn?.toLowerCase().includes(term) ||
-        book.descripcion?.toLowerCase().includes(term) ||
-        book.editorial?.toLowerCase().includes(term) ||
-        (book.año_publicacion && book.año_publicacion.toString().includes(term))
-      );
-    }
-    
-    // Aplicar filtros
-    if (filters.categoria) {
-      result = result.filter(book => book.categoria === parseInt(filters.categoria));
-    }
-    
-    if (filters.precio_min) {
-      result = result.filter(book => parseFloat(book.precio) >= parseFloat(filters.precio_min));
-    }
-    
-    if (filters.precio_max) {
-      result = result.filter(book => parseFloat(book.precio) <= parseFloat(filters.precio_max));
-    }
-    
-    // Aplicar ordenamiento
-    result = result.sort((a, b) => {
-      // Manejar valores null o undefined
-      const aValue = a[sortConfig.field] || '';
-      const bValue = b[sortConfig.field] || '';
-      
-      if (aValue < bValue) {
-        return sortConfig.direction === 'asc' ? -1 : 1;
-      }
-      if (aValue > bValue) {
-        return sortConfig.direction === 'asc' ? 1 : -1;
-      }
-      return 0;
-    });
-    
-    setFilteredBooks(result);
-  }, [books, searchTerm, filters, sortConfig]);
-
   const handleFilterChange = (e) => {
     const { name, value } = e.target;
     setFilters(prev => ({
@@ -264,9 +260,10 @@ function Catalogo() {
 
         {/* Resultados */}
         <div className="w-full flex flex-wrap gap-4 justify-center"> 
-          {filteredBooks.length > 0 ? (
-            filteredBooks.map((book) => (
+          {books.length > 0 ? (
+            books.map((book) => (
               <BookCard
+                key={book.id}
                 book={book}
                 color="white"
               />
@@ -277,6 +274,18 @@ function Catalogo() {
             </p>
           )}
         </div>
+
+        {nextUrl && (
+          <div ref={loaderRef} className="w-full flex justify-center py-8">
+            <button
+              onClick={loadMore}
+              disabled={isLoadingMore}
+              className="bg-[#3B4CBF] text-white px-6 py-2 rounded-lg disabled:opacity-60"
+            >
+              {isLoadingMore ? "Cargando..." : "Cargar más"}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react';
 import { Toaster, toast } from 'sonner';
-import { getApiUrl } from '../../api/config';
+import { fetchAllPages, getApiUrl } from '../../api/config';
 
 function AdminForumMessages() {
   const [loading, setLoading] = useState(true);
@@ -36,19 +36,14 @@ function AdminForumMessages() {
         throw new Error("No se encontró el token de autenticación");
       }
 
-      const response = await fetch(`${baseUrl}/mensajes/`, {
+      // El listado está paginado: se recorren todas las páginas
+      const data = await fetchAllPages(`${baseUrl}/mensajes/?page_size=200`, {
         method: "GET",
         headers: {
           "Content-Type": "application/json",
           "Authorization": `Bearer ${token}`,
         },
       });
-
-      if (!response.ok) {
-        throw new Error(`Error ${response.status}: ${await response.text()}`);
-      }
-
-      const data = await response.json();
       
       // Filtramos todos los mensajes que no son respuestas
       const mainMessages = data.filter(msg => !msg.es_respuesta);
@@ -97,19 +92,14 @@ function AdminForumMessages() {
         return;
       }
 
-      const response = await fetch(`${baseUrl}/foros/`, {
+      // El listado está paginado: se recorren todas las páginas
+      const data = await fetchAllPages(`${baseUrl}/foros/?page_size=200`, {
         method: "GET",
         headers: {
           "Content-Type": "application/json",
           "Authorization": `Bearer ${token}`,
         },
       });
-
-      if (!response.ok) {
-        throw new Error(`Error ${response.status}: ${await response.text()}`);
-      }
-
-      const data = await response.json();
       setForos(data);
       
       // Inicialmente cargamos todos los mensajes sin filtrar por foro
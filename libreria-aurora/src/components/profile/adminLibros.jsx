@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react';
 import { Toaster, toast } from 'sonner';
-import { getApiUrl } from '../../api/config';
+import { fetchAllPages, getApiUrl } from '../../api/config';
 import LoadingSpinner from '../ui/LoadingSpinner';
 
 function AdminLibros() {
@@ -32,11 +32,9 @@ function AdminLibros() {
     setLoading(true);
     try {
       const token = localStorage.getItem('token');
-      const response = await fetch(librosUrl, {
+      const data = await fetchAllPages(`${librosUrl}?page_size=200`, {
         headers: { 'Authorization': `Bearer ${token}` }
       });
-      if (!response.ok) throw new Error('Error al cargar libros');
-      const data = await response.json();
       setLibros(data);
     } catch (e) {
       toast.error('No se pudieron cargar los libros');
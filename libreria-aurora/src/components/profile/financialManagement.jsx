@@ -1,7 +1,7 @@
 import React, { useEffect, useState } from "react";
 import AddPaymentMethod from "./addPaymentMethod";
 import { Toaster, toast } from "sonner";
-import { getApiUrl } from "../../api/config";
+import { fetchAllPages, fetchPage, getApiUrl } from "../../api/config";
 
 function FinancialManagement() {
     const [card, setCard] = useState(null);
@@ -26,25 +26,15 @@ function FinancialManagement() {
                 return;
             }
 
-            const response = await fetch(`${baseUrl}/finanzas/tarjetas/`, {
+            // Solo se muestra la primera tarjeta: basta con la primera página
+            const { results } = await fetchPage(`${baseUrl}/finanzas/tarjetas/?page_size=1`, {
                 method: "GET",
                 headers: {
                     "Content-Type": "application/json",
                     "Authorization": `Bearer ${token}`
                 }
             });
-
-            if (response.ok) {
-                const data = await response.json();
-                if (data && data.length > 0) {
-                    setCard(data[0]);
-                } else {
-                    setCard(null);
-                }
-            } else {
-                setCard(null);
-            }
-            
+            setCard(results.length > 0 ? results[0] : null);
             setLoading(false);
         } catch (error) {
             console.error("Error al cargar tarjeta:", error);
@@ -58,24 +48,15 @@ function FinancialManagement() {
             const token = localStorage.getItem("token");
             if (!token) return;
         
-            const response = await fetch(`${baseUrl}/finanzas/saldos/`, {
+            // Cada usuario tiene un único saldo: basta con la primera página
+            const { results } = await fetchPage(`${baseUrl}/finanzas/saldos/?page_size=1`, {
                 method: "GET",
                 headers: {
                     "Content-Type": "application/json",
                     "Authorization": `Bearer ${token}`,
                 },
             });
-        
-            if (response.ok) {
-                const data = await response.json();
-                if (data && data.length > 0) {
-                    setSaldo(data[0].saldo);
-                } else {
-                    setSaldo(0);
-                }
-            } else {
-                setSaldo(0);
-            }
+            setSaldo(results.length > 0 ? results[0].saldo : 0);
             setLoading(false);
         } catch (error) {
             console.error("Error al obtener el saldo:", error);
@@ -90,21 +71,15 @@ function FinancialManagement() {
             const token = localStorage.getItem("token");
             if (!token) return;
             
-            const response = await fetch(`${baseUrl}/finanzas/historial/`, {
+            // El historial está paginado: se recorren todas las páginas
+            const data = await fetchAllPages(`${baseUrl}/finanzas/historial/?page_size=200`, {
                 method: "GET",
                 headers: {
                     "Content-Type": "application/json",
                     "Authorization": `Bearer ${token}`,
                 },
             });
-            
-            if (response.ok) {
-                const data = await response.json();
-                setHistorialTransacciones(data);
-            } else {
-                console.error("Error al obtener historial:", response.status);
-                setHistorialTransacciones([]);
-            }
+            setHistorialTransacciones(data);
         } catch (error) {
             console.error("Error al obtener historial:", error);
             setHistorialTransacciones([]);
@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react';
 import { Toaster, toast } from 'sonner';
-import { getApiUrl } from '../../api/config';
+import { fetchAllPages, fetchPage, getApiUrl } from '../../api/config';
 
 function ForumMessages() {
   const [loading, setLoading] = useState(true);
@@ -24,19 +24,14 @@ function ForumMessages() {
         throw new Error("No se encontró el token de autenticación");
       }
 
-      const response = await fetch(`${baseUrl}/foros/`, {
+      // El listado está paginado; el foro del usuario viene en la primera página
+      const { results: data } = await fetchPage(`${baseUrl}/foros/`, {
         method: "GET",
         headers: {
           "Content-Type": "application/json",
           "Authorization": `Bearer ${token}`,
         },
       });
-
-      if (!response.ok) {
-        throw new Error(`Error ${response.status}: ${await response.text()}`);
-      }
-
-      const data = await response.json();
       
       // Si hay foros, obtenemos el primero (debería ser el único del usuario)
       if (data && data.length > 0) {
@@ -62,19 +57,14 @@ function ForumMessages() {
         throw new Error("No se encontró el token de autenticación");
       }
 
-      const response = await fetch(`${baseUrl}/mensajes/`, {
+      // El listado está paginado: se recorren todas las páginas
+      const data = await fetchAllPages(`${baseUrl}/mensajes/?page_size=200`, {
         method: "GET",
         headers: {
           "Content-Type": "application/json",
           "Authorization": `Bearer ${token}`,
         },
       });
-
-      if (!response.ok) {
-        throw new Error(`Error ${response.status}: ${await response.text()}`);
-      }
-
-      const data = await response.json();
       
       // Filtramos los mensajes que pertenecen a este foro
       const forumMessages = data.filter(msg => msg.foro === forumId && !msg.es_respuesta);
@@ -102,19 +92,14 @@ function ForumMessages() {
         throw new Error("No se encontró el token de autenticación");
       }
 
-      const response = await fetch(`${baseUrl}/notificaciones/`, {
+      // El listado está paginado: se recorren todas las páginas
+      const data = await fetchAllPages(`${baseUrl}/notificaciones/?page_size=200`, {
         method: "GET",
         headers: {
           "Content-Type": "application/json",
           "Authorization": `Bearer ${token}`,
         },
       });
-
-      if (!response.ok) {
-        throw new Error(`Error ${response.status}: ${await response.text()}`);
-      }
-
-      const data = await response.json();
       
       // Filtramos solo las notificaciones no leídas
       const unread = data.filter(notification => !notification.leido);
@@ -173,19 +158,13 @@ function ForumMessages() {
       }
 
       // Primero obtenemos el ID del foro personal
-      const foroResponse = await fetch(`${baseUrl}/foros/`, {
+      const { results: foroData } = await fetchPage(`${baseUrl}/foros/`, {
         method: "GET",
         headers: {
           "Content-Type": "application/json",
           "Authorization": `Bearer ${token}`,
         },
       });
-
-      if (!foroResponse.ok) {
-        throw new Error(`Error ${foroResponse.status}: ${await foroResponse.text()}`);
-      }
-
-      const foroData = await foroResponse.json();
       if (!foroData || foroData.length === 0) {
         throw new Error("No se encontró el foro personal");
       }
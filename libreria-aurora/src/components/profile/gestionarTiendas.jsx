@@ -2,7 +2,7 @@ import { useState, useEffect } from 'react';
 import { MapContainer, TileLayer, Marker, Popup, useMapEvents } from 'react-leaflet';
 import L from 'leaflet';
 import 'leaflet/dist/leaflet.css';
-import { getApiUrl } from "../../api/config";
+import { fetchAllPages, getApiUrl } from "../../api/config";
 
 delete L.Icon.Default.prototype._getIconUrl;
 L.Icon.Default.mergeOptions({
@@ -25,23 +25,17 @@ function Tiendas() {
   const fetchTiendas = async () => {
     try {
 
-      const response = await fetch(getApiUrl("/api/tiendas/tiendas/"), {
+      // El listado está paginado: se recorren todas las páginas
+      const data = await fetchAllPages(`${getApiUrl("/api/tiendas/tiendas/")}?page_size=200`, {
         headers: {
           "Content-Type": "application/json"
         },
       });
 
-      const data = await response.json();
-
-      if (!response.ok) {
-        setError(data?.detail || "Error al cargar tiendas");
-        return;
-      }
-
       setTiendas(data);
     } catch (err) {
       console.error(err);
-      setError("Error de red al consultar las tiendas");
+      setError("Error al cargar tiendas");
     } finally {
       setLoading(false);
     }
@@ -1,5 +1,5 @@
 import { useEffect, useState } from "react";
-import { getApiUrl } from "../../api/config";
+import { fetchAllPages, getApiUrl } from "../../api/config";
 import { useNavigate } from "react-router-dom";
 import { toast, Toaster } from "sonner";
 
@@ -37,16 +37,14 @@ function Pedidos() {
       const token = localStorage.getItem("token");
       if (!token) return;
 
-      const response = await fetch(getApiUrl("/api/compras/historial-compras/"), {
+      // El listado está paginado: se recorren todas las páginas
+      const data = await fetchAllPages(`${getApiUrl("/api/compras/historial-compras/")}?page_size=200`, {
         headers: {
           "Content-Type": "application/json",
           Authorization: `Bearer ${token}`,
         },
       });
-
-      const data = await response.json();
-      console.log("Historial de compras:", data);
-      if (response.ok) setHistorialCompras(data);
+      setHistorialCompras(data);
     } catch (error) {
       console.error("Error al obtener historial de compras:", error);
     }
@@ -1,5 +1,5 @@
 import { useEffect, useState } from "react";
-import { getApiUrl } from "../../api/config";
+import { fetchAllPages, getApiUrl } from "../../api/config";
 import { useNavigate } from "react-router-dom";
 import { toast } from "sonner";
 
@@ -16,17 +16,14 @@ function Reservas() {
       const token = localStorage.getItem("token");
       if (!token) return;
 
-      const response = await fetch(getApiUrl("/api/compras/reservas/"), {
+      // El listado está paginado: se recorren todas las páginas
+      const data = await fetchAllPages(`${getApiUrl("/api/compras/reservas/")}?page_size=200`, {
         headers: {
           "Content-Type": "application/json",
           Authorization: `Bearer ${token}`,
         },
       });
-
-      const data = await response.json();
-      if (response.ok) {
-        setReservas(data);
-      }
+      setReservas(data);
     } catch (error) {
       console.error("Error al obtener reservas:", error);
     }